@@ -25,7 +25,6 @@ if errorlevel 1 (
 echo Installing core packages...
 %PIP_CMD% install torch torchvision
 %PIP_CMD% install matplotlib numpy
-%PIP_CMD% install scikit-learn
 %PIP_CMD% install streamlit
 %PIP_CMD% install tqdm
 %PIP_CMD% install reportlab
@@ -53,7 +53,6 @@ if errorlevel 1 (
     echo Installing packages one by one (skipping pyarrow if it fails)...
     %PIP_CMD% install torch torchvision
     %PIP_CMD% install matplotlib numpy
-    %PIP_CMD% install scikit-learn
     %PIP_CMD% install streamlit
     %PIP_CMD% install tqdm
     %PIP_CMD% install reportlab
@@ -7,9 +7,15 @@ import subprocess
 import sys
 import os
 import time
+import argparse
 import webbrowser
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from lazy_imports import missing, import_time_report, format_import_report
+
+REQUIRED_MODULES = ['streamlit', 'torch', 'torchvision', 'matplotlib', 'numpy']
+
 def install_dependencies():
     """Install dependencies using pip"""
     print("📦 Installing dependencies...")
@@ -33,35 +39,26 @@ def install_dependencies():
         return False
 
 def check_dependencies():
-    """Check if required dependencies are installed"""
-    try:
-        import streamlit
-        import torch
-        import matplotlib
-        import numpy
+    """Check if required dependencies are installed (located with find_spec, not imported)"""
+    missing_modules = missing(REQUIRED_MODULES)
+    if not missing_modules:
         print("✅ All dependencies are installed")
         return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
-        print("\nAttempting to install dependencies automatically...")
-        if install_dependencies():
-            # Try importing again
-            try:
-                import streamlit
-                import torch
-                import matplotlib
-                import numpy
-                print("✅ Dependencies are now installed!")
-                return True
-            except ImportError as e2:
-                print(f"❌ Still missing: {e2}")
-                print("\nPlease install manually:")
-                print(f"  {sys.executable} -m pip install -r requirements.txt")
-                return False
-        else:
-            print("\nPlease install manually:")
-            print(f"  {sys.executable} -m pip install -r requirements.txt")
-            return False
+    print(f"❌ Missing dependencies: {', '.join(missing_modules)}")
+    print("\nAttempting to install dependencies automatically...")
+    if install_dependencies():
+        still_missing = missing(REQUIRED_MODULES)
+        if not still_missing:
+            print("✅ Dependencies are now installed!")
+            return True
+        print(f"❌ Still missing: {', '.join(still_missing)}")
+    print("\nPlease install manually:")
+    print(f"  {sys.executable} -m pip install -r requirements.txt")
+    return False
+
+def print_import_report():
+    """Print the cold import cost of the dashboard's dependencies"""
+    print(format_import_report(import_time_report(REQUIRED_MODULES + ['plotly.graph_objects'], top=25)))
 
 def create_directories():
     """Create necessary directories"""
@@ -90,6 +87,14 @@ def run_streamlit():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Start the Parameter Pruning Dashboard')
+    parser.add_argument('--import-report', action='store_true',
+                        help='print a -X importtime breakdown of the dependencies and exit')
+    args = parser.parse_args()
+    if args.import_report:
+        print_import_report()
+        return
+    
     print("="*50)
     print("🔬 Parameter Pruning Dashboard Launcher")
     print("="*50)
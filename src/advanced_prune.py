@@ -4,6 +4,7 @@ Advanced Pruning Techniques
 - L1/L2 regularization pruning
 - Structured pruning (channel/filter)
 - Gradient-based pruning
+- Single dispatch entry point (apply_pruning) shared by the dashboard and job workers
 """
 
 import torch
@@ -140,3 +141,43 @@ def random_prune(state_dict, amount):
             new_state[k] = v
     return new_state
 
+# Method key -> dashboard label
+PRUNING_METHODS = {
+    'magnitude': 'Magnitude-based (Standard)',
+    'l1': 'L1 Norm-based',
+    'structured': 'Structured (Channel)',
+    'gradient': 'Gradient-based',
+    'random': 'Random (Baseline)'
+}
+
+def method_key(method):
+    """Normalize a method key or dashboard label to a PRUNING_METHODS key"""
+    if method in PRUNING_METHODS:
+        return method
+    for key, label in PRUNING_METHODS.items():
+        if method == label:
+            return key
+    raise ValueError(f"Unknown pruning method '{method}' (use one of {list(PRUNING_METHODS)})")
+
+def apply_pruning(state_dict, method, amount, model=None, dataloader=None, device='cpu'):
+    """Prune a state_dict with the named method (structured and gradient need a model)"""
+    method = method_key(method)
+    if method in ('structured', 'gradient') and model is None:
+        from model import SimpleCNN
+        model = SimpleCNN().to(device)
+    if method == 'magnitude':
+        return magnitude_prune(state_dict, amount)
+    if method == 'l1':
+        return l1_prune(state_dict, amount)
+    if method == 'structured':
+        return structured_channel_prune(state_dict, amount, model)
+    if method == 'gradient':
+        if dataloader is None:
+            # One small batch is all gradient_based_prune uses
+            from torch.utils.data import DataLoader
+            from torchvision import datasets
+            from evaluation import get_test_transform
+            testset = datasets.CIFAR10(root='./data', train=False, download=True, transform=get_test_transform())
+            dataloader = DataLoader(testset, batch_size=32, shuffle=False)
+        return gradient_based_prune(state_dict, model, dataloader, amount, device)
+    return random_prune(state_dict, amount)
@@ -9,12 +9,12 @@ Advanced Visualization Techniques
 """
 
 import torch
+import torch.nn as nn
 import torch.nn.functional as F
 import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.manifold import TSNE
-from sklearn.decomposition import PCA
 import os
+from coordination import atomic_savefig
 
 def plot_weight_distributions(state_dict, out_dir='assets', prefix='weights'):
     """Plot weight distributions for all layers"""
@@ -30,7 +30,7 @@ def plot_weight_distributions(state_dict, out_dir='assets', prefix='weights'):
             plt.grid(True, alpha=0.3)
             plt.tight_layout()
             fname = os.path.join(out_dir, f"{prefix}_{k.replace('.','_')}_dist.png")
-            plt.savefig(fname, dpi=150)
+            atomic_savefig(fname, dpi=150)
             plt.close()
 
 def plot_weight_heatmap(state_dict, out_dir='assets', prefix='weights'):
@@ -58,7 +58,7 @@ def plot_weight_heatmap(state_dict, out_dir='assets', prefix='weights'):
             plt.suptitle(f'Filter Heatmaps: {k}', fontsize=14, fontweight='bold')
             plt.tight_layout()
             fname = os.path.join(out_dir, f"{prefix}_{k.replace('.','_')}_heatmap.png")
-            plt.savefig(fname, dpi=150)
+            atomic_savefig(fname, dpi=150)
             plt.close()
 
 def plot_sparsity_analysis(state_dict, out_dir='assets', prefix='sparsity'):
@@ -101,7 +101,7 @@ def plot_sparsity_analysis(state_dict, out_dir='assets', prefix='sparsity'):
     
     plt.tight_layout()
     fname = os.path.join(out_dir, f"{prefix}_analysis.png")
-    plt.savefig(fname, dpi=150)
+    atomic_savefig(fname, dpi=150)
     plt.close()
 
 def plot_layer_statistics(state_dict, out_dir='assets', prefix='stats'):
@@ -153,7 +153,7 @@ def plot_layer_statistics(state_dict, out_dir='assets', prefix='stats'):
     
     plt.tight_layout()
     fname = os.path.join(out_dir, f"{prefix}_layer_stats.png")
-    plt.savefig(fname, dpi=150)
+    atomic_savefig(fname, dpi=150)
     plt.close()
 
 def visualize_activations(model, dataloader, device, out_dir='assets', prefix='activations'):
@@ -198,7 +198,7 @@ def visualize_activations(model, dataloader, device, out_dir='assets', prefix='a
                 plt.suptitle(f'Activations: {name}', fontsize=14, fontweight='bold')
                 plt.tight_layout()
                 fname = os.path.join(out_dir, f"{prefix}_{name.replace('.','_')}.png")
-                plt.savefig(fname, dpi=150)
+                atomic_savefig(fname, dpi=150)
                 plt.close()
     
     # Remove hooks
@@ -243,6 +243,6 @@ def plot_pruning_comparison(before_dict, after_dict, out_dir='assets', prefix='c
     
     plt.tight_layout()
     fname = os.path.join(out_dir, f"{prefix}_pruning.png")
-    plt.savefig(fname, dpi=150)
+    atomic_savefig(fname, dpi=150)
     plt.close()
 
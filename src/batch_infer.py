@@ -0,0 +1,360 @@
+"""
+Batch Inference
+- Offline scoring of image folders, .npy / .npz shards and CIFAR-10 batch files
+- Work is split into fixed-size chunks and sharded across a process pool (threads capped per process)
+- Each worker decodes the next mini-batch on a prefetch thread while the current one runs
+- Predictions and/or logits are written straight into .npy memmaps, chunk by chunk
+- A per-chunk done bitmap makes interrupted runs resumable (--resume)
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import pickle
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import torch
+from fingerprint import file_fingerprint
+from coordination import atomic_write
+from inference import INFERENCE_MODES, DEFAULT_INFERENCE_MODE, resolve_mode, prepare_input, inference_context
+from resource_governor import host_cores
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+CIFAR_PY_NAMES = ('data_batch_1', 'data_batch_2', 'data_batch_3', 'data_batch_4', 'data_batch_5', 'test_batch')
+CIFAR_RECORD_BYTES = 1 + 3 * 32 * 32
+CIFAR_PY_BATCH_ROWS = 10000  # Every python-format CIFAR-10 batch file
+NUM_CLASSES = 10
+INPUT_SHAPE = (3, 32, 32)
+MANIFEST_FILE = 'manifest.json'
+DONE_FILE = 'done.npy'
+IMAGES_FILE = 'images.txt'
+PREDICTIONS_FILE = 'predictions.npy'
+LOGITS_FILE = 'logits.npy'
+OUTPUTS = ('predictions', 'logits', 'both')
+
+# Planning (parent process)
+
+def _npz_shape(path, key):
+    """Array shape from an .npz member header, without decompressing the data"""
+    with np.load(path) as archive:
+        with archive.zip.open(f"{key}.npy") as f:
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, _, _ = read_header(f)
+    return shape
+
+def _npz_key(path):
+    with np.load(path) as archive:
+        for key in ('x', 'images', 'data', 'inputs'):
+            if key in archive.files:
+                return key
+        return archive.files[0]
+
+def _image_files(directory):
+    files = []
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(IMAGE_SUFFIXES))
+    return files
+
+def discover_sources(inputs):
+    """Ordered list of input sources; each is {'kind', 'path', 'count', ...}"""
+    sources = []
+    for path in inputs:
+        if os.path.isdir(path):
+            names = set(os.listdir(path))
+            batches = [n for n in CIFAR_PY_NAMES if n in names]
+            bins = sorted(n for n in names if n.endswith('.bin') and 'batch' in n)
+            if batches or bins:
+                sources.extend(discover_sources([os.path.join(path, n) for n in batches + bins]))
+            else:
+                files = _image_files(path)
+                if files:
+                    sources.append({'kind': 'images', 'path': path, 'count': len(files), 'files': files})
+        elif path.endswith('.npy'):
+            sources.append({'kind': 'npy', 'path': path, 'count': int(np.load(path, mmap_mode='r').shape[0])})
+        elif path.endswith('.npz'):
+            key = _npz_key(path)
+            sources.append({'kind': 'npz', 'path': path, 'key': key, 'count': int(_npz_shape(path, key)[0])})
+        elif path.endswith('.bin'):
+            sources.append({'kind': 'cifar_bin', 'path': path, 'count': os.path.getsize(path) // CIFAR_RECORD_BYTES})
+        elif os.path.basename(path) in CIFAR_PY_NAMES:
+            sources.append({'kind': 'cifar_py', 'path': path, 'count': CIFAR_PY_BATCH_ROWS})
+        elif path.lower().endswith(IMAGE_SUFFIXES):
+            sources.append({'kind': 'images', 'path': path, 'count': 1, 'files': [path]})
+        else:
+            raise ValueError(f"Don't know how to read {path}")
+    return sources
+
+def plan_chunks(sources, chunk_size):
+    """(chunk_id, row offset, source index, start within source, count); chunks never span sources"""
+    chunks = []
+    offset = 0
+    for index, source in enumerate(sources):
+        for start in range(0, source['count'], chunk_size):
+            count = min(chunk_size, source['count'] - start)
+            chunks.append((len(chunks), offset + start, index, start, count))
+        offset += source['count']
+    return chunks
+
+def run_config(model_path, sources, chunk_size, output, normalize):
+    """What a run's outputs depend on; a resume is only allowed when it matches"""
+    described = []
+    for source in sources:
+        stat = os.stat(source['path'])
+        described.append({'kind': source['kind'], 'path': os.path.abspath(source['path']), 'count': source['count'],
+                          'mtime_ns': stat.st_mtime_ns, 'key': source.get('key')})
+    files_digest = hashlib.sha256('\n'.join(f for s in sources for f in s.get('files', [])).encode('utf-8'))
+    return {
+        'model_path': os.path.abspath(model_path),
+        'model_fingerprint': file_fingerprint(model_path),
+        'sources': described,
+        'images_sha256': files_digest.hexdigest(),
+        'chunk_size': chunk_size,
+        'output': output,
+        'normalize': normalize
+    }
+
+# Reading (worker processes)
+
+_WORKER = {}
+
+def _to_float(array, normalize):
+    """NCHW float32 tensor in the training normalization from uint8 (NHWC/NCHW) or float arrays"""
+    array = np.asarray(array)
+    if array.ndim == 4 and array.shape[-1] == 3 and array.shape[1] != 3:
+        array = array.transpose(0, 3, 1, 2)
+    if array.shape[1:] != INPUT_SHAPE:
+        raise ValueError(f"Inputs must be 32x32 RGB, got shape {array.shape[1:]}")
+    if array.dtype == np.uint8:
+        tensor = torch.from_numpy(np.ascontiguousarray(array)).float().div_(255)
+        normalize = True
+    else:
+        tensor = torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32))
+    return (tensor - 0.5) / 0.5 if normalize else tensor
+
+def _read_images(paths):
+    from PIL import Image
+    batch = np.empty((len(paths), 32, 32, 3), dtype=np.uint8)
+    for i, path in enumerate(paths):
+        with Image.open(path) as image:
+            image = image.convert('RGB')
+            if image.size != (32, 32):
+                image = image.resize((32, 32), Image.BILINEAR)
+            batch[i] = np.asarray(image)
+    return batch
+
+def _source_array(source):
+    """Array-like view of a non-image source (memory-mapped where the format allows)"""
+    cache = _WORKER.setdefault('arrays', {})
+    if source['path'] not in cache:
+        if source['kind'] == 'npy':
+            array = np.load(source['path'], mmap_mode='r')
+        elif source['kind'] == 'npz':
+            cache.clear()  # Compressed members load whole: keep one shard per worker
+            with np.load(source['path']) as archive:
+                array = archive[source['key']]
+        elif source['kind'] == 'cifar_bin':
+            # Label byte + 3072 pixel bytes per record; pixels are sliced out per batch, never copied whole
+            array = np.memmap(source['path'], dtype=np.uint8, mode='r').reshape(-1, CIFAR_RECORD_BYTES)
+        else:
+            cache.clear()
+            with open(source['path'], 'rb') as f:
+                # The python CIFAR format is a pickle: only point this at the official batch files
+                array = pickle.load(f, encoding='bytes')[b'data'].reshape(-1, *INPUT_SHAPE)
+        cache[source['path']] = array
+    return cache[source['path']]
+
+def _batches(source, start, count, batch_size, files):
+    """Raw arrays for consecutive mini-batches of a chunk"""
+    for begin in range(0, count, batch_size):
+        size = min(batch_size, count - begin)
+        if source['kind'] == 'images':
+            yield _read_images(files[begin:begin + size])
+            continue
+        rows = _source_array(source)[start + begin:start + begin + size]
+        yield rows[:, 1:].reshape(-1, *INPUT_SHAPE) if source['kind'] == 'cifar_bin' else rows
+
+def _prefetch(iterator, normalize, depth):
+    """Decode mini-batches on a background thread while the caller runs the model"""
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for raw in iterator:
+                buffer.put(_to_float(raw, normalize))
+        except BaseException as e:
+            buffer.put(e)
+        buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+def _init_worker(model_path, mode, threads, out_dir, settings):
+    torch.set_num_threads(threads)
+    from inference_server import load_servable
+    device = torch.device('cpu')
+    module, mode = load_servable(model_path, device, resolve_mode(mode, device))
+    _WORKER.update({
+        'module': module, 'mode': mode, 'device': device, 'settings': settings,
+        'predictions': np.load(os.path.join(out_dir, PREDICTIONS_FILE), mmap_mode='r+')
+                       if settings['output'] in ('predictions', 'both') else None,
+        'logits': np.load(os.path.join(out_dir, LOGITS_FILE), mmap_mode='r+')
+                  if settings['output'] in ('logits', 'both') else None
+    })
+
+def run_chunk(chunk, source, files=None):
+    """Score one chunk and write its rows into the output memmaps; returns (chunk_id, rows, seconds)"""
+    chunk_id, offset, _, start, count = chunk
+    settings = _WORKER['settings']
+    started = time.perf_counter()
+    row = offset
+    batches = _batches(source, start, count, settings['batch_size'], files)
+    with inference_context(_WORKER['mode']):
+        for inputs in _prefetch(batches, settings['normalize'], settings['prefetch']):
+            logits = _WORKER['module'](prepare_input(inputs, _WORKER['mode'], _WORKER['device'])).float()
+            end = row + logits.shape[0]
+            if _WORKER['predictions'] is not None:
+                _WORKER['predictions'][row:end] = logits.argmax(dim=1).numpy()
+            if _WORKER['logits'] is not None:
+                _WORKER['logits'][row:end] = logits.numpy()
+            row = end
+    for output in (_WORKER['predictions'], _WORKER['logits']):
+        if output is not None:
+            output.flush()
+    return chunk_id, row - offset, time.perf_counter() - started
+
+# Orchestration
+
+def prepare_outputs(out_dir, config, sources, num_chunks, num_classes, logits_dtype, resume):
+    """Create (or reopen for resume) the output memmaps and done bitmap; returns the bitmap"""
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    done_path = os.path.join(out_dir, DONE_FILE)
+    if resume and os.path.exists(manifest_path) and os.path.exists(done_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous['config'] != config:
+            raise ValueError(f"{out_dir} holds a run with different inputs, model or settings; "
+                             f"use a new --out-dir or drop --resume")
+        return np.load(done_path, mmap_mode='r+')
+    if not resume and os.path.exists(manifest_path):
+        raise ValueError(f"{out_dir} already holds a run; pass --resume to continue it or pick a new --out-dir")
+    os.makedirs(out_dir, exist_ok=True)
+    total = sum(s['count'] for s in sources)
+    if config['output'] in ('predictions', 'both'):
+        np.lib.format.open_memmap(os.path.join(out_dir, PREDICTIONS_FILE), mode='w+', dtype=np.int16,
+                                  shape=(total,)).flush()
+    if config['output'] in ('logits', 'both'):
+        np.lib.format.open_memmap(os.path.join(out_dir, LOGITS_FILE), mode='w+', dtype=logits_dtype,
+                                  shape=(total, num_classes)).flush()
+    image_files = [f for s in sources for f in s.get('files', [])]
+    if image_files:
+        with atomic_write(os.path.join(out_dir, IMAGES_FILE), 'w', encoding='utf-8') as f:
+            f.writelines(f"{path}\n" for path in image_files)
+    done = np.lib.format.open_memmap(done_path, mode='w+', dtype=np.uint8, shape=(num_chunks,))
+    done.flush()
+    offsets = np.cumsum([0] + [s['count'] for s in sources]).tolist()
+    with atomic_write(manifest_path, 'w') as f:
+        json.dump({'config': config, 'rows': total, 'chunks': num_chunks,
+                   'source_offsets': [{'path': s['path'], 'first_row': offsets[i], 'count': s['count']}
+                                      for i, s in enumerate(sources)],
+                   'created': time.strftime('%Y-%m-%d %H:%M:%S')}, f, indent=1)
+    return done
+
+def run_batch_inference(model_path, inputs, out_dir, output='predictions', workers=None, threads=None,
+                        batch_size=256, chunk_size=4096, prefetch=2, mode=DEFAULT_INFERENCE_MODE,
+                        normalize=False, logits_dtype='float16', resume=False, progress=None):
+    """Score every input with a model, sharded over worker processes; returns a summary dict"""
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output '{output}' (use one of {OUTPUTS})")
+    sources = discover_sources(inputs)
+    if not sources:
+        raise ValueError("No inputs found")
+    chunks = plan_chunks(sources, chunk_size)
+    config = run_config(model_path, sources, chunk_size, output, normalize)
+    done = prepare_outputs(out_dir, config, sources, len(chunks), NUM_CLASSES, np.dtype(logits_dtype), resume)
+    pending = [chunk for chunk in chunks if not done[chunk[0]]]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    settings = {'output': output, 'batch_size': batch_size, 'prefetch': prefetch, 'normalize': normalize}
+    total_rows = sum(chunk[4] for chunk in pending)
+    rows_done = 0
+    in_flight = set()
+
+    def collect():
+        nonlocal rows_done, in_flight
+        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in finished:
+            chunk_id, rows, _ = future.result()
+            done[chunk_id] = 1
+            done.flush()  # Only after the worker flushed the rows
+            rows_done += rows
+            if progress is not None:
+                progress(rows_done, total_rows)
+
+    started = time.perf_counter()
+    with host_cores(), ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_init_worker,
+                                           initargs=(model_path, mode, threads, out_dir, settings)) as pool:
+        for chunk in pending:
+            # A bounded window of submitted chunks keeps the parent's memory flat for huge inputs
+            if len(in_flight) >= workers * 2:
+                collect()
+            source = sources[chunk[2]]
+            files = source['files'][chunk[3]:chunk[3] + chunk[4]] if source['kind'] == 'images' else None
+            in_flight.add(pool.submit(run_chunk, chunk, {k: v for k, v in source.items() if k != 'files'}, files))
+        while in_flight:
+            collect()
+    elapsed = time.perf_counter() - started
+    return {
+        'out_dir': out_dir,
+        'rows': int(sum(s['count'] for s in sources)),
+        'scored_now': rows_done,
+        'skipped_chunks': len(chunks) - len(pending),
+        'workers': workers,
+        'threads_per_worker': threads,
+        'seconds': elapsed,
+        'rows_per_sec': rows_done / elapsed if elapsed > 0 else 0.0
+    }
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('inputs', nargs='+', help='image folders, .npy/.npz shards or CIFAR-10 batch files/dirs')
+    parser.add_argument('--model-path', type=str, required=True, help='checkpoint or TorchScript artifact')
+    parser.add_argument('--out-dir', type=str, required=True)
+    parser.add_argument('--output', type=str, default='predictions', choices=list(OUTPUTS))
+    parser.add_argument('--logits-dtype', type=str, default='float16', choices=['float16', 'float32'])
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: one per core)')
+    parser.add_argument('--threads', type=int, default=None, help='intra-op threads per process')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--chunk-size', type=int, default=4096, help='rows per unit of work (and of resume)')
+    parser.add_argument('--prefetch', type=int, default=2, help='decoded mini-batches buffered per worker')
+    parser.add_argument('--inference-mode', type=str, default=DEFAULT_INFERENCE_MODE, choices=list(INFERENCE_MODES))
+    parser.add_argument('--normalize', action='store_true', help='float inputs are 0..1 pixels (uint8 always are)')
+    parser.add_argument('--resume', action='store_true', help='continue an interrupted run in --out-dir')
+    args = parser.parse_args()
+
+    def show(done, total):
+        print(f"\r{done}/{total} rows", end='', file=sys.stderr, flush=True)
+
+    summary = run_batch_inference(args.model_path, args.inputs, args.out_dir, output=args.output,
+                                  workers=args.workers, threads=args.threads, batch_size=args.batch_size,
+                                  chunk_size=args.chunk_size, prefetch=args.prefetch, mode=args.inference_mode,
+                                  normalize=args.normalize, logits_dtype=args.logits_dtype, resume=args.resume,
+                                  progress=show)
+    print(file=sys.stderr)
+    print(json.dumps(summary, indent=2))
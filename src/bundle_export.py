@@ -0,0 +1,211 @@
+"""
+Export Bundles
+- One zip / tar.gz per hand-off: checkpoints, stats JSON and generated figures
+- Files are streamed into the archive chunk by chunk (flat memory use)
+- Optional conversion to the flat format or a sparse (mask + values) layout
+- Written under exports/ in the app directory with unguessable (uuid4) names, outside the
+  statically served folder; the dashboard hands them out with a download button
+"""
+
+import os
+import io
+import re
+import json
+import time
+import uuid
+import tarfile
+import zipfile
+import argparse
+import tempfile
+import numpy as np
+import torch
+from checkpoint_io import load_state_dict
+from flat_checkpoint import FLAT_SUFFIX, save_flat, load_flat, read_flat_metadata
+from coordination import atomic_path
+from model_index import get_checkpoint_metadata
+from lineage import get_entry as get_lineage_entry
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPORT_DIR = os.path.join(APP_DIR, 'exports')
+ARCHIVE_FORMATS = {'zip': '.zip', 'tar.gz': '.tar.gz'}
+BUNDLE_CHECKPOINT_FORMATS = ('original', 'safetensors', 'sparse')
+SPARSE_SUFFIX = '.sparse.safetensors'
+SPARSE_MIN_SPARSITY = 0.5
+# File names of the per-model figures after the model's stem (visualize jobs, activation maps)
+FIGURE_PATTERNS = (r'dist_\w+_dist', r'heatmap_\w+_heatmap', r'sparsity_analysis', r'stats_layer_stats',
+                   r'activations_\w+')
+
+def write_sparse_checkpoint(state_dict, path):
+    """Flat file where mostly-zero tensors are stored as a packed mask plus non-zero values"""
+    tensors = {}
+    layout = {}
+    for name, tensor in state_dict.items():
+        if not torch.is_tensor(tensor):
+            continue
+        tensor = tensor.detach().cpu()
+        mask = tensor != 0
+        if tensor.numel() and 1 - mask.sum().item() / tensor.numel() >= SPARSE_MIN_SPARSITY:
+            tensors[name + '.__mask__'] = torch.from_numpy(np.packbits(mask.reshape(-1).numpy()))
+            tensors[name + '.__values__'] = tensor[mask].contiguous()
+            layout[name] = list(tensor.shape)
+        else:
+            tensors[name] = tensor
+    return save_flat(tensors, path, metadata={'sparse_layout': json.dumps(layout)})
+
+def read_sparse_checkpoint(path):
+    """Dense state_dict from a sparse flat file"""
+    layout = json.loads(read_flat_metadata(path).get('sparse_layout', '{}'))
+    stored = load_flat(path)
+    state = {}
+    for name, tensor in stored.items():
+        if name.endswith(('.__mask__', '.__values__')):
+            continue
+        state[name] = tensor
+    for name, shape in layout.items():
+        values = stored[name + '.__values__']
+        numel = int(np.prod(shape)) if shape else 1
+        mask = torch.from_numpy(np.unpackbits(stored[name + '.__mask__'].numpy(), count=numel).astype(bool))
+        dense = torch.zeros(numel, dtype=values.dtype)
+        dense[mask] = values
+        state[name] = dense.reshape(shape)
+    return state
+
+def figures_for(model_path, assets_dir='assets'):
+    """Figures generated for a checkpoint: its exact stem followed by a known plot kind"""
+    if not os.path.isdir(assets_dir):
+        return []
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    # A bare stem prefix would also pick up another model's figures (baseline_ -> baseline_v2_*)
+    pattern = re.compile(re.escape(stem) + r'_(?:' + '|'.join(FIGURE_PATTERNS) + r')\.png')
+    return sorted(os.path.join(assets_dir, f) for f in os.listdir(assets_dir) if pattern.fullmatch(f))
+
+def model_stats(model_path):
+    """Stats JSON for a checkpoint: index metadata plus lineage"""
+    stats = dict(get_checkpoint_metadata(model_path) or {})
+    stats['lineage'] = get_lineage_entry(model_path)
+    return stats
+
+class _ArchiveWriter:
+    """Minimal common interface over zipfile and tarfile"""
+
+    def __init__(self, path, archive):
+        self.archive = archive
+        if archive == 'zip':
+            self._handle = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6, allowZip64=True)
+        elif archive == 'tar.gz':
+            self._handle = tarfile.open(path, 'w:gz', compresslevel=6)
+        else:
+            raise ValueError(f"Unknown archive format '{archive}' (use one of {sorted(ARCHIVE_FORMATS)})")
+
+    def add_file(self, path, arcname):
+        # Both writers copy from disk in fixed-size chunks
+        if self.archive == 'zip':
+            self._handle.write(path, arcname)
+        else:
+            self._handle.add(path, arcname=arcname, recursive=False)
+
+    def add_bytes(self, data, arcname):
+        if self.archive == 'zip':
+            self._handle.writestr(arcname, data)
+        else:
+            info = tarfile.TarInfo(arcname)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._handle.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self._handle.close()
+
+def _checkpoint_entry(model_path, checkpoint_format, scratch_dir):
+    """(file to add, archive name) for a checkpoint in the requested format"""
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    if checkpoint_format == 'original' and model_path.endswith(('.pth', FLAT_SUFFIX)):
+        return model_path, os.path.basename(model_path)
+    state = load_state_dict(model_path, map_location='cpu')
+    if checkpoint_format == 'sparse':
+        out = os.path.join(scratch_dir, stem + SPARSE_SUFFIX)
+        write_sparse_checkpoint(state, out)
+    else:
+        # Store manifests and deltas have no standalone meaning outside this machine
+        out = os.path.join(scratch_dir, stem + FLAT_SUFFIX)
+        save_flat(state, out)
+    return out, os.path.basename(out)
+
+def write_bundle(model_paths, out_path=None, archive='zip', checkpoint_format='original',
+                 include_checkpoints=True, include_figures=True, extra_files=None, assets_dir='assets'):
+    """Write an export bundle incrementally and move it into place; returns its path"""
+    if checkpoint_format not in BUNDLE_CHECKPOINT_FORMATS:
+        raise ValueError(f"Unknown checkpoint format '{checkpoint_format}' (use one of {BUNDLE_CHECKPOINT_FORMATS})")
+    if out_path is None:
+        name = f"bundle_{uuid.uuid4().hex}{ARCHIVE_FORMATS.get(archive, '')}"
+        out_path = os.path.join(EXPORT_DIR, name)
+    contents = []
+    with atomic_path(out_path) as tmp_path:
+        writer = _ArchiveWriter(tmp_path, archive)
+        try:
+            with tempfile.TemporaryDirectory() as scratch_dir:
+                for model_path in model_paths:
+                    stem = os.path.splitext(os.path.basename(model_path))[0]
+                    entry = {'model': os.path.basename(model_path), 'files': []}
+                    if include_checkpoints:
+                        src, arcname = _checkpoint_entry(model_path, checkpoint_format, scratch_dir)
+                        writer.add_file(src, f"{stem}/{arcname}")
+                        entry['files'].append(f"{stem}/{arcname}")
+                        if src != model_path:
+                            os.remove(src)  # Keep scratch usage to one checkpoint at a time
+                    stats = json.dumps(model_stats(model_path), indent=2, default=str).encode('utf-8')
+                    writer.add_bytes(stats, f"{stem}/stats.json")
+                    entry['files'].append(f"{stem}/stats.json")
+                    if include_figures:
+                        for figure in figures_for(model_path, assets_dir):
+                            arcname = f"{stem}/figures/{os.path.basename(figure)}"
+                            writer.add_file(figure, arcname)
+                            entry['files'].append(arcname)
+                    contents.append(entry)
+                for path, arcname in extra_files or []:
+                    writer.add_file(path, arcname)
+                summary = {
+                    'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'checkpoint_format': checkpoint_format if include_checkpoints else None,
+                    'models': contents,
+                    'extra_files': [arcname for _, arcname in extra_files or []]
+                }
+                writer.add_bytes(json.dumps(summary, indent=2).encode('utf-8'), 'bundle.json')
+        finally:
+            writer.close()
+    return out_path
+
+def list_bundles(out_dir=EXPORT_DIR):
+    """Finished bundles, newest first"""
+    if not os.path.isdir(out_dir):
+        return []
+    paths = [os.path.join(out_dir, f) for f in os.listdir(out_dir) if f.endswith(tuple(ARCHIVE_FORMATS.values()))]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+def remove_old_bundles(max_age_hours=24, out_dir=EXPORT_DIR):
+    """Delete bundles older than max_age_hours; returns how many were removed"""
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in list_bundles(out_dir):
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
+
+def download_name(path, created=None):
+    """Readable file name for handing a bundle out (the name on disk is random)"""
+    created = os.path.getmtime(path) if created is None else created
+    suffix = next((s for s in ARCHIVE_FORMATS.values() if path.endswith(s)), '')
+    return f"bundle_{time.strftime('%Y%m%d_%H%M%S', time.localtime(created))}{suffix}"
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('models', nargs='+', help='checkpoints to bundle')
+    parser.add_argument('--out', type=str, default=None)
+    parser.add_argument('--archive', type=str, default='zip', choices=list(ARCHIVE_FORMATS))
+    parser.add_argument('--checkpoint-format', type=str, default='original', choices=list(BUNDLE_CHECKPOINT_FORMATS))
+    parser.add_argument('--no-figures', action='store_true')
+    args = parser.parse_args()
+    path = write_bundle(args.models, args.out, archive=args.archive, checkpoint_format=args.checkpoint_format,
+                        include_figures=not args.no_figures)
+    print('Wrote bundle', path)
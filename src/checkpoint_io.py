@@ -0,0 +1,239 @@
+"""
+Checkpoint Access Layer
+- Zero-copy loading via torch.load(mmap=True, weights_only=True), with fallbacks
+  for older PyTorch versions and legacy (non-zip) checkpoints
+- Flat (safetensors-compatible) checkpoints are mapped directly, without pickle
+- Model store manifests resolve to memory-mapped, deduplicated tensor blobs
+- Delta checkpoints are rebuilt from their parent and packed pruning masks
+- Lazy, by-name tensor access
+- Streaming per-tensor statistics (numel, zeros, min/max/mean/std, histogram)
+- Logical (tensor payload) and physical (on-disk) sizes measured the same way for every format
+"""
+
+import os
+import pickle
+import torch
+from model import fix_state_dict
+from flat_checkpoint import FLAT_SUFFIX, is_flat_checkpoint, load_flat, save_flat, read_flat_header
+from model_store import (MANIFEST_SUFFIX, is_manifest, load_manifest, save_manifest, delete_manifest, manifest_nbytes,
+                         manifest_disk_nbytes, read_manifest)
+from delta_checkpoint import (DELTA_SUFFIX, MASK_SUFFIX, is_delta, load_delta, save_delta, materialize_dependents,
+                              read_delta_info, resolve_parent)
+from coordination import atomic_torch_save
+
+STATS_CHUNK_NUMEL = 1 << 22
+CHECKPOINT_FORMATS = {'pth': '.pth', 'safetensors': FLAT_SUFFIX, 'manifest': MANIFEST_SUFFIX, 'delta': DELTA_SUFFIX}
+# Formats that need a parent checkpoint to be written or read
+DERIVED_FORMATS = ('delta',)
+MODEL_FILE_SUFFIXES = tuple(CHECKPOINT_FORMATS.values())
+
+_TENSOR_SIZES_MEMO = {}  # path -> ((size, mtime_ns), {tensor: nbytes})
+
+def checkpoint_path(path, fmt='pth'):
+    """Swap a checkpoint path's extension for the one used by a format"""
+    if fmt not in CHECKPOINT_FORMATS:
+        raise ValueError(f"Unknown checkpoint format '{fmt}' (use one of {sorted(CHECKPOINT_FORMATS)})")
+    stem = path[:-len(FLAT_SUFFIX)] if is_flat_checkpoint(path) else os.path.splitext(path)[0]
+    return stem + CHECKPOINT_FORMATS[fmt]
+
+def save_state_dict(state_dict, path, metadata=None, parent_path=None):
+    """Write a state_dict in the format implied by the path's extension"""
+    if os.path.exists(path):
+        materialize_dependents(path)  # Deltas pin the bytes about to be replaced
+    if is_delta(path):
+        if parent_path is None:
+            raise ValueError("Delta checkpoints need the parent checkpoint they were derived from")
+        return save_delta(state_dict, path, parent_path, metadata=metadata)
+    if is_flat_checkpoint(path):
+        return save_flat(state_dict, path, metadata=metadata)
+    if is_manifest(path):
+        return save_manifest(state_dict, path, metadata=metadata)
+    return atomic_torch_save(state_dict, path)
+
+def delete_checkpoint_file(path):
+    """Remove a checkpoint (manifests also release their store blobs)"""
+    if is_manifest(path):
+        delete_manifest(path)
+    else:
+        os.remove(path)
+
+def _tensor_sizes(path):
+    """Bytes per tensor of the state_dict a checkpoint loads as (headers only where the format has one)"""
+    stat = os.stat(path)
+    memo = _TENSOR_SIZES_MEMO.get(path)
+    if memo and memo[0] == (stat.st_size, stat.st_mtime_ns):
+        return memo[1]
+    if is_manifest(path):
+        sizes = {name: entry['nbytes'] for name, entry in read_manifest(path)['tensors'].items()}
+    elif is_flat_checkpoint(path) or is_delta(path):
+        header, _, _ = read_flat_header(path)
+        stored = {name: entry['data_offsets'][1] - entry['data_offsets'][0] for name, entry in header.items()}
+        if is_delta(path):
+            # Masked tensors take the parent's size; dropped ones are gone
+            info = read_delta_info(path)
+            sizes = {name: n for name, n in _tensor_sizes(resolve_parent(path, info)).items()
+                     if name not in info['dropped']}
+            sizes.update({name: n for name, n in stored.items() if not name.endswith(MASK_SUFFIX)})
+        else:
+            sizes = stored
+    else:
+        state = load_state_dict(path, map_location='cpu', normalize=False)
+        sizes = {name: t.numel() * t.element_size() for name, t in state.items() if torch.is_tensor(t)}
+    _TENSOR_SIZES_MEMO[path] = ((stat.st_size, stat.st_mtime_ns), sizes)
+    return sizes
+
+def checkpoint_nbytes(path):
+    """Logical checkpoint size: the tensor payload of the state_dict it loads as, in any format"""
+    if is_manifest(path):
+        return manifest_nbytes(path)
+    return sum(_tensor_sizes(path).values())
+
+def checkpoint_disk_nbytes(path):
+    """Physical checkpoint size: bytes on disk (a delta without its parent, a manifest with its share of blobs)"""
+    if is_manifest(path):
+        return manifest_disk_nbytes(path)
+    return os.path.getsize(path)
+
+def load_state_dict(path, map_location='cpu', mmap=True, trusted=True, parent_loader=None, normalize=True):
+    """Load a checkpoint's state_dict, memory-mapped where the file format allows it"""
+    fix = fix_state_dict if normalize else (lambda state: state)
+    if is_delta(path):
+        return fix(load_delta(path, map_location=map_location, parent_loader=parent_loader))
+    if is_flat_checkpoint(path):
+        return fix(load_flat(path, map_location=map_location))
+    if is_manifest(path):
+        return fix(load_manifest(path, map_location=map_location))
+    state = None
+    if mmap:
+        try:
+            state = torch.load(path, map_location=map_location, mmap=True, weights_only=True)
+        except TypeError:
+            # PyTorch < 2.1 has no mmap argument
+            pass
+        except (RuntimeError, pickle.UnpicklingError):
+            # Legacy serialization cannot be mapped, or the pickle holds more than tensors
+            pass
+    if state is None:
+        try:
+            state = torch.load(path, map_location=map_location, weights_only=True)
+        except TypeError:
+            if not trusted:
+                raise ValueError("This PyTorch version has no weights_only loading; refusing an untrusted checkpoint")
+            state = torch.load(path, map_location=map_location)
+        except (RuntimeError, pickle.UnpicklingError):
+            if not trusted:
+                raise
+            state = torch.load(path, map_location=map_location)
+    return fix(state)
+
+def compute_tensor_stats(tensor, bins=100, chunk_numel=STATS_CHUNK_NUMEL):
+    """Statistics for one tensor, computed chunk by chunk so only touched pages are read"""
+    flat = tensor.reshape(-1)
+    numel = flat.numel()
+    stats = {
+        'shape': list(tensor.shape),
+        'dtype': str(tensor.dtype).replace('torch.', ''),
+        'numel': numel,
+        'zeros': 0,
+        'sparsity': 0.0,
+        'min': 0.0,
+        'max': 0.0,
+        'mean': 0.0,
+        'std': 0.0,
+        'hist_counts': [],
+        'hist_edges': []
+    }
+    if numel == 0:
+        return stats
+
+    zeros = 0
+    total = 0.0
+    total_sq = 0.0
+    minimum = float('inf')
+    maximum = float('-inf')
+    for start in range(0, numel, chunk_numel):
+        chunk = flat[start:start + chunk_numel].double()
+        zeros += int((chunk == 0).sum())
+        total += float(chunk.sum())
+        total_sq += float((chunk * chunk).sum())
+        minimum = min(minimum, float(chunk.min()))
+        maximum = max(maximum, float(chunk.max()))
+    mean = total / numel
+    variance = max(total_sq / numel - mean * mean, 0.0)
+
+    # Second pass: histogram over the now-known range
+    counts = torch.zeros(bins, dtype=torch.float64)
+    upper = maximum if maximum > minimum else minimum + 1e-12
+    for start in range(0, numel, chunk_numel):
+        chunk = flat[start:start + chunk_numel].double()
+        counts += torch.histc(chunk, bins=bins, min=minimum, max=upper)
+    edges = torch.linspace(minimum, upper, bins + 1, dtype=torch.float64)
+
+    stats.update({
+        'zeros': zeros,
+        'sparsity': zeros / numel,
+        'min': minimum,
+        'max': maximum,
+        'mean': mean,
+        'std': variance ** 0.5,
+        'hist_counts': [int(c) for c in counts.tolist()],
+        'hist_edges': edges.tolist()
+    })
+    return stats
+
+class LazyCheckpoint:
+    """Read-only, by-name view of a checkpoint whose tensors are paged in on access"""
+
+    def __init__(self, path, trusted=True):
+        self.path = path
+        self.trusted = trusted
+        self._state = None
+
+    def _ensure(self):
+        if self._state is None:
+            self._state = load_state_dict(self.path, map_location='cpu', mmap=True, trusted=self.trusted)
+        return self._state
+
+    def keys(self):
+        return list(self._ensure().keys())
+
+    def shapes(self):
+        """Tensor shapes without touching tensor data"""
+        return {k: list(v.shape) for k, v in self._ensure().items() if torch.is_tensor(v)}
+
+    def __getitem__(self, name):
+        return self._ensure()[name]
+
+    def __contains__(self, name):
+        return name in self._ensure()
+
+    def __len__(self):
+        return len(self._ensure())
+
+    def tensor_stats(self, name, bins=100):
+        """Streaming statistics for a single tensor"""
+        return compute_tensor_stats(self[name], bins=bins)
+
+    def iter_stats(self, bins=100, weights_only=False):
+        """Yield (name, stats) one tensor at a time"""
+        for name, tensor in self._ensure().items():
+            if not torch.is_tensor(tensor):
+                continue
+            if weights_only and 'weight' not in name:
+                continue
+            yield name, compute_tensor_stats(tensor, bins=bins)
+
+    def close(self):
+        """Release the mapping"""
+        self._state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def open_checkpoint(path, trusted=True):
+    """Lazy handle on a checkpoint"""
+    return LazyCheckpoint(path, trusted=trusted)
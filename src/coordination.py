@@ -0,0 +1,160 @@
+"""
+Coordination
+- SingleFlight: concurrent callers with the same key share one computation (optionally on a
+  helper thread, with progress reported to every waiting caller)
+- file_lock: inter-process advisory lock (fcntl, msvcrt fallback)
+- atomic_write / atomic_path: unique temp file next to the target, fsync, then os.replace
+- atomic_torch_save / atomic_savefig for checkpoints and figures
+"""
+
+import os
+import uuid
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False  # The leader was interrupted (not a failure of fn itself)
+        self.progress = None
+
+class SingleFlight:
+    """Per-key coalescing: the first caller computes, concurrent callers wait for its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, on_wait=None, poll_seconds=0.1):
+        """Return fn() for key, sharing one in-flight call between concurrent callers"""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                if on_wait is None:
+                    self._run(key, call, fn)
+                else:
+                    # Every caller, the leader too, polls on_wait(progress) from its own thread: fn never
+                    # touches one caller's UI, and an interrupted caller does not abort the shared call
+                    threading.Thread(target=self._run, args=(key, call, fn), name='single-flight', daemon=True).start()
+            while not call.done.wait(poll_seconds if on_wait is not None else None):
+                on_wait(call.progress)
+            if call.abandoned:
+                continue  # Interrupted leader (e.g. a script rerun): take over as the new leader
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def report(self, key, progress):
+        """Publish progress for key's in-flight call to everyone waiting on it"""
+        with self._lock:
+            call = self._calls.get(key)
+        if call is not None:
+            call.progress = progress
+
+    def _run(self, key, call, fn):
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        except BaseException:
+            # Control-flow exceptions (script stop/rerun, KeyboardInterrupt) belong to this caller only
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self, key):
+        """Whether a computation for key is running"""
+        with self._lock:
+            return key in self._calls
+
+def lock_path_for(path):
+    """Hidden lock file next to path"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.lock")
+
+@contextmanager
+def file_lock(path, shared=False):
+    """Hold an advisory lock on path (created if needed); shared locks need fcntl"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a+b') as f:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # Retries for ~10s, then raises
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _temp_name(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+@contextmanager
+def atomic_path(path):
+    """Temp path to write instead of path; renamed over it only if the block succeeds"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = _temp_name(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None, fsync=True):
+    """Open a temp file for writing; readers only ever see the old or the complete new file"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode.replace('w', 'x'), encoding=encoding) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+def atomic_torch_save(obj, path):
+    """torch.save without ever exposing a partially written file"""
+    import torch
+    with atomic_write(path, 'wb') as f:
+        torch.save(obj, f)
+    return path
+
+def atomic_savefig(path, fig=None, **kwargs):
+    """Figure.savefig (or the current pyplot figure) written atomically"""
+    if fig is None:
+        import matplotlib.pyplot as plt
+        fig = plt.gcf()
+    kwargs.setdefault('format', os.path.splitext(path)[1].lstrip('.') or 'png')
+    with atomic_write(path, 'wb', fsync=False) as f:
+        fig.savefig(f, **kwargs)
+    return path
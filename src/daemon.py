@@ -0,0 +1,259 @@
+"""
+Warm Worker Daemon
+- Long-lived local process serving prune, evaluate, visualize, report and complexity commands
+- Keeps torch, matplotlib, the decoded CIFAR-10 test set and recently used checkpoints in memory
+- Newline-delimited JSON over a Unix socket (loopback TCP where AF_UNIX is unavailable)
+- Progress is streamed back to the client; a client that disconnects cancels its command
+- Commands are admitted by the resource governor, which shares the host cores lock with the job workers
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import itertools
+import subprocess
+import socketserver
+from coordination import file_lock, lock_path_for, atomic_write
+
+DEFAULT_SOCKET_PATH = os.path.join('jobs', 'daemon.sock')
+PORT_FILE = os.path.join('jobs', 'daemon.port')
+DAEMON_LOG = os.path.join('jobs', 'daemon.log')
+UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+DEFAULT_CACHE_MB = 1024
+START_TIMEOUT_SECONDS = 120  # First start may download CIFAR-10
+
+class DaemonError(Exception):
+    """A command failed inside the daemon, or the daemon could not be reached"""
+
+# Client side (no torch import, so scripted callers start instantly)
+
+def daemon_address(socket_path=DEFAULT_SOCKET_PATH):
+    """Socket path, or ('127.0.0.1', port) from the port file; None if no daemon advertised one"""
+    if UNIX_SOCKETS:
+        return socket_path
+    try:
+        with open(PORT_FILE) as f:
+            return ('127.0.0.1', int(f.read().strip()))
+    except (OSError, ValueError):
+        return None
+
+def connect(socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+    """Open a connection to the daemon (raises OSError if none is listening)"""
+    address = daemon_address(socket_path)
+    if address is None:
+        raise ConnectionRefusedError(f"No daemon port file at {PORT_FILE}")
+    sock = socket.socket(socket.AF_UNIX if UNIX_SOCKETS else socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def send_message(stream, message):
+    """Write one JSON line"""
+    stream.write((json.dumps(message) + '\n').encode('utf-8'))
+    stream.flush()
+
+def request(kind, spec=None, socket_path=DEFAULT_SOCKET_PATH, on_progress=None, timeout=None):
+    """Run one command in the daemon and return its result; progress events go to on_progress"""
+    try:
+        sock = connect(socket_path, timeout)
+    except OSError as e:
+        raise DaemonError(f"Daemon not reachable at {socket_path}: {e}")
+    with sock, sock.makefile('rwb') as stream:
+        send_message(stream, {'kind': kind, 'spec': spec or {}})
+        for line in stream:
+            message = json.loads(line)
+            event = message.get('event')
+            if event == 'progress':
+                if on_progress is not None:
+                    on_progress(message['progress'], message.get('message'))
+            elif event == 'result':
+                return message['result']
+            elif event == 'error':
+                raise DaemonError(message['error'])
+    raise DaemonError("Daemon closed the connection without a result")
+
+def is_running(socket_path=DEFAULT_SOCKET_PATH):
+    """Whether a daemon answers on socket_path"""
+    try:
+        request('ping', socket_path=socket_path, timeout=5)
+        return True
+    except (DaemonError, OSError, ValueError):
+        return False
+
+def start_daemon(socket_path=DEFAULT_SOCKET_PATH, cache_mb=DEFAULT_CACHE_MB, wait=START_TIMEOUT_SECONDS):
+    """Start a detached daemon unless one is running; waits until it answers"""
+    with file_lock(lock_path_for(socket_path)):
+        if is_running(socket_path):
+            return True
+        cmd = [sys.executable, os.path.abspath(__file__), '--socket', socket_path, '--cache-mb', str(cache_mb)]
+        popen_kwargs = {}
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            popen_kwargs['start_new_session'] = True
+        os.makedirs(os.path.dirname(DAEMON_LOG) or '.', exist_ok=True)
+        with open(DAEMON_LOG, 'ab') as log:
+            process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                       **popen_kwargs)
+        deadline = time.time() + wait
+        while time.time() < deadline:
+            if process.poll() is not None:
+                return False  # Exited during warm-up; see the daemon log
+            if is_running(socket_path):
+                return True
+            time.sleep(0.5)
+        return False
+
+# Server side
+
+class StreamContext:
+    """JobContext stand-in that streams progress to the client instead of heartbeating the queue"""
+
+    def __init__(self, job, stream):
+        self.job = job
+        self.stream = stream
+
+    def progress(self, fraction, message=None):
+        try:
+            send_message(self.stream, {'event': 'progress', 'progress': round(fraction, 4), 'message': message})
+        except OSError:
+            from job_worker import JobCancelled
+            raise JobCancelled()  # Client went away: nobody is waiting for the result
+
+    def scaled(self, start, end, message):
+        return lambda done, total: self.progress(start + (end - start) * done / max(1, total), message)
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                send_message(self.wfile, {'event': 'error', 'error': 'Malformed request'})
+                return
+            self.server.warm_daemon.dispatch(message, self.wfile)
+
+if UNIX_SOCKETS:
+    class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+        daemon_threads = True
+
+class WarmDaemon:
+    """Holds the warm runtime and runs commands through the job worker handlers"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, cache_mb=DEFAULT_CACHE_MB, max_concurrent=1,
+                 preload=True):
+        # Job handlers share pyplot's process-global state, so commands default to one at a time
+        import matplotlib
+        matplotlib.use('Agg')
+        import job_worker
+        from evaluation import preload_test_set
+        from resource_governor import ResourceGovernor
+        self.socket_path = socket_path
+        self.worker = job_worker
+        self.state_cache = job_worker.enable_state_cache(cache_mb * 1024 * 1024)
+        self.governor = ResourceGovernor(max_concurrent=max_concurrent)
+        self.test_samples = preload_test_set() if preload else 0
+        self.started = time.time()
+        self.served = 0
+        self.failed = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.server = None
+
+    def status(self):
+        """Uptime, counters, governor queue and checkpoint cache"""
+        with self._lock:
+            served, failed = self.served, self.failed
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': time.time() - self.started,
+            'served': served,
+            'failed': failed,
+            'test_samples_in_memory': self.test_samples,
+            'governor': self.governor.status(),
+            'state_cache': self.state_cache.stats()
+        }
+
+    def dispatch(self, message, stream):
+        """Run one request and write its events"""
+        kind = message.get('kind')
+        try:
+            if kind == 'ping':
+                result = {'pid': os.getpid()}
+            elif kind == 'status':
+                result = self.status()
+            elif kind == 'shutdown':
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                result = {'pid': os.getpid(), 'stopping': True}
+            else:
+                result = self.run(kind, message.get('spec') or {}, stream)
+            send_message(stream, {'event': 'result', 'result': result})
+        except OSError:
+            pass  # Client disconnected
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            try:
+                send_message(stream, {'event': 'error', 'error': f"{type(e).__name__}: {e}"})
+            except OSError:
+                pass
+
+    def run(self, kind, spec, stream):
+        """Validate and run a job kind with streamed progress"""
+        from job_queue import validate_spec
+        spec = validate_spec(kind, spec)
+        job = {'id': f"daemon-{os.getpid()}-{next(self._ids)}", 'kind': kind, 'spec': spec}
+        ctx = StreamContext(job, stream)
+        ctx.progress(0.0, 'Queued')
+        with self.governor.slot(f"{kind} {os.path.basename(spec['model_path'])}",
+                                exclusive=kind in self.worker.BENCHMARK_KINDS,
+                                on_wait=lambda position, running: ctx.progress(0.0, f"Waiting (position {position})")):
+            result = self.worker.HANDLERS[kind](spec, ctx)
+        with self._lock:
+            self.served += 1
+        return result
+
+    def serve_forever(self):
+        """Bind the socket and serve until a shutdown command"""
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        if UNIX_SOCKETS:
+            if os.path.exists(self.socket_path):
+                if is_running(self.socket_path):
+                    raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+                os.remove(self.socket_path)  # Left behind by a daemon that crashed
+            self.server = _Server(self.socket_path, _Handler)
+            os.chmod(self.socket_path, 0o600)
+        else:
+            self.server = _Server(('127.0.0.1', 0), _Handler)
+            with atomic_write(PORT_FILE, 'w', fsync=False) as f:
+                f.write(str(self.server.server_address[1]))
+        self.server.warm_daemon = self
+        print(f"Daemon {os.getpid()} listening on {self.socket_path if UNIX_SOCKETS else self.server.server_address}",
+              flush=True)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            cleanup = self.socket_path if UNIX_SOCKETS else PORT_FILE
+            if os.path.exists(cleanup):
+                os.remove(cleanup)
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH)
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB, help='memory budget for cached checkpoints')
+    parser.add_argument('--max-concurrent', type=int, default=1, help='commands run at the same time')
+    parser.add_argument('--no-preload', action='store_true', help='do not decode the test set at startup')
+    args = parser.parse_args()
+    WarmDaemon(args.socket, args.cache_mb, args.max_concurrent, preload=not args.no_preload).serve_forever()
@@ -0,0 +1,184 @@
+"""
+Delta Checkpoints
+- A pruned model stored as (parent fingerprint, packed pruning masks, changed tensors)
+- Masks are bitsets (np.packbits): 1/32 of the fp32 weights they describe
+- Written in the flat (safetensors-compatible) layout; parent pinned by content hash
+- Reconstructed on demand from the parent, which may itself be a delta
+- Overwriting a parent first materializes its deltas into full checkpoints
+"""
+
+import os
+import json
+import numpy as np
+import torch
+from fingerprint import file_fingerprint
+from flat_checkpoint import FLAT_SUFFIX, read_flat_header, load_flat, save_flat
+
+DELTA_SUFFIX = '.delta'
+DELTA_VERSION = 1
+MASK_SUFFIX = '.__mask__'
+DELTA_HEADER_KEYS = ('delta_version', 'parent_fingerprint', 'parent_file', 'masked', 'dropped')
+
+def is_delta(path):
+    """Whether a path is a delta checkpoint"""
+    return str(path).endswith(DELTA_SUFFIX)
+
+def _is_masked_copy(child, parent):
+    """True if child equals parent with some entries zeroed"""
+    if child.shape != parent.shape or child.dtype != parent.dtype:
+        return False
+    mask = child != 0
+    return torch.equal(torch.where(mask, parent, torch.zeros_like(parent)), child)
+
+def _pack_mask(mask):
+    return torch.from_numpy(np.packbits(mask.reshape(-1).cpu().numpy()))
+
+def _unpack_mask(packed, shape):
+    numel = 1
+    for d in shape:
+        numel *= d
+    bits = np.unpackbits(packed.numpy(), count=numel)
+    return torch.from_numpy(bits.astype(bool)).reshape(shape)
+
+def compute_delta(child_state, parent_state):
+    """Split a child state_dict into packed masks and tensors that must be stored whole"""
+    tensors = {}
+    masked = {}
+    for name, tensor in child_state.items():
+        if not torch.is_tensor(tensor):
+            continue
+        parent = parent_state.get(name)
+        if parent is not None and torch.is_tensor(parent):
+            parent = parent.to(tensor.device)
+            if torch.equal(parent, tensor) and parent.dtype == tensor.dtype:
+                continue  # Inherited unchanged
+            if _is_masked_copy(tensor, parent):
+                tensors[name + MASK_SUFFIX] = _pack_mask(tensor != 0)
+                masked[name] = list(tensor.shape)
+                continue
+        tensors[name] = tensor.detach().cpu()
+    dropped = [name for name in parent_state if name not in child_state]
+    return tensors, masked, dropped
+
+def save_delta(child_state, path, parent_path, parent_state=None, metadata=None):
+    """Write a child state_dict as a delta against its parent checkpoint"""
+    if parent_state is None:
+        from checkpoint_io import load_state_dict
+        parent_state = load_state_dict(parent_path, map_location='cpu')
+    tensors, masked, dropped = compute_delta(child_state, parent_state)
+    header_meta = dict(metadata or {})
+    header_meta.update({
+        'delta_version': str(DELTA_VERSION),
+        'parent_fingerprint': file_fingerprint(parent_path),
+        'parent_file': os.path.basename(parent_path),
+        'masked': json.dumps(masked),
+        'dropped': json.dumps(dropped)
+    })
+    return save_flat(tensors, path, metadata=header_meta)
+
+def read_delta_info(path):
+    """Parent reference and layout of a delta, from its header only"""
+    _, metadata, _ = read_flat_header(path)
+    if 'parent_fingerprint' not in metadata:
+        raise ValueError(f"{path}: not a delta checkpoint")
+    return {
+        'parent_fingerprint': metadata['parent_fingerprint'],
+        'parent_file': metadata.get('parent_file'),
+        'masked': json.loads(metadata.get('masked', '{}')),
+        'dropped': json.loads(metadata.get('dropped', '[]'))
+    }
+
+def resolve_parent(path, info=None):
+    """Find the parent checkpoint by content fingerprint (file name is only a hint)"""
+    info = info or read_delta_info(path)
+    directory = os.path.dirname(path) or '.'
+    fingerprint = info['parent_fingerprint']
+    candidates = []
+    if info.get('parent_file'):
+        candidates.append(os.path.join(directory, info['parent_file']))
+    # The metadata index knows fingerprints without rehashing files
+    from model_index import load_index
+    for name, entry in load_index(directory)['models'].items():
+        if entry.get('fingerprint') == fingerprint:
+            candidates.append(os.path.join(directory, name))
+    for candidate in candidates:
+        try:
+            if file_fingerprint(candidate) == fingerprint:
+                return candidate
+        except OSError:
+            continue
+    raise FileNotFoundError(f"{path}: parent checkpoint {fingerprint[:12]} "
+                            f"({info.get('parent_file')}) is missing or was modified")
+
+def load_delta(path, map_location='cpu', parent_loader=None):
+    """Reconstruct a delta checkpoint's full state_dict"""
+    info = read_delta_info(path)
+    if parent_loader is None:
+        from checkpoint_io import load_state_dict as parent_loader
+    parent_state = parent_loader(resolve_parent(path, info))
+    stored = load_flat(path)
+    masked = info['masked']
+    dropped = set(info['dropped'])
+
+    state = {}
+    for name, parent in parent_state.items():
+        if name in dropped:
+            continue
+        if name in stored:
+            state[name] = stored[name]
+        elif name in masked:
+            mask = _unpack_mask(stored[name + MASK_SUFFIX], masked[name]).to(parent.device)
+            state[name] = torch.where(mask, parent, torch.zeros_like(parent))
+        else:
+            state[name] = parent
+    for name, tensor in stored.items():
+        if name not in state and not name.endswith(MASK_SUFFIX):
+            state[name] = tensor
+    if str(map_location) != 'cpu':
+        state = {k: v.to(map_location) for k, v in state.items()}
+    return state
+
+def find_dependents(path):
+    """Delta checkpoints in the same directory whose parent is this file"""
+    directory = os.path.dirname(path) or '.'
+    try:
+        fingerprint = file_fingerprint(path)
+    except OSError:
+        return []
+    dependents = []
+    for name in os.listdir(directory):
+        if not is_delta(name):
+            continue
+        candidate = os.path.join(directory, name)
+        try:
+            if read_delta_info(candidate)['parent_fingerprint'] == fingerprint:
+                dependents.append(candidate)
+        except (OSError, ValueError):
+            continue
+    return dependents
+
+def materialize_dependents(path):
+    """Rewrite the deltas derived from path as full flat checkpoints before path is overwritten; returns the new paths"""
+    from model_index import load_index, record_checkpoint, remove_checkpoint
+    from lineage import rename
+    directory = os.path.dirname(path) or '.'
+    materialized = []
+    for dependent in find_dependents(path):
+        # Deltas of this delta pin its current bytes: rebuild them first
+        materialize_dependents(dependent)
+        target = dependent[:-len(DELTA_SUFFIX)] + FLAT_SUFFIX
+        if os.path.exists(target):
+            raise FileExistsError(f"{target} exists: cannot materialize {os.path.basename(dependent)} "
+                                  f"before {os.path.basename(path)} is overwritten")
+        state = load_delta(dependent)
+        _, metadata, _ = read_flat_header(dependent)
+        metadata = {k: v for k, v in metadata.items() if k not in DELTA_HEADER_KEYS}
+        metadata['materialized_from'] = os.path.basename(dependent)
+        save_flat(state, target, metadata=metadata)
+        entry = load_index(directory)['models'].get(os.path.basename(dependent)) or {}
+        record_checkpoint(target, state, source=entry.get('source', 'materialized'), extra=entry.get('extra'))
+        rename(dependent, target)
+        remove_checkpoint(dependent)
+        os.remove(dependent)
+        materialized.append(target)
+    return materialized
@@ -0,0 +1,114 @@
+"""
+Download Server
+- Streams export bundles and TorchScript artifacts straight from disk in fixed-size chunks
+  (st.download_button would hold the whole file in Streamlit's in-memory media store)
+- A file is only reachable through a random token handed to the session that offered it;
+  nothing under the served directories can be listed or guessed
+- Only files inside the allowed directories can be offered; tokens expire
+- Runs on a daemon thread next to the dashboard (PRUNING_DOWNLOAD_PORT, default 8502)
+"""
+
+import os
+import time
+import shutil
+import secrets
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ADDRESS = os.environ.get('PRUNING_DOWNLOAD_ADDRESS', '0.0.0.0')
+DEFAULT_PORT = int(os.environ.get('PRUNING_DOWNLOAD_PORT', '8502'))
+PUBLIC_URL = os.environ.get('PRUNING_DOWNLOAD_URL')  # Base URL when the port is behind a reverse proxy
+ROUTE = '/download/'
+CHUNK_BYTES = 1 << 20
+OFFER_TTL_SECONDS = 3600
+
+class _Handler(BaseHTTPRequestHandler):
+    downloads = None  # Set on the per-server subclass
+
+    def do_GET(self):
+        self._send(body=True)
+
+    def do_HEAD(self):
+        self._send(body=False)
+
+    def _send(self, body):
+        path = self.path.split('?', 1)[0]
+        offer = self.downloads.resolve(path[len(ROUTE):]) if path.startswith(ROUTE) else None
+        if offer is None:
+            self.send_error(404)
+            return
+        file_path, name = offer
+        try:
+            f = open(file_path, 'rb')
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', mimetypes.guess_type(name)[0] or 'application/octet-stream')
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.send_header('Content-Disposition', f'attachment; filename="{name}"')
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            if body:
+                try:
+                    shutil.copyfileobj(f, self.wfile, CHUNK_BYTES)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The browser cancelled the download
+
+    def log_message(self, format, *args):
+        pass
+
+class DownloadServer:
+    """Token-addressed file downloads from a set of directories"""
+
+    def __init__(self, roots, address=DEFAULT_ADDRESS, port=DEFAULT_PORT, ttl=OFFER_TTL_SECONDS):
+        self.roots = [os.path.realpath(root) for root in roots]
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._offers = {}  # token -> (real path, download name, expiry)
+        handler = type('DownloadHandler', (_Handler,), {'downloads': self})
+        self._server = ThreadingHTTPServer((address, port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Serve on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name='downloads', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def offer(self, path, name=None):
+        """Make a file downloadable under a new token; returns its link path"""
+        real = os.path.realpath(path)
+        if not any(os.path.commonpath([real, root]) == root for root in self.roots):
+            raise ValueError(f"{path} is outside the download directories")
+        if not os.path.isfile(real):
+            raise FileNotFoundError(path)
+        name = (name or os.path.basename(real)).replace('"', '').replace('\\', '')
+        token = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._lock:
+            self._offers = {t: o for t, o in self._offers.items() if o[2] > now}
+            self._offers[token] = (real, name, now + self.ttl)
+        return ROUTE + token
+
+    def resolve(self, token):
+        """(path, download name) for a live token, or None"""
+        with self._lock:
+            offer = self._offers.get(token)
+        if offer is None or offer[2] <= time.time():
+            return None
+        return offer[0], offer[1]
+
+    def url(self, link, host=None):
+        """Absolute URL for a link path, on the host the browser used for the dashboard"""
+        base = PUBLIC_URL or f"http://{host or 'localhost'}:{self.port}"
+        return base.rstrip('/') + link
@@ -0,0 +1,59 @@
+"""
+Model Evaluation
+- CIFAR-10 test set loading
+- Batched forward passes that collect full test-set logits
+- Optional in-memory copy of the decoded test set for long-lived processes
+- torchvision is imported on first use, not when the module loads
+"""
+
+import platform
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from inference import DEFAULT_INFERENCE_MODE, prepare_model, prepare_input, inference_context
+
+def get_test_transform():
+    """Normalization used by every training and evaluation path"""
+    from torchvision import transforms
+    return transforms.Compose([
+        transforms.ToTensor(),
+        transforms.Normalize((0.5, 0.5, 0.5), (0.5, 0.5, 0.5))
+    ])
+
+_PRELOADED = {}
+
+def preload_test_set(root='./data'):
+    """Decode and normalize the test set once; build_test_loader then serves it from memory"""
+    from torchvision import datasets
+    loader = DataLoader(datasets.CIFAR10(root=root, train=False, download=True, transform=get_test_transform()),
+                        batch_size=1000, shuffle=False, num_workers=0)
+    images, labels = zip(*loader)
+    _PRELOADED[root] = (torch.cat(images), torch.cat(labels))
+    return len(_PRELOADED[root][1])
+
+def build_test_loader(root='./data', batch_size=100):
+    """CIFAR-10 test loader in fixed order (logits rows line up across models)"""
+    if root in _PRELOADED:
+        return DataLoader(TensorDataset(*_PRELOADED[root]), batch_size=batch_size, shuffle=False)
+    from torchvision import datasets
+    testset = datasets.CIFAR10(root=root, train=False, download=True, transform=get_test_transform())
+    # Use 0 workers on Windows to avoid issues
+    num_workers = 0 if platform.system() == 'Windows' else 2
+    return DataLoader(testset, batch_size=batch_size, shuffle=False, num_workers=num_workers)
+
+def collect_logits(model, dataloader, device, progress_callback=None, mode=DEFAULT_INFERENCE_MODE):
+    """Run the model over a dataloader and return (logits, labels) as CPU tensors"""
+    model = prepare_model(model, mode, device)
+    all_logits = []
+    all_labels = []
+    total_batches = len(dataloader)
+    with inference_context(mode):
+        for batch_idx, (images, labels) in enumerate(dataloader):
+            images = prepare_input(images, mode, device)
+            outputs = model(images)
+            all_logits.append(outputs.float().cpu())
+            all_labels.append(labels.cpu())
+            if progress_callback is not None and total_batches > 0:
+                progress_callback(batch_idx + 1, total_batches)
+    if not all_logits:
+        return torch.empty(0, 0), torch.empty(0, dtype=torch.long)
+    return torch.cat(all_logits), torch.cat(all_labels)
@@ -0,0 +1,75 @@
+"""
+TorchScript Export
+- Script or trace SimpleCNN from any checkpoint
+- Freeze + optimize_for_inference (conv/relu fusion, constant folding)
+- Load exported artifacts directly for evaluation and benchmarking
+"""
+
+import os
+import argparse
+import torch
+from model import SimpleCNN, fix_state_dict
+from checkpoint_io import load_state_dict
+from coordination import atomic_path
+
+TORCHSCRIPT_SUFFIX = '.torchscript.pt'
+DEFAULT_EXPORT_DIR = os.path.join('saved', 'exported')
+
+def export_torchscript(state_dict, out_path, method='script', input_size=(1, 3, 32, 32), optimize=True):
+    """Build a frozen (and optionally optimized) TorchScript module and save it"""
+    model = SimpleCNN()
+    model.load_state_dict(fix_state_dict(state_dict))
+    model.eval()
+
+    if method == 'trace':
+        scripted = torch.jit.trace(model, torch.randn(input_size))
+    elif method == 'script':
+        scripted = torch.jit.script(model)
+    else:
+        raise ValueError(f"Unknown export method '{method}' (use 'script' or 'trace')")
+
+    # Freezing inlines weights as constants so the optimizer can fold and fuse them
+    frozen = torch.jit.freeze(scripted)
+    if optimize:
+        frozen = torch.jit.optimize_for_inference(frozen)
+
+    with atomic_path(out_path) as tmp_path:
+        torch.jit.save(frozen, tmp_path)
+    return out_path
+
+def artifact_path_for(model_path, out_dir=DEFAULT_EXPORT_DIR):
+    """Default artifact location for a checkpoint"""
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(out_dir, f"{stem}{TORCHSCRIPT_SUFFIX}")
+
+def export_checkpoint(model_path, out_dir=DEFAULT_EXPORT_DIR, method='script', optimize=True):
+    """Export a .pth checkpoint to a deployable TorchScript artifact"""
+    state = load_state_dict(model_path, map_location='cpu')
+    return export_torchscript(state, artifact_path_for(model_path, out_dir), method=method, optimize=optimize)
+
+def is_torchscript_artifact(path):
+    """Whether a path points at an exported TorchScript artifact"""
+    return str(path).endswith(TORCHSCRIPT_SUFFIX)
+
+def load_torchscript(path, device='cpu'):
+    """Load an exported artifact ready for inference"""
+    module = torch.jit.load(path, map_location=device)
+    module.eval()
+    return module
+
+def list_artifacts(out_dir=DEFAULT_EXPORT_DIR):
+    """Exported artifacts, newest first"""
+    if not os.path.isdir(out_dir):
+        return []
+    paths = [os.path.join(out_dir, f) for f in os.listdir(out_dir) if f.endswith(TORCHSCRIPT_SUFFIX)]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-path', type=str, required=True)
+    parser.add_argument('--out-dir', type=str, default=DEFAULT_EXPORT_DIR)
+    parser.add_argument('--method', type=str, default='script', choices=['script', 'trace'])
+    parser.add_argument('--no-optimize', action='store_true', help='skip optimize_for_inference (freeze only)')
+    args = parser.parse_args()
+    out_path = export_checkpoint(args.model_path, args.out_dir, method=args.method, optimize=not args.no_optimize)
+    print('Exported TorchScript artifact to', out_path)
@@ -0,0 +1,228 @@
+"""
+Directory Watcher
+- Keeps an in-memory listing of watched directories (e.g. saved/ and assets/)
+- inotify/FSEvents via watchdog when installed, polling fallback otherwise
+- Notifies listeners per changed file so caches can be invalidated selectively
+- Creations and modifications are reported once size and mtime have stopped changing (no half-written files)
+- Listener failures are logged to stderr and kept for display instead of disappearing
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_SETTLE_SECONDS = 1.0  # A changed file must keep its size and mtime this long before it is reported
+SETTLE_CHECK_SECONDS = 0.25
+MAX_ERRORS = 20
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+class DirectoryWatcher:
+    """Incrementally maintained file listing with change callbacks"""
+
+    def __init__(self, directories, poll_interval=DEFAULT_POLL_INTERVAL, settle_seconds=DEFAULT_SETTLE_SECONDS):
+        # directories: {path: tuple of suffixes to track}
+        self.directories = {os.path.abspath(d): tuple(s) for d, s in directories.items()}
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self._files = {d: {} for d in self.directories}  # dir -> {abs path: (size, mtime_ns)}
+        self._pending = {}  # abs path -> ((size, mtime_ns), monotonic time that stat was first seen)
+        self.errors = deque(maxlen=MAX_ERRORS)  # (time, event, path, error) of failed listener calls
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self.backend = None
+        for directory in self.directories:
+            self._scan(directory, notify=False)
+
+    def add_listener(self, callback):
+        """Register callback(event, path) with event in {'created', 'modified', 'deleted'}"""
+        self._listeners.append(callback)
+
+    def _tracked_dir(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        suffixes = self.directories.get(directory)
+        if suffixes is None or not os.path.basename(path).endswith(suffixes):
+            return None
+        return directory
+
+    def _emit(self, event, path):
+        for callback in list(self._listeners):
+            try:
+                callback(event, path)
+            except Exception as e:
+                # A failing listener must not stop the watcher, but it must not go unnoticed either
+                error = f"{type(e).__name__}: {e}"
+                self.errors.append((time.time(), event, path, error))
+                print(f"DirectoryWatcher: listener failed on {event} {path}: {error}", file=sys.stderr, flush=True)
+
+    def _observe(self, path):
+        """Change seen by the background watcher: deletions apply now, new content once it has settled"""
+        path = os.path.abspath(path)
+        directory = self._tracked_dir(path)
+        if directory is None:
+            return
+        key = _stat_key(path)
+        with self._lock:
+            if key is not None and self._files[directory].get(path) != key:
+                pending = self._pending.get(path)
+                if pending is None or pending[0] != key:
+                    self._pending[path] = (key, time.monotonic())
+                return
+            self._pending.pop(path, None)
+        if key is None:
+            self.refresh(path)
+
+    def _settle(self):
+        """Report pending files whose size and mtime held still for settle_seconds"""
+        with self._lock:
+            pending = list(self._pending.items())
+        now = time.monotonic()
+        for path, (key, since) in pending:
+            current = _stat_key(path)
+            if current == key and now - since < self.settle_seconds:
+                continue
+            with self._lock:
+                if self._pending.get(path) != (key, since):
+                    continue
+                if current is None or current == key:
+                    del self._pending[path]
+                else:
+                    self._pending[path] = (current, now)  # Still being written
+                    continue
+            self.refresh(path)
+
+    def refresh(self, path):
+        """Re-check a single file now and notify listeners if it changed (for files known to be complete)"""
+        path = os.path.abspath(path)
+        directory = self._tracked_dir(path)
+        if directory is None:
+            return
+        key = _stat_key(path)
+        with self._lock:
+            previous = self._files[directory].get(path)
+            if key == previous:
+                return
+            if key is None:
+                del self._files[directory][path]
+            else:
+                self._files[directory][path] = key
+        if key is None:
+            event = 'deleted'
+        else:
+            event = 'created' if previous is None else 'modified'
+        self._emit(event, path)
+
+    def _scan(self, directory, notify=True, settle=False):
+        suffixes = self.directories[directory]
+        current = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(suffixes):
+                        stat = entry.stat()
+                        current[os.path.abspath(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        if settle:
+            with self._lock:
+                previous = dict(self._files[directory])
+            for path in (previous.keys() - current.keys()) | {p for p, key in current.items() if previous.get(p) != key}:
+                self._observe(path)
+            return
+        with self._lock:
+            previous = self._files[directory]
+            self._files[directory] = current
+            for path in previous.keys() | current.keys():
+                self._pending.pop(path, None)
+        if not notify:
+            return
+        for path in previous.keys() - current.keys():
+            self._emit('deleted', path)
+        for path, key in current.items():
+            if path not in previous:
+                self._emit('created', path)
+            elif previous[path] != key:
+                self._emit('modified', path)
+
+    def rescan(self, directory=None):
+        """Rescan one watched directory, or all of them"""
+        targets = [os.path.abspath(directory)] if directory else list(self.directories)
+        for target in targets:
+            if target in self.directories:
+                self._scan(target)
+
+    def files(self, directory, newest_first=True):
+        """Tracked files in a directory, as paths relative to the working directory"""
+        directory = os.path.abspath(directory)
+        with self._lock:
+            entries = list(self._files.get(directory, {}).items())
+        entries.sort(key=lambda item: item[1][1], reverse=newest_first)
+        return [os.path.relpath(path) for path, _ in entries]
+
+    def _run(self, poll):
+        next_poll = time.monotonic() + self.poll_interval
+        while not self._stop.wait(SETTLE_CHECK_SECONDS):
+            if poll and time.monotonic() >= next_poll:
+                for directory in self.directories:
+                    self._scan(directory, settle=True)
+                next_poll = time.monotonic() + self.poll_interval
+            self._settle()
+
+    def start(self):
+        """Start watching in the background"""
+        if self.backend is not None:
+            return self
+        if WATCHDOG_AVAILABLE:
+            watcher = self
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    if event.is_directory:
+                        return
+                    watcher._observe(event.src_path)
+                    if getattr(event, 'dest_path', None):
+                        watcher._observe(event.dest_path)
+
+            try:
+                self._observer = Observer()
+                for directory in self.directories:
+                    os.makedirs(directory, exist_ok=True)
+                    self._observer.schedule(_Handler(), directory, recursive=False)
+                self._observer.daemon = True
+                self._observer.start()
+                self.backend = 'watchdog'
+            except OSError:
+                # e.g. inotify watch limit reached
+                self._observer = None
+        if self.backend is None:
+            self.backend = 'polling'
+        # Settles pending changes (and polls the directories without watchdog)
+        self._thread = threading.Thread(target=self._run, args=(self.backend == 'polling',),
+                                        name='directory-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background watcher"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        self.backend = None
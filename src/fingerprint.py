@@ -0,0 +1,38 @@
+"""
+Checkpoint Fingerprinting
+- Content hash (SHA-256) of checkpoint files
+- In-process memo keyed by path, size and modification time
+- Last known fingerprint per path (to invalidate caches after a file changes)
+"""
+
+import hashlib
+import os
+
+_FINGERPRINT_MEMO = {}
+_LAST_FINGERPRINT = {}
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, memoized per (path, size, mtime)"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    fingerprint = _FINGERPRINT_MEMO.get(key)
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()
+        _FINGERPRINT_MEMO[key] = fingerprint
+    _LAST_FINGERPRINT[key[0]] = fingerprint
+    return fingerprint
+
+def last_fingerprint(path):
+    """Most recently computed fingerprint for a path, even if the file has since changed"""
+    return _LAST_FINGERPRINT.get(os.path.abspath(path))
+
+def remember_fingerprint(path, fingerprint):
+    """Seed the memo for a file whose hash was computed while it was written"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    _FINGERPRINT_MEMO[key] = fingerprint
+    _LAST_FINGERPRINT[key[0]] = fingerprint
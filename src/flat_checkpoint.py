@@ -0,0 +1,184 @@
+"""
+Flat Checkpoint Format
+- safetensors-compatible layout: 8-byte little-endian header length, JSON header,
+  then the raw tensor buffers back to back
+- Loaded by memory-mapping the file, so tensors are views onto page-cache memory
+- Header is plain JSON: checkpoints can be inspected without executing pickle
+- Converters to and from .pth
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import torch
+from coordination import atomic_write, atomic_torch_save
+
+FLAT_SUFFIX = '.safetensors'
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+HEADER_ALIGNMENT = 8
+
+DTYPES = {
+    'F64': torch.float64,
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool
+}
+DTYPE_NAMES = {dtype: name for name, dtype in DTYPES.items()}
+
+def is_flat_checkpoint(path):
+    """Whether a path uses the flat format"""
+    return str(path).endswith(FLAT_SUFFIX)
+
+def _check_byteorder():
+    if sys.byteorder != 'little':
+        raise RuntimeError("The flat checkpoint format is only supported on little-endian hosts")
+
+def tensor_bytes(tensor):
+    """Raw bytes of a tensor as a flat uint8 array (no copy for contiguous CPU tensors)"""
+    flat = tensor.detach().cpu().contiguous().reshape(-1)
+    if flat.numel() == 0:
+        return b''
+    return flat.view(torch.uint8).numpy()
+
+def save_flat(state_dict, path, metadata=None):
+    """Write tensors to a flat checkpoint atomically"""
+    _check_byteorder()
+    tensors = {k: v for k, v in state_dict.items() if torch.is_tensor(v)}
+    for name, tensor in tensors.items():
+        if tensor.dtype not in DTYPE_NAMES:
+            raise ValueError(f"Unsupported dtype {tensor.dtype} for tensor '{name}'")
+
+    # Widest dtypes first keeps every buffer aligned to its element size without padding
+    order = sorted(tensors, key=lambda k: (-tensors[k].element_size(), k))
+    header = {}
+    offset = 0
+    for name in order:
+        tensor = tensors[name]
+        nbytes = tensor.numel() * tensor.element_size()
+        header[name] = {
+            'dtype': DTYPE_NAMES[tensor.dtype],
+            'shape': list(tensor.shape),
+            'data_offsets': [offset, offset + nbytes]
+        }
+        offset += nbytes
+    if metadata:
+        header['__metadata__'] = {str(k): str(v) for k, v in metadata.items()}
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * (-len(header_bytes) % HEADER_ALIGNMENT)
+
+    with atomic_write(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name in order:
+            f.write(tensor_bytes(tensors[name]))
+    return path
+
+def read_flat_header(path):
+    """Parse and validate the JSON header; returns (tensor_entries, metadata, data_start)"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError(f"{path}: file too small to be a flat checkpoint")
+        (header_len,) = struct.unpack('<Q', prefix)
+        if header_len > MAX_HEADER_BYTES or 8 + header_len > file_size:
+            raise ValueError(f"{path}: invalid header length {header_len}")
+        try:
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"{path}: header is not valid JSON ({e})")
+    if not isinstance(header, dict):
+        raise ValueError(f"{path}: header must be a JSON object")
+
+    metadata = header.pop('__metadata__', None) or {}
+    data_start = 8 + header_len
+    data_size = file_size - data_start
+    spans = []
+    for name, entry in header.items():
+        dtype = DTYPES.get(entry.get('dtype')) if isinstance(entry, dict) else None
+        if dtype is None:
+            raise ValueError(f"{path}: tensor '{name}' has an unsupported dtype")
+        shape = entry.get('shape')
+        begin, end = entry.get('data_offsets', (None, None))
+        if not isinstance(shape, list) or any(not isinstance(d, int) or d < 0 for d in shape):
+            raise ValueError(f"{path}: tensor '{name}' has an invalid shape")
+        if not isinstance(begin, int) or not isinstance(end, int) or not 0 <= begin <= end <= data_size:
+            raise ValueError(f"{path}: tensor '{name}' has out-of-range offsets")
+        numel = 1
+        for d in shape:
+            numel *= d
+        if numel * torch.empty((), dtype=dtype).element_size() != end - begin:
+            raise ValueError(f"{path}: tensor '{name}' size does not match its shape")
+        spans.append((begin, end))
+
+    # The buffer must be fully covered with no overlaps or holes
+    position = 0
+    for begin, end in sorted(spans):
+        if begin != position:
+            raise ValueError(f"{path}: tensor buffers overlap or leave gaps")
+        position = end
+    if position != data_size:
+        raise ValueError(f"{path}: trailing bytes after tensor data")
+    return header, metadata, data_start
+
+def load_flat(path, map_location='cpu'):
+    """Load a flat checkpoint as tensors viewing a memory-mapped file"""
+    _check_byteorder()
+    header, _, data_start = read_flat_header(path)
+    state = {}
+    if not header:
+        return state
+    with open(path, 'rb') as f:
+        # Copy-on-write mapping: tensors are writable views and the file is never modified
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    for name, entry in header.items():
+        dtype = DTYPES[entry['dtype']]
+        begin, end = entry['data_offsets']
+        if end == begin:
+            tensor = torch.empty(entry['shape'], dtype=dtype)
+        else:
+            count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+            tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin)
+            tensor = tensor.reshape(entry['shape'])
+        state[name] = tensor
+    if str(map_location) != 'cpu':
+        state = {k: v.to(map_location) for k, v in state.items()}
+    return state
+
+def read_flat_metadata(path):
+    """String metadata stored in the header"""
+    return read_flat_header(path)[1]
+
+def convert_pth_to_flat(pth_path, out_path=None, trusted=True):
+    """Rewrite a .pth checkpoint in the flat format"""
+    from checkpoint_io import load_state_dict
+    out_path = out_path or os.path.splitext(pth_path)[0] + FLAT_SUFFIX
+    state = load_state_dict(pth_path, map_location='cpu', trusted=trusted)
+    return save_flat(state, out_path, metadata={'converted_from': os.path.basename(pth_path)})
+
+def convert_flat_to_pth(flat_path, out_path=None):
+    """Rewrite a flat checkpoint as a regular .pth file"""
+    out_path = out_path or flat_path[:-len(FLAT_SUFFIX)] + '.pth'
+    # Clone so the saved tensors do not keep the mapping alive
+    state = {k: v.clone() for k, v in load_flat(flat_path).items()}
+    return atomic_torch_save(state, out_path)
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', type=str, help='checkpoint to convert (.pth or .safetensors)')
+    parser.add_argument('--out', type=str, default=None)
+    args = parser.parse_args()
+    if is_flat_checkpoint(args.path):
+        print('Wrote', convert_flat_to_pth(args.path, args.out))
+    else:
+        print('Wrote', convert_pth_to_flat(args.path, args.out))
@@ -0,0 +1,83 @@
+"""
+Inference Modes
+- eager: fp32 NCHW under torch.no_grad (original behaviour)
+- cpu: torch.inference_mode + channels_last, which routes convolutions to oneDNN (mkldnn) kernels
+- cpu_bf16: cpu + bfloat16 autocast on CPUs with native bf16 support (falls back to cpu otherwise)
+- Explicit intra-op / inter-op thread configuration
+"""
+
+from contextlib import contextmanager
+import torch
+
+INFERENCE_MODES = {
+    'eager': {'inference_mode': False, 'channels_last': False, 'bf16': False},
+    'cpu': {'inference_mode': True, 'channels_last': True, 'bf16': False},
+    'cpu_bf16': {'inference_mode': True, 'channels_last': True, 'bf16': True},
+}
+DEFAULT_INFERENCE_MODE = 'eager'
+
+def cpu_supports_bf16():
+    """Whether oneDNN reports native bf16 support on this CPU"""
+    try:
+        return bool(torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+def resolve_mode(mode, device='cpu'):
+    """Effective mode for a device (bf16 autocast is CPU-only and needs hardware support)"""
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}'. Choose from: {', '.join(INFERENCE_MODES)}")
+    device = torch.device(device)
+    if INFERENCE_MODES[mode]['bf16'] and (device.type != 'cpu' or not cpu_supports_bf16()):
+        return 'cpu'
+    return mode
+
+def configure_threads(num_threads=None, num_interop_threads=None):
+    """Apply intra-op / inter-op thread counts and return the effective values"""
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+    if num_interop_threads:
+        try:
+            torch.set_num_interop_threads(int(num_interop_threads))
+        except RuntimeError:
+            # Inter-op pool size can only be set once, before any inter-op work starts
+            pass
+    return {
+        'num_threads': torch.get_num_threads(),
+        'num_interop_threads': torch.get_num_interop_threads(),
+    }
+
+def prepare_model(model, mode, device):
+    """Move a model to the device and memory format the mode expects"""
+    model.eval()
+    model.to(device)
+    if INFERENCE_MODES[mode]['channels_last']:
+        model = model.to(memory_format=torch.channels_last)
+    return model
+
+def prepare_input(x, mode, device):
+    """Move an input batch to the device and memory format the mode expects"""
+    x = x.to(device, non_blocking=True)
+    if INFERENCE_MODES[mode]['channels_last'] and x.dim() == 4:
+        x = x.contiguous(memory_format=torch.channels_last)
+    return x
+
+@contextmanager
+def inference_context(mode):
+    """Grad-free context (plus bf16 autocast) for the given mode"""
+    config = INFERENCE_MODES[mode]
+    grad_context = torch.inference_mode() if config['inference_mode'] else torch.no_grad()
+    with grad_context:
+        if config['bf16']:
+            with torch.autocast(device_type='cpu', dtype=torch.bfloat16):
+                yield
+        else:
+            yield
+
+def describe_mode(mode):
+    """Metadata recorded next to every metric produced under a mode"""
+    return {
+        'inference_mode': mode,
+        'num_threads': torch.get_num_threads(),
+        'num_interop_threads': torch.get_num_interop_threads(),
+    }
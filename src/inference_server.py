@@ -0,0 +1,516 @@
+"""
+Inference Server
+- Asyncio HTTP server for SimpleCNN checkpoints (any saved format) and exported TorchScript artifacts
+- Dynamic micro-batching: concurrent requests for a model share one forward pass, bounded by a
+  batch size and a max-latency window
+- Several models resident at once (LRU by count), loaded on first request
+- Per-model p50 / p99 latency, batch size and throughput counters
+- A/B routes split traffic between model variants by weight (e.g. a pruned model and its parent)
+- Models registered over HTTP must live under the model directory and load without pickle code
+"""
+
+import os
+import json
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import torch
+from model import SimpleCNN
+from checkpoint_io import load_state_dict, MODEL_FILE_SUFFIXES
+from export import is_torchscript_artifact, load_torchscript, TORCHSCRIPT_SUFFIX
+from inference import (INFERENCE_MODES, DEFAULT_INFERENCE_MODE, resolve_mode, configure_threads,
+                       prepare_model, prepare_input, inference_context)
+
+CIFAR10_CLASSES = ('airplane', 'automobile', 'bird', 'cat', 'deer', 'dog', 'frog', 'horse', 'ship', 'truck')
+INPUT_SHAPE = (3, 32, 32)
+MAX_BODY_BYTES = 32 * 1024 * 1024
+LATENCY_WINDOW = 10000  # Requests kept per model for percentiles
+THROUGHPUT_WINDOW_SECONDS = 60
+POLL_SECONDS = 0.0005  # Batch window polling granularity
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class WorkerStopped(Exception):
+    """The model was evicted or replaced before the request ran; it can be retried"""
+
+class RequestError(Exception):
+    """Client error with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def load_servable(path, device, mode, trusted=True):
+    """Ready-to-run module for a checkpoint or TorchScript artifact; returns (module, effective mode)"""
+    if is_torchscript_artifact(path):
+        if not trusted:
+            raise ValueError(f"{path}: TorchScript artifacts are only served when given on the command line")
+        # Frozen graphs already carry their own dtype decisions
+        return load_torchscript(path, device), 'cpu' if mode == 'cpu_bf16' else mode
+    model = SimpleCNN()
+    model.load_state_dict(load_state_dict(path, map_location='cpu', trusted=trusted))  # Strict: never serve half-loaded weights
+    return prepare_model(model, mode, device), mode
+
+def decode_inputs(data):
+    """Input batch from a request: nested lists under 'inputs', or base64 float32 under 'inputs_b64'"""
+    if 'inputs_b64' in data:
+        try:
+            raw = np.frombuffer(base64.b64decode(data['inputs_b64']), dtype=np.float32)
+            inputs = torch.from_numpy(raw.copy()).reshape(-1, *INPUT_SHAPE)
+        except (ValueError, RuntimeError) as e:
+            raise RequestError(400, f"Bad inputs_b64: {e}")
+    elif 'inputs' in data:
+        try:
+            inputs = torch.tensor(data['inputs'], dtype=torch.float32)
+        except (ValueError, TypeError) as e:
+            raise RequestError(400, f"Bad inputs: {e}")
+    else:
+        raise RequestError(400, "Request needs 'inputs' or 'inputs_b64'")
+    if inputs.dim() == 3:
+        inputs = inputs.unsqueeze(0)
+    if inputs.dim() != 4 or tuple(inputs.shape[1:]) != INPUT_SHAPE or inputs.shape[0] == 0:
+        raise RequestError(400, f"Inputs must have shape (N, 3, 32, 32), got {tuple(inputs.shape)}")
+    if data.get('normalize'):
+        inputs = (inputs - 0.5) / 0.5  # Raw 0..1 pixels -> the normalization used in training
+    return inputs
+
+class ModelStats:
+    """Request, batch and latency counters for one model (kept across evictions)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.samples = 0
+        self.batches = 0
+        self.errors = 0
+        self.loads = 0
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.recent = deque()  # (finish time, samples)
+
+    def record_batch(self, samples):
+        now = time.time()
+        self.batches += 1
+        self.samples += samples
+        self.recent.append((now, samples))
+        while self.recent and self.recent[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self.recent.popleft()
+
+    def record_request(self, latency_ms):
+        self.requests += 1
+        self.latencies_ms.append(latency_ms)
+
+    def snapshot(self):
+        latencies = list(self.latencies_ms)
+        now = time.time()
+        recent = sum(n for t, n in self.recent if t >= now - THROUGHPUT_WINDOW_SECONDS)
+        return {
+            'requests': self.requests,
+            'samples': self.samples,
+            'batches': self.batches,
+            'errors': self.errors,
+            'loads': self.loads,
+            'mean_batch_size': self.samples / self.batches if self.batches else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p99_ms': percentile(latencies, 99),
+            'samples_per_sec': recent / THROUGHPUT_WINDOW_SECONDS
+        }
+
+class ModelWorker:
+    """One resident model: a request queue drained into dynamic batches"""
+
+    def __init__(self, name, module, mode, server):
+        self.name = name
+        self.module = module
+        self.mode = mode
+        self.server = server
+        self.stats = server.stats_for(name)
+        self.queue = asyncio.Queue()
+        self.busy = False
+        self.stopped = False
+        self._batch = []  # Requests taken off the queue and not answered yet
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def idle(self):
+        return not self.busy and self.queue.empty()
+
+    def stop(self):
+        """Cancel the worker; every request it still holds fails with WorkerStopped"""
+        self.stopped = True
+        self.task.cancel()
+        pending = self._batch
+        self._batch = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(WorkerStopped(self.name))
+
+    async def infer(self, inputs):
+        """Logits for an input batch, computed together with whatever else arrives in the window"""
+        if self.stopped:
+            raise WorkerStopped(self.name)
+        future = asyncio.get_running_loop().create_future()
+        arrived = time.perf_counter()
+        await self.queue.put((inputs, future, arrived))
+        logits = await future
+        self.stats.record_request((time.perf_counter() - arrived) * 1000)
+        return logits
+
+    async def _collect(self):
+        first = await self.queue.get()
+        self.busy = True  # Holding dequeued requests: not evictable from here on
+        items = self._batch = [first]
+        size = first[0].shape[0]
+        deadline = first[2] + self.server.max_latency
+        while size < self.server.max_batch:
+            if not self.queue.empty():
+                item = self.queue.get_nowait()
+                items.append(item)
+                size += item[0].shape[0]
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            # Short polls rather than wait_for(queue.get()), which can drop an item when it times out
+            await asyncio.sleep(min(remaining, POLL_SECONDS))
+        return items
+
+    def _forward(self, batch):
+        with inference_context(self.mode):
+            return self.module(prepare_input(batch, self.mode, self.server.device)).float().cpu()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            try:
+                batch = torch.cat([inputs for inputs, _, _ in items])
+                logits = await loop.run_in_executor(self.server.executor, self._forward, batch)
+            except Exception as e:
+                self.stats.errors += 1
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                self.stats.record_batch(batch.shape[0])
+                offset = 0
+                for inputs, future, _ in items:
+                    if not future.done():  # The client may have gone away
+                        future.set_result(logits[offset:offset + inputs.shape[0]])
+                    offset += inputs.shape[0]
+            finally:
+                self._batch = []
+                self.busy = False
+
+class InferenceServer:
+    """Model registry, resident model LRU, A/B routes and the HTTP front end"""
+
+    def __init__(self, models=None, max_resident=4, max_batch=64, max_latency_ms=5.0,
+                 mode=DEFAULT_INFERENCE_MODE, device='cpu', model_dir='saved'):
+        self.device = torch.device(device)
+        self.mode = resolve_mode(mode, self.device)
+        self.max_resident = max_resident
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self.model_dir = os.path.realpath(model_dir)
+        self.registry = {}
+        self.untrusted = set()  # Names registered over HTTP
+        self.resident = OrderedDict()
+        self.routes = {}
+        self.stats = {}
+        self._loading = {}
+        # One forward pass at a time: batching, not request threads, is what uses the cores
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='forward')
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='load')
+        self.started = time.time()
+        for name, path in (models or {}).items():
+            self.register(name, path)
+
+    def stats_for(self, name):
+        return self.stats.setdefault(name, ModelStats())
+
+    def register(self, name, path, trusted=True):
+        """Make a checkpoint or artifact servable under a name (replaces an earlier registration)"""
+        if not trusted:
+            real = os.path.realpath(path)
+            if os.path.commonpath([real, self.model_dir]) != self.model_dir:
+                raise RequestError(400, f"Models can only be registered from {self.model_dir}")
+            if is_torchscript_artifact(real):
+                raise RequestError(400, "TorchScript artifacts cannot be registered over HTTP")
+            path = real
+        if not os.path.isfile(path):
+            raise RequestError(400, f"No such model file: {path}")
+        if not path.endswith(MODEL_FILE_SUFFIXES + (TORCHSCRIPT_SUFFIX,)):
+            raise RequestError(400, f"Not a checkpoint or TorchScript artifact: {path}")
+        replaced = self.registry.get(name) not in (None, path) or (name in self.untrusted) == trusted
+        if replaced and name in self.resident:
+            self.resident.pop(name).stop()
+        self.registry[name] = path
+        if trusted:
+            self.untrusted.discard(name)
+        else:
+            self.untrusted.add(name)
+        return {'name': name, 'path': path}
+
+    def add_route(self, name, variants):
+        """A/B route: {model name: weight}; requests to the route are split by weight"""
+        if name in self.registry:
+            raise RequestError(400, f"'{name}' is already a model name")
+        unknown = [v for v in variants if v not in self.registry]
+        if unknown:
+            raise RequestError(400, f"Unknown models in route: {unknown}")
+        try:
+            weights = {k: float(w) for k, w in variants.items()}
+        except (TypeError, ValueError):
+            raise RequestError(400, "Route weights must be numbers")
+        if not weights or any(w <= 0 for w in weights.values()):
+            raise RequestError(400, "Route weights must be positive")
+        self.routes[name] = {'variants': weights, 'counts': {k: 0 for k in weights}}
+        return {'name': name, 'variants': self.routes[name]['variants']}
+
+    def choose_variant(self, route_name, key=None):
+        """Pick a route's variant by weight; the same key always lands on the same variant"""
+        route = self.routes[route_name]
+        names = list(route['variants'])
+        weights = [route['variants'][n] for n in names]
+        if key is None:
+            choice = random.choices(names, weights)[0]
+        else:
+            point = int(hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF * sum(weights)
+            choice = names[-1]
+            for name, weight in zip(names, weights):
+                if point < weight:
+                    choice = name
+                    break
+                point -= weight
+        route['counts'][choice] += 1
+        return choice
+
+    async def worker_for(self, name):
+        """Resident worker for a model, loading it (once, however many requests wait) on a miss"""
+        worker = self.resident.get(name)
+        if worker is not None:
+            self.resident.move_to_end(name)
+            return worker
+        if name not in self.registry:
+            raise RequestError(404, f"Unknown model or route '{name}'")
+        task = self._loading.get(name)
+        if task is None:
+            task = self._loading[name] = asyncio.get_running_loop().create_task(self._load(name))
+            task.add_done_callback(lambda _: self._loading.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, name):
+        loop = asyncio.get_running_loop()
+        module, mode = await loop.run_in_executor(self._loader, load_servable, self.registry[name], self.device, self.mode,
+                                                  name not in self.untrusted)
+        self.stats_for(name).loads += 1
+        worker = self.resident[name] = ModelWorker(name, module, mode, self)
+        self._evict()
+        return worker
+
+    def _evict(self):
+        """Drop least recently used idle models beyond max_resident"""
+        while len(self.resident) > self.max_resident:
+            victim = next((n for n, w in self.resident.items() if w.idle()), None)
+            if victim is None:
+                return  # Everything is busy; retry after the next load
+            self.resident.pop(victim).stop()
+
+    async def predict(self, name, data):
+        """Run a predict request against a model or route"""
+        inputs = decode_inputs(data)
+        model_name = self.choose_variant(name, data.get('key')) if name in self.routes else name
+        worker = await self.worker_for(model_name)
+        start = time.perf_counter()
+        try:
+            logits = await worker.infer(inputs)
+        except WorkerStopped:
+            # Evicted or replaced before the batch ran: a fresh worker serves it
+            logits = await (await self.worker_for(model_name)).infer(inputs)
+        predictions = logits.argmax(dim=1).tolist()
+        response = {
+            'model': model_name,
+            'predictions': predictions,
+            'labels': [CIFAR10_CLASSES[p] for p in predictions],
+            'latency_ms': (time.perf_counter() - start) * 1000
+        }
+        if name in self.routes:
+            response['route'] = name
+        if data.get('return_logits'):
+            response['logits'] = logits.tolist()
+        return response
+
+    def status(self):
+        """Per-model counters, residency and route splits"""
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'inference_mode': self.mode,
+            'max_batch': self.max_batch,
+            'max_latency_ms': self.max_latency * 1000,
+            'models': {name: dict(self.stats_for(name).snapshot(), path=path, resident=name in self.resident)
+                       for name, path in self.registry.items()},
+            'routes': self.routes
+        }
+
+    async def dispatch(self, method, path, body):
+        """(status, payload) for one HTTP request"""
+        parts = [p for p in path.split('?', 1)[0].split('/') if p]
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            raise RequestError(400, 'Body must be JSON')
+        if method == 'GET' and parts == ['health']:
+            return 200, {'status': 'ok', 'resident': list(self.resident)}
+        if method == 'GET' and parts == ['stats']:
+            return 200, self.status()
+        if parts == ['models']:
+            if method == 'GET':
+                return 200, {'models': self.registry, 'resident': list(self.resident)}
+            if method == 'POST':
+                if not data.get('name') or not data.get('path'):
+                    raise RequestError(400, "Registering a model needs 'name' and 'path'")
+                return 200, self.register(str(data['name']), str(data['path']), trusted=False)
+        if parts == ['routes']:
+            if method == 'GET':
+                return 200, {'routes': self.routes}
+            if method == 'POST':
+                if not data.get('name') or not isinstance(data.get('variants'), dict):
+                    raise RequestError(400, "A route needs 'name' and a 'variants' {model: weight} object")
+                return 200, self.add_route(str(data['name']), data['variants'])
+        if len(parts) == 2 and parts[0] == 'predict':
+            if method != 'POST':
+                raise RequestError(405, 'Use POST')
+            return 200, await self.predict(parts[1], data)
+        raise RequestError(404, f"No endpoint {method} {path}")
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive (JSON in, JSON out)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                if length > MAX_BODY_BYTES:
+                    status, payload, keep_alive = 413, {'error': f"Body over {MAX_BODY_BYTES} bytes"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = await self.dispatch(method.upper(), target, body)
+                    except RequestError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except Exception as e:
+                        status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+                data = json.dumps(payload).encode('utf-8')
+                writer.write((f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8500, unix_socket=None):
+        """Listen until cancelled"""
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+            where = unix_socket
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            where = f"http://{host}:{port}"
+        print(f"Serving {len(self.registry)} model(s) on {where} (mode {self.mode}, batch <= {self.max_batch}, "
+              f"window {self.max_latency * 1000:.1f} ms)", flush=True)
+        async with server:
+            await server.serve_forever()
+
+def parse_pair(text, sep='='):
+    name, _, value = text.partition(sep)
+    if not value:
+        raise argparse.ArgumentTypeError(f"Expected NAME{sep}VALUE, got '{text}'")
+    return name, value
+
+def model_name(path):
+    """Default serving name for a file"""
+    name = os.path.basename(path)
+    return name[:-len(TORCHSCRIPT_SUFFIX)] if name.endswith(TORCHSCRIPT_SUFFIX) else os.path.splitext(name)[0]
+
+def add_parent_route(server, path, share):
+    """Route 'ab_<name>' sending `share` of traffic to a pruned model and the rest to its lineage parent"""
+    from lineage import get_parent
+    parent = get_parent(path)
+    if parent is None:
+        raise SystemExit(f"{path} has no recorded parent to A/B against")
+    child_name, parent_name = model_name(path), model_name(parent)
+    server.register(child_name, path)
+    server.register(parent_name, parent)
+    return server.add_route(f"ab_{child_name}", {child_name: share, parent_name: 1 - share})
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('models', nargs='*', help='checkpoints or artifacts to serve under their file stem')
+    parser.add_argument('--model', action='append', default=[], type=parse_pair, metavar='NAME=PATH',
+                        help='serve a file under an explicit name')
+    parser.add_argument('--ab', action='append', default=[], type=parse_pair, metavar='ROUTE=NAME:W,NAME:W',
+                        help='weighted A/B route over served models')
+    parser.add_argument('--ab-parent', action='append', default=[], metavar='PATH[:SHARE]',
+                        help="A/B a pruned model (default share 0.5) against its lineage parent")
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8500)
+    parser.add_argument('--unix-socket', type=str, default=None, help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0, help='how long a request may wait for batch-mates')
+    parser.add_argument('--max-resident', type=int, default=4, help='models kept loaded at once')
+    parser.add_argument('--inference-mode', type=str, default=DEFAULT_INFERENCE_MODE, choices=list(INFERENCE_MODES))
+    parser.add_argument('--threads', type=int, default=None, help='intra-op thread count')
+    parser.add_argument('--model-dir', type=str, default='saved', help='only directory POST /models may register from')
+    args = parser.parse_args()
+
+    configure_threads(args.threads, 1)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    server = InferenceServer(max_resident=args.max_resident, max_batch=args.max_batch,
+                             max_latency_ms=args.max_latency_ms, mode=args.inference_mode, device=device,
+                             model_dir=args.model_dir)
+    try:
+        for path in args.models:
+            server.register(model_name(path), path)
+        for name, path in args.model:
+            server.register(name, path)
+        for spec in args.ab_parent:
+            path, _, share = spec.partition(':')
+            add_parent_route(server, path, float(share) if share else 0.5)
+        for route, variants in args.ab:
+            server.add_route(route, {n: float(w) for n, w in (parse_pair(v, ':') for v in variants.split(','))})
+    except (RequestError, argparse.ArgumentTypeError, ValueError) as e:
+        raise SystemExit(str(e))
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
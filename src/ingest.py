@@ -0,0 +1,104 @@
+"""
+Upload Ingestion
+- Streams uploads to a temp file in chunks, hashing as it writes
+- Deduplicates identical content against the metadata index
+- Validates without executing pickle (weights_only load / flat header checks)
+- Normalizes state_dict keys, computes index metadata in the same pass
+- Atomically renames into place (or stores into the deduplicated model store)
+"""
+
+import os
+import hashlib
+import tempfile
+import torch
+from model import SimpleCNN, fix_state_dict
+from fingerprint import file_fingerprint, remember_fingerprint
+from flat_checkpoint import is_flat_checkpoint, read_flat_header
+from delta_checkpoint import materialize_dependents
+from checkpoint_io import load_state_dict, save_state_dict, checkpoint_path, MODEL_FILE_SUFFIXES
+from model_index import compute_checkpoint_metadata, record_checkpoint, find_by_fingerprint
+from lineage import register
+
+INCOMING_DIR = '.incoming'
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+def _stream_to_temp(fileobj, directory, suffix, chunk_size):
+    """Copy a file-like object to a temp file; returns (temp path, sha256 hex)"""
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=suffix)
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+def validate_state_dict(state):
+    """Reject checkpoints that share no correctly shaped tensors with SimpleCNN"""
+    reference = SimpleCNN().state_dict()
+    matched = 0
+    for name, tensor in state.items():
+        if not torch.is_tensor(tensor):
+            raise ValueError(f"'{name}' is not a tensor")
+        if name in reference:
+            if tuple(reference[name].shape) != tuple(tensor.shape):
+                raise ValueError(f"'{name}' has shape {tuple(tensor.shape)}, expected {tuple(reference[name].shape)}")
+            matched += 1
+    if matched == 0:
+        raise ValueError("no SimpleCNN parameters found in the checkpoint")
+
+def ingest_upload(fileobj, filename, saved_dir='saved', store=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Ingest an uploaded checkpoint; returns a dict describing the outcome"""
+    name = os.path.basename(filename)
+    if not name.endswith(MODEL_FILE_SUFFIXES) or name.endswith(('.manifest', '.delta')):
+        raise ValueError(f"{name}: only .pth and .safetensors files can be uploaded")
+    suffix = '.safetensors' if is_flat_checkpoint(name) else os.path.splitext(name)[1]
+    incoming = os.path.join(saved_dir, INCOMING_DIR)
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    tmp_path, fingerprint = _stream_to_temp(fileobj, incoming, suffix, chunk_size)
+    try:
+        # Identical content is already here: nothing to write
+        existing = find_by_fingerprint(fingerprint, saved_dir)
+        if existing is not None:
+            os.remove(tmp_path)
+            return {'path': existing, 'fingerprint': fingerprint, 'duplicate_of': existing, 'normalized': False}
+
+        if is_flat_checkpoint(tmp_path):
+            read_flat_header(tmp_path)
+        raw_state = load_state_dict(tmp_path, map_location='cpu', trusted=False, normalize=False)
+        state = fix_state_dict(raw_state)
+        normalized = state is not raw_state
+        del raw_state
+        validate_state_dict(state)
+        metadata = compute_checkpoint_metadata(state)
+
+        if store:
+            target = checkpoint_path(os.path.join(saved_dir, name), 'manifest')
+            save_state_dict(state, target, metadata={'uploaded_as': name})
+            del state
+            os.remove(tmp_path)
+        else:
+            target = os.path.join(saved_dir, name)
+            if normalized:
+                # Persist keys without the torch.compile prefix
+                save_state_dict({k: v.clone() for k, v in state.items()}, tmp_path)
+            del state
+            if os.path.exists(target):
+                materialize_dependents(target)  # Deltas pin the bytes about to be replaced
+            os.replace(tmp_path, target)
+            if not normalized:
+                remember_fingerprint(target, fingerprint)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    record_checkpoint(target, source='upload', metadata=metadata,
+                      extra={'uploaded_as': name, 'upload_fingerprint': fingerprint})
+    register(target, operation={'type': 'upload', 'uploaded_as': name})
+    return {'path': target, 'fingerprint': file_fingerprint(target), 'duplicate_of': None, 'normalized': normalized}
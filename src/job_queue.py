@@ -0,0 +1,282 @@
+"""
+Job Queue
+- Durable SQLite queue for heavy dashboard work (prune, evaluate, visualize, report, complexity)
+- Typed job specs validated at submit time
+- Priority ordering, retries with backoff, cancellation and a result pointer per job
+- Jobs claimed by crashed workers are requeued once their heartbeat goes stale
+- Optional de-duplication: identical pending work is shared instead of queued twice
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+DEFAULT_QUEUE_PATH = os.path.join('jobs', 'queue.db')
+STALE_AFTER_SECONDS = 120
+RETRY_BACKOFF_SECONDS = 10
+FINAL_STATUSES = ('done', 'failed', 'cancelled')
+
+_INITIALIZED = set()  # Databases whose schema this process already ensured
+_INIT_LOCK = threading.Lock()
+
+# Job kind -> {field: (type, required)}
+JOB_SPECS = {
+    'prune': {
+        'model_path': (str, True),
+        'method': (str, True),
+        'amount': (float, True),
+        'save_format': (str, False),
+        'evaluate': (bool, False),
+        'inference_mode': (str, False),
+        'comparison_plot': (bool, False)
+    },
+    'evaluate': {
+        'model_path': (str, True),
+        'inference_mode': (str, False)
+    },
+    'visualize': {
+        'model_path': (str, True),
+        'plots': (list, False),
+        'out_dir': (str, False)
+    },
+    'report': {
+        'model_path': (str, True),
+        'inference_mode': (str, False),
+        'out_dir': (str, False)
+    },
+    'complexity': {
+        'model_path': (str, True),
+        'other_path': (str, True),
+        'inference_mode': (str, False)
+    }
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 1,
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    progress REAL,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    heartbeat REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, id);
+"""
+
+def validate_spec(kind, spec):
+    """Check a job spec against JOB_SPECS; returns a clean copy"""
+    if kind not in JOB_SPECS:
+        raise ValueError(f"Unknown job kind '{kind}' (use one of {list(JOB_SPECS)})")
+    fields = JOB_SPECS[kind]
+    unknown = set(spec) - set(fields)
+    if unknown:
+        raise ValueError(f"{kind}: unknown spec fields {sorted(unknown)}")
+    clean = {}
+    for name, (field_type, required) in fields.items():
+        if name not in spec or spec[name] is None:
+            if required:
+                raise ValueError(f"{kind}: missing required field '{name}'")
+            continue
+        value = spec[name]
+        if field_type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, field_type):
+            raise ValueError(f"{kind}: '{name}' must be {field_type.__name__}, got {type(value).__name__}")
+        clean[name] = value
+    return clean
+
+def connect(db_path=DEFAULT_QUEUE_PATH):
+    """Open the queue database (WAL, so readers never block the workers)"""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA busy_timeout=30000')
+    key = os.path.abspath(db_path)
+    if key not in _INITIALIZED:
+        # WAL mode is stored in the database file: schema and journal mode are set up once per process
+        with _INIT_LOCK:
+            if key not in _INITIALIZED:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(_SCHEMA)
+                _INITIALIZED.add(key)
+    return conn
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job['spec'] = json.loads(job['spec'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    return job
+
+def submit(kind, spec, priority=0, max_retries=1, dedupe=False, db_path=DEFAULT_QUEUE_PATH):
+    """Queue a job; higher priority runs first. With dedupe, an identical pending job's id is returned instead"""
+    spec = validate_spec(kind, spec)
+    spec_json = json.dumps(spec, sort_keys=True)
+    conn = connect(db_path)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        if dedupe:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND spec = ? AND status IN ('queued', 'running') "
+                "AND cancel_requested = 0 ORDER BY id LIMIT 1",
+                (kind, spec_json)
+            ).fetchone()
+            if row is not None:
+                conn.execute('COMMIT')
+                return row['id']
+        cursor = conn.execute(
+            'INSERT INTO jobs (kind, spec, priority, max_retries, created) VALUES (?, ?, ?, ?, ?)',
+            (kind, spec_json, int(priority), int(max_retries), time.time())
+        )
+        conn.execute('COMMIT')
+        return cursor.lastrowid
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+def claim(worker, kinds=None, db_path=DEFAULT_QUEUE_PATH):
+    """Atomically take the next runnable job for a worker, or None"""
+    conn = connect(db_path)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        query = "SELECT * FROM jobs WHERE status = 'queued' AND not_before <= ?"
+        params = [time.time()]
+        if kinds:
+            query += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params += list(kinds)
+        row = conn.execute(query + ' ORDER BY priority DESC, id ASC LIMIT 1', params).fetchone()
+        if row is None:
+            conn.execute('COMMIT')
+            return None
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started = ?, heartbeat = ?, "
+            "progress = 0, message = NULL WHERE id = ?",
+            (worker, now, now, row['id'])
+        )
+        conn.execute('COMMIT')
+        return get_job(row['id'], db_path)
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+def _update(job_id, db_path, sql, params):
+    conn = connect(db_path)
+    try:
+        return conn.execute(sql, list(params) + [job_id]).rowcount
+    finally:
+        conn.close()
+
+def heartbeat(job_id, progress=None, message=None, db_path=DEFAULT_QUEUE_PATH):
+    """Record liveness (and optionally progress 0..1); returns True if cancellation was requested"""
+    _update(job_id, db_path,
+            'UPDATE jobs SET heartbeat = ?, progress = COALESCE(?, progress), message = COALESCE(?, message) WHERE id = ?',
+            (time.time(), progress, message))
+    job = get_job(job_id, db_path)
+    return bool(job and job['cancel_requested'])
+
+def complete(job_id, result=None, db_path=DEFAULT_QUEUE_PATH):
+    """Mark a job done with its result pointer (paths and small values, never tensors)"""
+    _update(job_id, db_path,
+            "UPDATE jobs SET status = 'done', progress = 1, result = ?, finished = ? WHERE id = ?",
+            (json.dumps(result or {}), time.time()))
+
+def fail(job_id, error, db_path=DEFAULT_QUEUE_PATH):
+    """Requeue a failed job with backoff while retries remain, else mark it failed"""
+    job = get_job(job_id, db_path)
+    if job is None:
+        return None
+    if job['cancel_requested']:
+        status = 'cancelled'
+    elif job['attempts'] <= job['max_retries']:
+        status = 'queued'
+    else:
+        status = 'failed'
+    _update(job_id, db_path,
+            'UPDATE jobs SET status = ?, error = ?, not_before = ?, finished = ? WHERE id = ?',
+            (status, str(error)[:4000], time.time() + RETRY_BACKOFF_SECONDS * job['attempts'],
+             time.time() if status in FINAL_STATUSES else None))
+    return status
+
+def cancel(job_id, db_path=DEFAULT_QUEUE_PATH):
+    """Cancel a queued job now, or ask the worker running it to stop"""
+    _update(job_id, db_path,
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE status = 'queued' AND id = ?", (time.time(),))
+    _update(job_id, db_path, "UPDATE jobs SET cancel_requested = 1 WHERE status = 'running' AND id = ?", ())
+    return get_job(job_id, db_path)
+
+def requeue_stale(stale_after=STALE_AFTER_SECONDS, db_path=DEFAULT_QUEUE_PATH):
+    """Return jobs whose worker stopped heartbeating to the queue (or fail them when out of retries)"""
+    conn = connect(db_path)
+    try:
+        cutoff = time.time() - stale_after
+        rows = conn.execute("SELECT id FROM jobs WHERE status = 'running' AND heartbeat < ?", (cutoff,)).fetchall()
+    finally:
+        conn.close()
+    for row in rows:
+        fail(row['id'], 'worker stopped responding', db_path)
+    return len(rows)
+
+def get_job(job_id, db_path=DEFAULT_QUEUE_PATH):
+    """Job record as a dict, or None"""
+    conn = connect(db_path)
+    try:
+        return _row_to_job(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+def list_jobs(status=None, limit=50, db_path=DEFAULT_QUEUE_PATH):
+    """Most recent jobs first, optionally filtered by status"""
+    conn = connect(db_path)
+    try:
+        if status:
+            statuses = (status,) if isinstance(status, str) else tuple(status)
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY id DESC LIMIT ?",
+                statuses + (limit,)
+            ).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+    finally:
+        conn.close()
+
+def queue_counts(db_path=DEFAULT_QUEUE_PATH):
+    """Number of jobs per status"""
+    conn = connect(db_path)
+    try:
+        return {row['status']: row['n'] for row in conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status')}
+    finally:
+        conn.close()
+
+def purge_finished(max_age_hours=24 * 7, db_path=DEFAULT_QUEUE_PATH):
+    """Delete finished jobs older than max_age_hours; returns how many were removed"""
+    conn = connect(db_path)
+    try:
+        placeholders = ','.join('?' * len(FINAL_STATUSES))
+        return conn.execute(f'DELETE FROM jobs WHERE status IN ({placeholders}) AND finished < ?',
+                            FINAL_STATUSES + (time.time() - max_age_hours * 3600,)).rowcount
+    finally:
+        conn.close()
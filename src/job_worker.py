@@ -0,0 +1,487 @@
+"""
+Job Workers
+- Pool of worker processes draining the SQLite job queue
+- Handlers for prune, evaluate, visualize, report and complexity jobs
+- Host cores are split between workers (torch intra-op threads per worker)
+- Benchmark jobs hold the host-wide cores lock exclusively, other jobs share it
+- Heartbeats keep claimed jobs alive; dead workers are replaced and their jobs requeued
+- Runs detached from the dashboard, so jobs survive reruns and app restarts
+"""
+
+import os
+import sys
+import time
+import json
+import signal
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import torch
+from fingerprint import file_fingerprint
+from checkpoint_io import load_state_dict, save_state_dict, checkpoint_path, delete_checkpoint_file
+from model import SimpleCNN
+from model_index import record_checkpoint, get_checkpoint_metadata, remove_checkpoint
+from model_cache import ModelCache
+from lineage import register, next_version, version_lock, remove as remove_lineage
+from evaluation import build_test_loader, collect_logits
+from logits_cache import save_logits, load_logits, load_labels, load_logits_meta, logits_lock
+from logit_metrics import accuracy_from_logits
+from inference import DEFAULT_INFERENCE_MODE, resolve_mode, configure_threads, describe_mode
+from resource_governor import host_cores
+from coordination import file_lock, lock_path_for, atomic_write
+from job_queue import (DEFAULT_QUEUE_PATH, STALE_AFTER_SECONDS, claim, heartbeat, complete, fail,
+                       requeue_stale)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+HEARTBEAT_SECONDS = 15
+PROGRESS_INTERVAL_SECONDS = 1.0  # Progress calls (one per evaluation batch) write to the queue at most this often
+POLL_SECONDS = 1.0
+PID_FILE = os.path.join('jobs', 'workers.pid')
+WORKER_LOG = os.path.join('jobs', 'workers.log')
+VISUALIZATIONS = ('distributions', 'heatmap', 'sparsity', 'stats')
+BENCHMARK_KINDS = ('report', 'complexity')  # Latency numbers need the host's cores to themselves
+STATE_CACHE = None  # Enabled by long-lived processes (the daemon) to keep checkpoints in memory
+
+class JobCancelled(Exception):
+    """Raised inside a handler once the job's cancellation was requested"""
+
+class JobContext:
+    """Progress reporting for a running job (also the point where cancellation is noticed)"""
+
+    def __init__(self, job, db_path):
+        self.job = job
+        self.db_path = db_path
+        self._last_write = None
+        self._last_message = None
+
+    def progress(self, fraction, message=None):
+        now = time.monotonic()
+        if (message == self._last_message and self._last_write is not None
+                and now - self._last_write < PROGRESS_INTERVAL_SECONDS):
+            return
+        self._last_write, self._last_message = now, message
+        if heartbeat(self.job['id'], progress=fraction, message=message, db_path=self.db_path):
+            raise JobCancelled()
+
+    def scaled(self, start, end, message):
+        """(done, total) callback mapping a sub-step onto [start, end] of the job's progress"""
+        return lambda done, total: self.progress(start + (end - start) * done / max(1, total), message)
+
+def default_workers():
+    """Worker count for this host (leave cores for the dashboard itself)"""
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+def threads_per_worker(num_workers):
+    """Intra-op threads each worker gets so the pool never oversubscribes the host"""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+def enable_state_cache(max_bytes):
+    """Serve repeated checkpoint loads in this process from an LRU cache"""
+    global STATE_CACHE
+    STATE_CACHE = ModelCache(max_bytes=max_bytes)
+    return STATE_CACHE
+
+def load_state(path, map_location='cpu'):
+    """load_state_dict, through the state cache when one is enabled (treat the result as read-only)"""
+    if STATE_CACHE is None:
+        return load_state_dict(path, map_location=map_location)
+    fingerprint = file_fingerprint(path)
+    return STATE_CACHE.get_or_load(('state', fingerprint, str(map_location)),
+                                   lambda: load_state_dict(path, map_location=map_location), fingerprint=fingerprint)
+
+def _device():
+    return torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+def _build_model(state, device):
+    model = SimpleCNN().to(device)
+    model.load_state_dict(state, strict=False)
+    model.eval()
+    return model
+
+def cached_evaluation(fingerprint):
+    """Evaluation details rebuilt from cached logits, or None"""
+    logits = load_logits(fingerprint)
+    labels = load_labels()
+    if logits is None or labels is None or len(logits) != len(labels):
+        return None
+    details = load_logits_meta(fingerprint)
+    details['accuracy'] = accuracy_from_logits(logits, labels)
+    details['source'] = 'logits_cache'
+    return details
+
+def evaluate_checkpoint(model_path, mode=DEFAULT_INFERENCE_MODE, progress=None, state=None):
+    """Forward pass over the test set; logits go to the shared cache the dashboard reads"""
+    fingerprint = file_fingerprint(model_path)
+    details = cached_evaluation(fingerprint)
+    if details is not None:
+        return details
+    # Workers and dashboard sessions asking for the same checkpoint wait for one forward pass
+    with logits_lock(fingerprint):
+        details = cached_evaluation(fingerprint)
+        if details is not None:
+            return details
+        return _forward_evaluation(model_path, fingerprint, mode, progress, state)
+
+def _forward_logits(state, mode, progress):
+    """Test-set logits straight from an in-memory state_dict"""
+    device = _device()
+    mode = resolve_mode(mode, device)
+    model = _build_model(state, device)
+    start = time.perf_counter()
+    logits, labels = collect_logits(model, build_test_loader(), device, progress_callback=progress, mode=mode)
+    elapsed = time.perf_counter() - start
+    details = {
+        'accuracy': accuracy_from_logits(logits.numpy(), labels.numpy()),
+        'samples_per_sec': len(labels) / elapsed if elapsed > 0 else 0.0,
+        'source': 'forward'
+    }
+    details.update(describe_mode(mode))
+    return logits, labels, details
+
+def _store_logits(model_path, fingerprint, logits, labels, details):
+    meta = {'model_path': model_path}
+    meta.update(details)
+    save_logits(fingerprint, logits, labels, meta=meta)
+    return details
+
+def _forward_evaluation(model_path, fingerprint, mode, progress, state):
+    if state is None:
+        state = load_state(model_path)
+    logits, labels, details = _forward_logits(state, mode, progress)
+    return _store_logits(model_path, fingerprint, logits, labels, details)
+
+def _figures_since(out_dir, prefix, since):
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(os.path.join(out_dir, f) for f in os.listdir(out_dir)
+                  if f.startswith(prefix) and f.endswith('.png')
+                  and os.path.getmtime(os.path.join(out_dir, f)) >= since)
+
+def _save_pruned(parent, pruned_state, method, amount, save_format, job_id):
+    """Write a pruned checkpoint and record it in the index and lineage; returns (path, index entry)"""
+    saved_dir = os.path.dirname(parent) or '.'
+    parent_fingerprint = file_fingerprint(parent)
+    operation = {'type': 'prune', 'method': method, 'amount': amount}
+    # The version is part of the file name: hold the lock until lineage has recorded it
+    with version_lock(saved_dir):
+        version = next_version(parent, saved_dir)
+        pruned_path = checkpoint_path(os.path.join(saved_dir, f"pruned_{method}_{int(amount*100)}_v{version.replace('v', '')}.pth"),
+                                      save_format)
+        save_state_dict(pruned_state, pruned_path, parent_path=parent)
+        entry = record_checkpoint(pruned_path, pruned_state, source='prune_job',
+                                  extra={'parent': parent, 'parent_fingerprint': parent_fingerprint, 'method': method,
+                                         'amount': amount, 'job_id': job_id})
+        register(pruned_path, parent_path=parent, parent_fingerprint=parent_fingerprint, operation=operation)
+    return pruned_path, entry
+
+def _discard_pruned(saving):
+    """Remove the checkpoint of a prune job that failed or was cancelled after its save started"""
+    try:
+        pruned_path, _ = saving.result()
+    except Exception:
+        return  # The save failed: nothing was written
+    delete_checkpoint_file(pruned_path)
+    remove_checkpoint(pruned_path)
+    remove_lineage(pruned_path)
+
+def run_prune(spec, ctx):
+    """Prune a checkpoint, save it with lineage, optionally evaluate and plot the comparison"""
+    from advanced_prune import apply_pruning, method_key
+    parent = spec['model_path']
+    method = method_key(spec['method'])
+    amount = spec['amount']
+    device = _device()
+    ctx.progress(0.1, 'Loading model')
+    state = load_state(parent, map_location=device)
+    ctx.progress(0.2, 'Pruning')
+    pruned_state = apply_pruning(state, method, amount, device=device)
+
+    # Pipeline: the checkpoint is written on a background thread while the evaluation and the
+    # comparison plot work from the in-memory tensors; only the logits cache needs the file's fingerprint
+    ctx.progress(0.3, 'Saving and evaluating' if spec.get('evaluate', True) else 'Saving')
+    evaluation = None
+    figures = None
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='save') as saver:
+        saving = saver.submit(_save_pruned, parent, pruned_state, method, amount, spec.get('save_format', 'pth'),
+                              ctx.job['id'])
+        try:
+            if spec.get('evaluate', True):
+                evaluation = _forward_logits(pruned_state, spec.get('inference_mode', DEFAULT_INFERENCE_MODE),
+                                             ctx.scaled(0.3, 0.9, 'Evaluating'))
+            if spec.get('comparison_plot', True):
+                ctx.progress(0.9, 'Plotting')
+                try:
+                    from advanced_visualize import plot_pruning_comparison
+                    prefix = f"prune_{method}_{int(amount*100)}"
+                    started = time.time()
+                    plot_pruning_comparison(state, pruned_state, out_dir='assets', prefix=prefix)
+                    figures = _figures_since('assets', prefix, started)
+                except ImportError:
+                    pass
+            if not saving.done():
+                ctx.progress(0.95, 'Saving')
+            pruned_path, entry = saving.result()
+
+            result = {'path': pruned_path, 'parent': parent, 'method': method, 'amount': amount,
+                      'sparsity': entry.get('sparsity')}
+            if figures is not None:
+                result['figures'] = figures
+            if evaluation is not None:
+                logits, labels, details = evaluation
+                fingerprint = file_fingerprint(pruned_path)
+                with logits_lock(fingerprint):
+                    result['evaluation'] = _store_logits(pruned_path, fingerprint, logits, labels, details)
+        except BaseException:
+            # Failed or cancelled: the save cannot be interrupted, so let it finish and take the
+            # checkpoint back out. A half-finished prune never stays registered
+            _discard_pruned(saving)
+            raise
+    return result
+
+def run_evaluate(spec, ctx):
+    """Test-set accuracy for a checkpoint (logits cached for the dashboard)"""
+    ctx.progress(0.0, 'Evaluating')
+    return evaluate_checkpoint(spec['model_path'], spec.get('inference_mode', DEFAULT_INFERENCE_MODE),
+                               ctx.scaled(0.0, 1.0, 'Evaluating'))
+
+def run_visualize(spec, ctx):
+    """Weight distribution, heatmap, sparsity and layer statistics figures"""
+    import advanced_visualize
+    plotters = {
+        'distributions': (advanced_visualize.plot_weight_distributions, 'dist'),
+        'heatmap': (advanced_visualize.plot_weight_heatmap, 'heatmap'),
+        'sparsity': (advanced_visualize.plot_sparsity_analysis, 'sparsity'),
+        'stats': (advanced_visualize.plot_layer_statistics, 'stats')
+    }
+    plots = spec.get('plots') or list(VISUALIZATIONS)
+    unknown = [p for p in plots if p not in plotters]
+    if unknown:
+        raise ValueError(f"Unknown plots {unknown} (use {list(VISUALIZATIONS)})")
+    out_dir = spec.get('out_dir', 'assets')
+    stem = os.path.splitext(os.path.basename(spec['model_path']))[0]
+    state = load_state(spec['model_path'])
+    started = time.time()
+    for i, name in enumerate(plots):
+        ctx.progress(i / len(plots), f"Plotting {name}")
+        plot, suffix = plotters[name]
+        plot(state, out_dir=out_dir, prefix=f"{stem}_{suffix}")
+    from bundle_export import figures_for
+    return {'figures': [f for f in figures_for(spec['model_path'], out_dir) if os.path.getmtime(f) >= started]}
+
+def model_complexity(state, mode=DEFAULT_INFERENCE_MODE):
+    """FLOPs, in-memory size and latency for a state_dict"""
+    from model_analyzer import calculate_flops, get_model_size_mb, measure_inference_time
+    device = _device()
+    model = _build_model(state, device)
+    return {
+        'flops': calculate_flops(model),
+        'size_mb': get_model_size_mb(model),
+        'params': sum(p.numel() for p in model.parameters()),
+        'inference_time': measure_inference_time(model, device=device.type, mode=resolve_mode(mode, device))
+    }
+
+def render_report(model_path, info, evaluation, complexity):
+    """Plain-text analysis report for a checkpoint"""
+    accuracy = evaluation.get('accuracy') if evaluation else None
+    inference = (complexity or {}).get('inference_time', {})
+    return f"""
+╔══════════════════════════════════════════════════════════════╗
+║         PARAMETER PRUNING MODEL ANALYSIS REPORT              ║
+╚══════════════════════════════════════════════════════════════╝
+
+Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
+
+MODEL INFORMATION
+─────────────────
+Model File: {os.path.basename(model_path)}
+Full Path: {model_path}
+File Size: {info['file_size_mb']:.2f} MB
+
+ARCHITECTURE
+────────────
+Total Parameters: {info['total_params']:,}
+Trainable Parameters: {info['trainable_params']:,}
+Current Sparsity: {info['sparsity']:.2%}
+
+PERFORMANCE METRICS
+───────────────────
+Test Accuracy: {f"{accuracy:.2f}%" if accuracy is not None else "Not evaluated"}
+FLOPs: {f"{complexity['flops']/1e6:.2f}M" if complexity else "N/A"}
+Model Size: {f"{complexity['size_mb']:.2f}" if complexity else f"{info['file_size_mb']:.2f}"} MB
+Inference Time: {inference.get('mean', 'N/A')} ms
+Inference Mode: {inference.get('inference_mode', 'N/A')}
+Accuracy Mode: {evaluation.get('inference_mode', 'N/A') if evaluation else 'N/A'}
+
+ANALYSIS
+────────
+This model has been analyzed using advanced pruning techniques.
+Sparsity indicates the percentage of zero parameters in the model.
+
+═══════════════════════════════════════════════════════════════
+Report generated by Parameter Pruning Dashboard
+"""
+
+def run_report(spec, ctx):
+    """Evaluate, measure and write a text report; returns its path"""
+    model_path = spec['model_path']
+    mode = spec.get('inference_mode', DEFAULT_INFERENCE_MODE)
+    ctx.progress(0.0, 'Reading metadata')
+    info = get_checkpoint_metadata(model_path, state_loader=load_state)
+    ctx.progress(0.1, 'Evaluating')
+    evaluation = evaluate_checkpoint(model_path, mode, ctx.scaled(0.1, 0.9, 'Evaluating'))
+    ctx.progress(0.9, 'Measuring complexity')
+    try:
+        complexity = model_complexity(load_state(model_path), mode)
+    except ImportError:
+        complexity = None
+    out_dir = spec.get('out_dir', 'reports')
+    report_path = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(model_path))[0]}_full_report.txt")
+    with atomic_write(report_path, 'w', encoding='utf-8', fsync=False) as f:
+        f.write(render_report(model_path, info, evaluation, complexity))
+    return {'report': report_path, 'accuracy': evaluation.get('accuracy')}
+
+def run_complexity(spec, ctx):
+    """Side-by-side FLOPs, size and latency for two checkpoints"""
+    from model_analyzer import compare_model_complexity
+    ctx.progress(0.1, 'Loading models')
+    states = [load_state(spec[key]) for key in ('model_path', 'other_path')]
+    ctx.progress(0.3, 'Measuring')
+    results = compare_model_complexity(states[0], states[1], mode=spec.get('inference_mode', DEFAULT_INFERENCE_MODE))
+    return {spec['model_path']: results['model1'], spec['other_path']: results['model2']}
+
+HANDLERS = {
+    'prune': run_prune,
+    'evaluate': run_evaluate,
+    'visualize': run_visualize,
+    'report': run_report,
+    'complexity': run_complexity
+}
+
+def _keep_alive(job_id, db_path, stop):
+    # Heartbeats between progress calls (e.g. a slow dataset download)
+    while not stop.wait(HEARTBEAT_SECONDS):
+        heartbeat(job_id, db_path=db_path)
+
+def run_job(job, db_path=DEFAULT_QUEUE_PATH):
+    """Run one claimed job to completion, failure or cancellation"""
+    ctx = JobContext(job, db_path)
+    stop = threading.Event()
+    threading.Thread(target=_keep_alive, args=(job['id'], db_path, stop), daemon=True).start()
+    try:
+        with host_cores(exclusive=job['kind'] in BENCHMARK_KINDS):
+            result = HANDLERS[job['kind']](job['spec'], ctx)
+        complete(job['id'], result, db_path)
+    except JobCancelled:
+        fail(job['id'], 'cancelled', db_path)
+    except Exception as e:
+        fail(job['id'], f"{type(e).__name__}: {e}", db_path)
+    finally:
+        stop.set()
+
+def worker_loop(worker_name, num_threads, db_path=DEFAULT_QUEUE_PATH, stop=None):
+    """Claim and run jobs until stopped"""
+    configure_threads(num_threads, 1)
+    import matplotlib
+    matplotlib.use('Agg')
+    while stop is None or not stop.is_set():
+        job = claim(worker_name, db_path=db_path)
+        if job is None:
+            time.sleep(POLL_SECONDS)
+            continue
+        run_job(job, db_path)
+
+def run_pool(num_workers=None, db_path=DEFAULT_QUEUE_PATH):
+    """Supervise worker processes: restart dead ones, requeue their abandoned jobs"""
+    num_workers = num_workers or default_workers()
+    threads = threads_per_worker(num_workers)
+    ctx = multiprocessing.get_context('spawn')
+    stop = ctx.Event()
+    workers = {}
+
+    def shutdown(signum, frame):
+        stop.set()
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"Starting {num_workers} worker(s) with {threads} thread(s) each", flush=True)
+    while not stop.is_set():
+        for i in range(num_workers):
+            process = workers.get(i)
+            if process is None or not process.is_alive():
+                name = f"{os.getpid()}-{i}"
+                process = ctx.Process(target=worker_loop, args=(name, threads, db_path, stop), daemon=True)
+                process.start()
+                workers[i] = process
+        requeue_stale(STALE_AFTER_SECONDS, db_path)
+        stop.wait(5)
+    for process in workers.values():
+        process.join(timeout=30)
+        if process.is_alive():
+            process.terminate()
+
+_POOL_PROCESSES = {}  # pid -> Popen for pools started by this process (polling reaps them)
+
+def _pid_alive(pid):
+    process = _POOL_PROCESSES.get(pid)
+    if process is not None:
+        return process.poll() is None
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+def pool_pid():
+    """PID of the running worker pool, or None"""
+    try:
+        with open(PID_FILE) as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return info['pid'] if _pid_alive(info['pid']) else None
+
+def ensure_pool(num_workers=None, db_path=DEFAULT_QUEUE_PATH):
+    """Start a detached worker pool unless one is already running; returns its PID"""
+    # Sessions starting up together must not each launch a pool
+    with file_lock(lock_path_for(PID_FILE)):
+        pid = pool_pid()
+        if pid is not None:
+            return pid
+        return _start_pool(num_workers, db_path)
+
+def _start_pool(num_workers, db_path):
+    cmd = [sys.executable, os.path.abspath(__file__), '--db', db_path]
+    if num_workers:
+        cmd += ['--workers', str(num_workers)]
+    popen_kwargs = {}
+    if os.name == 'nt':
+        popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs['start_new_session'] = True
+    with open(WORKER_LOG, 'ab') as log:
+        process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **popen_kwargs)
+    _POOL_PROCESSES[process.pid] = process
+    with atomic_write(PID_FILE, 'w', fsync=False) as f:
+        json.dump({'pid': process.pid, 'workers': num_workers or default_workers(), 'started': time.time()}, f)
+    return process.pid
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: half the cores, max 4)')
+    parser.add_argument('--db', type=str, default=DEFAULT_QUEUE_PATH)
+    args = parser.parse_args()
+    run_pool(args.workers, args.db)
@@ -0,0 +1,116 @@
+"""
+Lazy Imports
+- LazyModule: stand-in that imports the real module on its first attribute access
+- is_available / missing: dependency checks with importlib.util.find_spec (nothing is imported)
+- Deferred imports record how long they took, for the startup diagnostics
+- import_time_report: `python -X importtime` breakdown of a fresh interpreter
+"""
+
+import sys
+import time
+import threading
+import importlib
+import importlib.util
+import subprocess
+
+_LOAD_TIMES = {}
+_LOCK = threading.Lock()
+
+class LazyModule:
+    """Module proxy; the import happens once, on first attribute access"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _LOCK:
+                module = self.__dict__['_module']
+                if module is None:
+                    cached = self._name in sys.modules
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if not cached:
+                        _LOAD_TIMES[self._name] = time.perf_counter() - start
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}' ({'loaded' if self.loaded else 'not loaded'})>"
+
+def lazy_module(name):
+    """LazyModule for name (use in place of `import name`)"""
+    return LazyModule(name)
+
+def is_available(name):
+    """Whether name can be imported; only parent packages of dotted names get imported"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def missing(names):
+    """Names from names that cannot be imported"""
+    importlib.invalidate_caches()  # Packages installed since startup become visible
+    return [name for name in names if not is_available(name)]
+
+def deferred_import_times():
+    """Seconds spent in each deferred import so far in this process"""
+    with _LOCK:
+        return dict(_LOAD_TIMES)
+
+def _parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+    return rows
+
+def import_time_report(modules, top=20, python=None, cwd=None):
+    """Cold import cost of modules in a fresh interpreter (`-X importtime`), slowest first"""
+    code = '; '.join(f"import {name}" for name in modules)
+    result = subprocess.run([python or sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=cwd)
+    rows = _parse_importtime(result.stderr)
+    packages = {name.split('.')[0] for name in modules}
+    # Depth-0 rows also include the interpreter's own startup imports (site, encodings, ...)
+    roots = [row for row in rows if row['depth'] == 0 and row['module'].split('.')[0] in packages]
+    return {
+        'modules': list(modules),
+        'total_ms': sum(row['cumulative_ms'] for row in roots),
+        'top_level': sorted(roots, key=lambda row: row['cumulative_ms'], reverse=True),
+        'slowest': sorted(rows, key=lambda row: row['cumulative_ms'], reverse=True)[:top],
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode != 0 and result.stderr.strip() else None
+    }
+
+def format_import_report(report):
+    """Plain-text table of an import_time_report"""
+    lines = [f"Cold import of {', '.join(report['modules'])}: {report['total_ms']:.0f} ms"]
+    if report['error']:
+        lines.append(f"Import failed: {report['error']}")
+    lines.append(f"{'cumulative':>12} {'self':>10}  module")
+    for row in report['slowest']:
+        lines.append(f"{row['cumulative_ms']:>10.1f}ms {row['self_ms']:>8.1f}ms  {'  ' * row['depth']}{row['module']}")
+    return '\n'.join(lines)
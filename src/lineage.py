@@ -0,0 +1,229 @@
+"""
+Model Lineage and Versions
+- Persistent record of parent, operation and semantic version per checkpoint
+- Written at creation time (train, prune, upload); legacy files backfilled once
+- O(1) lookups for version, parent, children, lineage root and rollback target
+- Updates hold a file lock; version_lock serialises "pick a version, write the file, register" sequences
+"""
+
+import os
+import re
+import json
+import time
+from fingerprint import file_fingerprint
+from coordination import file_lock, lock_path_for, atomic_write
+
+LINEAGE_FILE = 'lineage.json'
+LINEAGE_VERSION = 1
+LEGACY_VERSION_PATTERN = re.compile(r'_v(\d+)\.(\d+)$')
+
+_LINEAGE_MEMO = {}
+
+def lineage_path(saved_dir='saved'):
+    """Location of the lineage index for a save directory"""
+    return os.path.join(saved_dir, LINEAGE_FILE)
+
+def _empty():
+    return {'version': LINEAGE_VERSION, 'models': {}, 'children': {}}
+
+def _build_children(models):
+    children = {}
+    for name, entry in models.items():
+        parent = entry.get('parent')
+        if parent:
+            children.setdefault(parent, []).append(name)
+    return children
+
+def load_lineage(saved_dir='saved'):
+    """Read the lineage index (memoized until the file changes on disk)"""
+    path = lineage_path(saved_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return _empty()
+    memo = _LINEAGE_MEMO.get(path)
+    if memo and memo[0] == mtime:
+        return memo[1]
+    try:
+        with open(path) as f:
+            lineage = json.load(f)
+    except (ValueError, OSError):
+        lineage = _empty()
+    lineage.setdefault('models', {})
+    lineage['children'] = _build_children(lineage['models'])
+    _LINEAGE_MEMO[path] = (mtime, lineage)
+    return lineage
+
+def save_lineage(lineage, saved_dir='saved'):
+    """Write the lineage index atomically"""
+    path = lineage_path(saved_dir)
+    data = {k: v for k, v in lineage.items() if k != 'children'}
+    with atomic_write(path, 'w', fsync=False) as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    _LINEAGE_MEMO.pop(path, None)
+
+def lineage_lock(saved_dir='saved'):
+    """Exclusive lock to hold across load_lineage -> modify -> save_lineage"""
+    return file_lock(lock_path_for(lineage_path(saved_dir)))
+
+def version_lock(saved_dir='saved'):
+    """Held from next_version until register, so two writers never claim the same versioned file name"""
+    return file_lock(os.path.join(saved_dir, '.versions.lock'))
+
+def _parse_version(version):
+    major, minor = version.lstrip('v').split('.')
+    return int(major), int(minor)
+
+def _format_version(major, minor):
+    return f"v{major}.{minor}"
+
+def _next_in_family(lineage, root):
+    """Next minor version among models sharing a lineage root"""
+    versions = [_parse_version(e['version']) for e in lineage['models'].values() if e.get('root') == root]
+    if not versions:
+        return _format_version(1, 0)
+    major, minor = max(versions)
+    return _format_version(major, minor + 1)
+
+def next_version(parent_path=None, saved_dir='saved'):
+    """Version a new checkpoint would get (derived from parent_path, or a new root)"""
+    lineage = load_lineage(saved_dir)
+    parent = lineage['models'].get(os.path.basename(parent_path)) if parent_path else None
+    if parent is None:
+        return _format_version(1, 0)
+    return _next_in_family(lineage, parent['root'])
+
+def register(path, parent_path=None, operation=None, parent_fingerprint=None):
+    """Record a checkpoint at creation time; returns its lineage entry"""
+    saved_dir = os.path.dirname(path) or '.'
+    name = os.path.basename(path)
+    fingerprint = file_fingerprint(path)
+    with lineage_lock(saved_dir):
+        lineage = load_lineage(saved_dir)
+        models = lineage['models']
+        previous = models.get(name)
+        if previous is not None and previous.get('fingerprint') == fingerprint:
+            return previous  # Same content registered again (e.g. a dashboard rerun)
+        parent_name = os.path.basename(parent_path) if parent_path else None
+        parent = models.get(parent_name) if parent_name else None
+
+        if parent is not None:
+            root = parent['root']
+            version = _next_in_family(lineage, root)
+        else:
+            root = name
+            if previous is not None and previous.get('root') == name:
+                # Re-creating a root (e.g. retraining the baseline) is a major version bump
+                major, _ = _parse_version(previous['version'])
+                version = _format_version(major + 1, 0)
+            else:
+                version = _format_version(1, 0)
+
+        entry = {
+            'fingerprint': fingerprint,
+            'parent': parent_name,
+            'parent_fingerprint': parent_fingerprint,
+            'root': root,
+            'version': version,
+            'operation': operation or {},
+            'created': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        models[name] = entry
+        save_lineage(lineage, saved_dir)
+    return entry
+
+def remove(path):
+    """Drop a checkpoint from the lineage index (children keep their parent reference)"""
+    saved_dir = os.path.dirname(path) or '.'
+    with lineage_lock(saved_dir):
+        lineage = load_lineage(saved_dir)
+        if lineage['models'].pop(os.path.basename(path), None) is not None:
+            save_lineage(lineage, saved_dir)
+
+def rename(path, new_path):
+    """Move a checkpoint's entry to a new file name (same directory); children follow it"""
+    saved_dir = os.path.dirname(path) or '.'
+    name, new_name = os.path.basename(path), os.path.basename(new_path)
+    with lineage_lock(saved_dir):
+        lineage = load_lineage(saved_dir)
+        models = lineage['models']
+        entry = models.pop(name, None)
+        if entry is None:
+            return None
+        entry['fingerprint'] = file_fingerprint(new_path)
+        if entry.get('root') == name:
+            entry['root'] = new_name
+        models[new_name] = entry
+        for other in models.values():
+            if other.get('parent') == name:
+                other['parent'] = new_name
+                other['parent_fingerprint'] = entry['fingerprint']
+            if other.get('root') == name:
+                other['root'] = new_name
+        save_lineage(lineage, saved_dir)
+    return entry
+
+def get_entry(path):
+    """Lineage entry for a checkpoint, or None"""
+    return load_lineage(os.path.dirname(path) or '.')['models'].get(os.path.basename(path))
+
+def get_version(path):
+    """Semantic version of a checkpoint"""
+    entry = get_entry(path)
+    return entry['version'] if entry else _format_version(1, 0)
+
+def _sibling(path, name):
+    return os.path.join(os.path.dirname(path), name) if name else None
+
+def get_parent(path):
+    """Path of the checkpoint this one was derived from, if it still exists"""
+    entry = get_entry(path)
+    parent = _sibling(path, entry.get('parent')) if entry else None
+    return parent if parent and os.path.exists(parent) else None
+
+def get_children(path):
+    """Paths of checkpoints derived directly from this one"""
+    lineage = load_lineage(os.path.dirname(path) or '.')
+    return [_sibling(path, name) for name in lineage['children'].get(os.path.basename(path), [])]
+
+def get_root(path):
+    """Path of the lineage root (the trained or uploaded ancestor)"""
+    entry = get_entry(path)
+    root = _sibling(path, entry.get('root')) if entry else None
+    return root if root and os.path.exists(root) else None
+
+def rollback_target(path):
+    """Checkpoint to fall back to: the parent this one was derived from"""
+    return get_parent(path)
+
+def backfill(paths, saved_dir='saved', parent_hints=None):
+    """Register checkpoints created before the lineage index existed (one write for all)"""
+    known = load_lineage(saved_dir)['models']
+    if all(os.path.basename(p) in known for p in paths):
+        return 0  # Common case on every rerun: no lock needed
+    with lineage_lock(saved_dir):
+        lineage = load_lineage(saved_dir)
+        models = lineage['models']
+        parent_hints = parent_hints or {}
+        missing = [p for p in paths if os.path.basename(p) not in models]
+        if not missing:
+            return 0
+        # Parents first so children can inherit the root
+        missing.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        for path in missing:
+            name = os.path.basename(path)
+            parent_name = parent_hints.get(name)
+            parent = models.get(parent_name) if parent_name else None
+            match = LEGACY_VERSION_PATTERN.search(os.path.splitext(name)[0])
+            version = _format_version(int(match.group(1)), int(match.group(2))) if match else _format_version(1, 0)
+            models[name] = {
+                'parent': parent_name,
+                'parent_fingerprint': None,
+                'root': parent['root'] if parent else name,
+                'version': version,
+                'operation': {'type': 'legacy'},
+                'created': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(os.path.getmtime(path)))
+                           if os.path.exists(path) else None
+            }
+        save_lineage(lineage, saved_dir)
+        return len(missing)
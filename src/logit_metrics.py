@@ -0,0 +1,86 @@
+"""
+Logit-based Metrics
+- Accuracy straight from cached logits
+- Prediction agreement and fidelity vs a parent model
+- Flipped-sample lists after pruning
+- Ensemble accuracy (averaged softmax)
+"""
+
+import numpy as np
+
+def _as_float(logits):
+    return np.asarray(logits, dtype=np.float32)
+
+def softmax(logits):
+    """Numerically stable row-wise softmax"""
+    logits = _as_float(logits)
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def predictions(logits):
+    """Top-1 class per sample"""
+    return np.asarray(logits).argmax(axis=1)
+
+def accuracy_from_logits(logits, labels):
+    """Top-1 accuracy (%)"""
+    labels = np.asarray(labels)
+    if len(labels) == 0:
+        return 0.0
+    return 100. * float((predictions(logits) == labels).mean())
+
+def prediction_agreement(logits, parent_logits):
+    """Share of samples (%) where both models predict the same class"""
+    preds = predictions(logits)
+    if len(preds) == 0:
+        return 0.0
+    return 100. * float((preds == predictions(parent_logits)).mean())
+
+def fidelity(logits, parent_logits, labels):
+    """Agreement (%) restricted to samples the parent classifies correctly"""
+    labels = np.asarray(labels)
+    parent_correct = predictions(parent_logits) == labels
+    if not parent_correct.any():
+        return 0.0
+    return 100. * float((predictions(logits)[parent_correct] == labels[parent_correct]).mean())
+
+def kl_divergence(logits, parent_logits, eps=1e-8):
+    """Mean KL(parent || model) over samples"""
+    p = softmax(parent_logits)
+    q = softmax(logits)
+    return float((p * (np.log(p + eps) - np.log(q + eps))).sum(axis=1).mean())
+
+def flipped_samples(logits, parent_logits, labels):
+    """Indices whose correctness changed relative to the parent"""
+    labels = np.asarray(labels)
+    correct = predictions(logits) == labels
+    parent_correct = predictions(parent_logits) == labels
+    return {
+        'correct_to_wrong': np.flatnonzero(parent_correct & ~correct).tolist(),
+        'wrong_to_correct': np.flatnonzero(~parent_correct & correct).tolist(),
+    }
+
+def compare_with_parent(logits, parent_logits, labels):
+    """All parent-relative metrics in one pass over cached logits"""
+    accuracy = accuracy_from_logits(logits, labels)
+    parent_accuracy = accuracy_from_logits(parent_logits, labels)
+    flips = flipped_samples(logits, parent_logits, labels)
+    return {
+        'accuracy': accuracy,
+        'parent_accuracy': parent_accuracy,
+        'accuracy_change': accuracy - parent_accuracy,
+        'agreement': prediction_agreement(logits, parent_logits),
+        'fidelity': fidelity(logits, parent_logits, labels),
+        'kl_divergence': kl_divergence(logits, parent_logits),
+        'correct_to_wrong': flips['correct_to_wrong'],
+        'wrong_to_correct': flips['wrong_to_correct'],
+    }
+
+def ensemble_accuracy(logits_list, labels, weights=None):
+    """Accuracy (%) of the weighted average of member softmax outputs"""
+    if not logits_list:
+        return 0.0
+    if weights is None:
+        weights = [1.0] * len(logits_list)
+    probs = sum(w * softmax(l) for w, l in zip(weights, logits_list)) / float(sum(weights))
+    return accuracy_from_logits(probs, labels)
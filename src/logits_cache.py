@@ -0,0 +1,104 @@
+"""
+Logits Cache
+- Persist full test-set logits per checkpoint as float16 memmaps
+- Keyed by checkpoint content fingerprint
+- Shared label vector for the fixed-order test set
+- Per-fingerprint lock so one forward pass fills an entry however many callers ask for it
+"""
+
+import json
+import os
+import time
+import numpy as np
+from coordination import atomic_path, atomic_write, file_lock, lock_path_for
+
+DEFAULT_LOGITS_DIR = os.path.join('saved', '.logits')
+LABELS_FILE = 'labels.npy'
+
+def logits_path(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Path of the float16 logits memmap for a fingerprint"""
+    return os.path.join(cache_dir, f"{fingerprint}.npy")
+
+def has_logits(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Check whether logits are cached for a fingerprint"""
+    return os.path.exists(logits_path(fingerprint, cache_dir))
+
+def _to_numpy(array):
+    if hasattr(array, 'detach'):
+        array = array.detach().cpu().numpy()
+    return np.asarray(array)
+
+def save_logits(fingerprint, logits, labels, cache_dir=DEFAULT_LOGITS_DIR, meta=None):
+    """Write logits as a float16 .npy memmap (plus labels and a small JSON sidecar)"""
+    os.makedirs(cache_dir, exist_ok=True)
+    logits = _to_numpy(logits)
+    labels = _to_numpy(labels).astype(np.int64)
+
+    # Labels and sidecar first: the logits file appearing is what marks an entry complete
+    labels_path = os.path.join(cache_dir, LABELS_FILE)
+    existing = load_labels(cache_dir)
+    if existing is None or existing.shape != labels.shape or not np.array_equal(existing, labels):
+        # Labels are identical for every model evaluated on the fixed-order test set
+        with atomic_write(labels_path, 'wb') as f:
+            np.save(f, labels)
+
+    path = logits_path(fingerprint, cache_dir)
+    sidecar = {
+        'fingerprint': fingerprint,
+        'num_samples': int(logits.shape[0]),
+        'num_classes': int(logits.shape[1]) if logits.ndim > 1 else 0,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    if meta:
+        sidecar.update(meta)
+    with atomic_write(f"{path[:-4]}.json", 'w', fsync=False) as f:
+        json.dump(sidecar, f, indent=2)
+
+    with atomic_path(path) as tmp_path:
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float16, shape=logits.shape)
+        out[:] = logits
+        out.flush()
+        del out
+    return path
+
+def logits_lock(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Exclusive lock for computing a fingerprint's logits (re-check the cache once it is held)"""
+    return file_lock(lock_path_for(logits_path(fingerprint, cache_dir)))
+
+def load_logits(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Open cached logits read-only as a memmap, or None if missing"""
+    path = logits_path(fingerprint, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path, mmap_mode='r')
+    except (ValueError, OSError):
+        return None
+
+def load_labels(cache_dir=DEFAULT_LOGITS_DIR):
+    """Load the shared test-set labels, or None if missing"""
+    path = os.path.join(cache_dir, LABELS_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path)
+    except (ValueError, OSError):
+        return None
+
+def load_logits_meta(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Read the JSON sidecar written next to cached logits"""
+    path = f"{logits_path(fingerprint, cache_dir)[:-4]}.json"
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (ValueError, OSError):
+        return {}
+
+def remove_logits(fingerprint, cache_dir=DEFAULT_LOGITS_DIR):
+    """Drop cached logits for a fingerprint"""
+    base = logits_path(fingerprint, cache_dir)[:-4]
+    for path in (f"{base}.npy", f"{base}.json"):
+        if os.path.exists(path):
+            os.remove(path)
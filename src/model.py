@@ -15,7 +15,20 @@ class SimpleCNN(nn.Module):
         x = self.pool(x)  # Pool after conv1: 32x32 -> 16x16
         x = F.relu(self.conv2(x))
         x = self.pool(x)  # Pool after conv2: 16x16 -> 8x8
-        x = x.view(x.size(0), -1)  # Flatten: 8*8*64 = 4096
+        x = x.reshape(x.size(0), -1)  # Flatten: 8*8*64 = 4096 (reshape also handles channels_last)
         x = F.relu(self.fc1(x))
         x = self.fc2(x)
         return x
+
+def fix_state_dict(state):
+    """Remove the _orig_mod. prefix torch.compile adds to state_dict keys"""
+    if any(key.startswith('_orig_mod.') for key in state.keys()):
+        new_state = {}
+        for key, value in state.items():
+            if key.startswith('_orig_mod.'):
+                new_key = key.replace('_orig_mod.', '')
+                new_state[new_key] = value
+            else:
+                new_state[key] = value
+        return new_state
+    return state
@@ -12,6 +12,7 @@ import torch.nn as nn
 import time
 import numpy as np
 from model import SimpleCNN
+from inference import DEFAULT_INFERENCE_MODE, resolve_mode, prepare_model, prepare_input, inference_context, describe_mode
 
 def calculate_flops(model, input_size=(1, 3, 32, 32)):
     """Calculate FLOPs (Floating Point Operations)"""
@@ -74,16 +75,24 @@ def calculate_flops(model, input_size=(1, 3, 32, 32)):
         # Return a default value if calculation fails
         raise Exception(f"FLOPs calculation failed: {str(e)}")
 
-def measure_inference_time(model, input_size=(1, 3, 32, 32), num_runs=100, device='cpu'):
-    """Measure average inference time"""
+def measure_inference_time(model, input_size=(1, 3, 32, 32), num_runs=100, device='cpu', mode=DEFAULT_INFERENCE_MODE):
+    """Measure average inference time under the selected inference mode"""
+    empty_stats = {
+        'mean': 0.0,
+        'std': 0.0,
+        'min': 0.0,
+        'max': 0.0,
+        'throughput': 0.0
+    }
     try:
-        model.eval()
+        mode = resolve_mode(mode, device)
+        empty_stats.update(describe_mode(mode))
         device_obj = torch.device(device)
-        model.to(device_obj)
-        x = torch.randn(input_size).to(device_obj)
+        model = prepare_model(model, mode, device_obj)
+        x = prepare_input(torch.randn(input_size), mode, device_obj)
         
         # Warmup
-        with torch.no_grad():
+        with inference_context(mode):
             for _ in range(10):
                 try:
                     _ = model(x)
@@ -95,41 +104,34 @@ def measure_inference_time(model, input_size=(1, 3, 32, 32), num_runs=100, devic
             torch.cuda.synchronize()
         
         times = []
-        with torch.no_grad():
+        with inference_context(mode):
             for _ in range(num_runs):
                 try:
                     if device == 'cuda' and torch.cuda.is_available():
                         torch.cuda.synchronize()
-                    start = time.time()
+                    start = time.perf_counter()
                     _ = model(x)
                     if device == 'cuda' and torch.cuda.is_available():
                         torch.cuda.synchronize()
-                    times.append(time.time() - start)
+                    times.append(time.perf_counter() - start)
                 except Exception:
                     break
         
         if len(times) == 0:
-            return {
-                'mean': 0.0,
-                'std': 0.0,
-                'min': 0.0,
-                'max': 0.0
-            }
+            return empty_stats
         
-        return {
+        stats = {
             'mean': np.mean(times) * 1000,  # ms
             'std': np.std(times) * 1000,
             'min': np.min(times) * 1000,
-            'max': np.max(times) * 1000
+            'max': np.max(times) * 1000,
+            'throughput': input_size[0] / np.mean(times)  # samples/sec
         }
+        stats.update(describe_mode(mode))
+        return stats
     except Exception as e:
         # Return default values if measurement fails
-        return {
-            'mean': 0.0,
-            'std': 0.0,
-            'min': 0.0,
-            'max': 0.0
-        }
+        return empty_stats
 
 def get_model_size_mb(model):
     """Get model size in MB"""
@@ -171,7 +173,7 @@ def analyze_model_architecture(model):
     
     return architecture
 
-def compare_model_complexity(model1_state, model2_state, model_class=SimpleCNN):
+def compare_model_complexity(model1_state, model2_state, model_class=SimpleCNN, mode=DEFAULT_INFERENCE_MODE):
     """Compare complexity of two models"""
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     
@@ -189,7 +191,7 @@ def compare_model_complexity(model1_state, model2_state, model_class=SimpleCNN):
         results[name]['flops'] = calculate_flops(model)
         results[name]['size_mb'] = get_model_size_mb(model)
         results[name]['params'] = sum(p.numel() for p in model.parameters())
-        results[name]['inference_time'] = measure_inference_time(model, device=device)
+        results[name]['inference_time'] = measure_inference_time(model, device=device.type, mode=mode)
     
     return results
 
@@ -0,0 +1,116 @@
+"""
+Shared Model Cache
+- Process-wide LRU cache for loaded checkpoints and models
+- Byte budget with least-recently-used eviction
+- Fingerprint-based invalidation and hit/miss counters
+- Concurrent misses on the same key share one load
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import torch
+from coordination import SingleFlight
+
+DEFAULT_CACHE_MB = int(os.environ.get('PRUNING_CACHE_MB', '512'))
+
+def estimate_nbytes(obj):
+    """Approximate memory held by tensors inside an object"""
+    if torch.is_tensor(obj):
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, torch.nn.Module):
+        return sum(estimate_nbytes(t) for t in list(obj.parameters()) + list(obj.buffers()))
+    if isinstance(obj, dict):
+        return sum(estimate_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in obj)
+    return 0
+
+class ModelCache:
+    """Thread-safe LRU cache bounded by total tensor bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes, fingerprint)
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self._flight = SingleFlight()
+
+    def get(self, key):
+        """Return a cached value (marking it most recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, fingerprint=None, nbytes=None):
+        """Insert a value, evicting least recently used entries past the budget"""
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Values larger than the whole budget are returned but never retained
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (value, nbytes, fingerprint)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+        return value
+
+    def get_or_load(self, key, loader, fingerprint=None):
+        """Return the cached value for key, calling loader() on a miss (once for concurrent misses)"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        if self._flight.in_flight(key):
+            with self._lock:
+                self.coalesced += 1
+        return self._flight.do(key, lambda: self._load(key, loader, fingerprint))
+
+    def _load(self, key, loader, fingerprint):
+        with self._lock:
+            entry = self._entries.get(key)  # Filled while this caller was waiting to lead
+        if entry is not None:
+            return entry[0]
+        return self.put(key, loader(), fingerprint=fingerprint)
+
+    def invalidate(self, fingerprint):
+        """Drop every entry derived from a checkpoint fingerprint"""
+        with self._lock:
+            stale = [k for k, (_, _, fp) in self._entries.items() if fp == fingerprint]
+            for key in stale:
+                self.current_bytes -= self._entries.pop(key)[1]
+            return len(stale)
+
+    def clear(self):
+        """Drop everything"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Counters for dashboards and diagnostics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_mb': self.current_bytes / (1024 * 1024),
+                'max_mb': self.max_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,162 @@
+"""
+Checkpoint Metadata Index
+- Persistent JSON index of per-checkpoint metadata (params, non-zeros per layer,
+  sparsity, dtype, file size, fingerprint, creation source)
+- Written at save time by train.py, prune.py and the dashboard
+- Backfilled lazily for checkpoints that were not saved through those paths
+- Read-modify-write updates hold a file lock, so concurrent writers never drop entries
+"""
+
+import json
+import os
+import time
+import torch
+from model import fix_state_dict
+from fingerprint import file_fingerprint
+from checkpoint_io import load_state_dict, checkpoint_nbytes, checkpoint_disk_nbytes
+from coordination import file_lock, lock_path_for, atomic_write
+
+INDEX_FILE = 'model_index.json'
+INDEX_VERSION = 1
+
+_INDEX_MEMO = {}
+
+def index_path(saved_dir='saved'):
+    """Location of the index for a save directory"""
+    return os.path.join(saved_dir, INDEX_FILE)
+
+def load_index(saved_dir='saved'):
+    """Read the index (memoized until the file changes on disk)"""
+    path = index_path(saved_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {'version': INDEX_VERSION, 'models': {}}
+    memo = _INDEX_MEMO.get(path)
+    if memo and memo[0] == mtime:
+        return memo[1]
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (ValueError, OSError):
+        index = {'version': INDEX_VERSION, 'models': {}}
+    index.setdefault('models', {})
+    _INDEX_MEMO[path] = (mtime, index)
+    return index
+
+def save_index(index, saved_dir='saved'):
+    """Write the index atomically"""
+    path = index_path(saved_dir)
+    with atomic_write(path, 'w', fsync=False) as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    _INDEX_MEMO.pop(path, None)
+
+def index_lock(saved_dir='saved'):
+    """Exclusive lock to hold across load_index -> modify -> save_index"""
+    return file_lock(lock_path_for(index_path(saved_dir)))
+
+def compute_checkpoint_metadata(state_dict):
+    """Parameter counts, per-layer non-zeros and dtype from a state_dict"""
+    state = fix_state_dict(state_dict)
+    names = [k for k, v in state.items() if torch.is_tensor(v)]
+    layers = {}
+    total_params = 0
+    non_zero_params = 0
+    dtypes = set()
+    if names:
+        # One device sync for all layers instead of an .item() per tensor
+        non_zeros = torch.stack([torch.count_nonzero(state[k]).cpu() for k in names]).tolist()
+        for name, non_zero in zip(names, non_zeros):
+            tensor = state[name]
+            numel = tensor.numel()
+            layers[name] = {
+                'shape': list(tensor.shape),
+                'numel': numel,
+                'non_zero': int(non_zero),
+                'dtype': str(tensor.dtype).replace('torch.', '')
+            }
+            total_params += numel
+            non_zero_params += int(non_zero)
+            dtypes.add(layers[name]['dtype'])
+    return {
+        'total_params': total_params,
+        'trainable_params': total_params,
+        'non_zero_params': non_zero_params,
+        'sparsity': 1 - (non_zero_params / total_params) if total_params > 0 else 0,
+        'dtype': ','.join(sorted(dtypes)) if dtypes else 'unknown',
+        'layers': layers
+    }
+
+def _file_entry(path):
+    stat = os.stat(path)
+    return {
+        'file': os.path.basename(path),
+        'size_bytes': stat.st_size,
+        'file_size_mb': checkpoint_disk_nbytes(path) / (1024 * 1024),
+        'logical_size_mb': checkpoint_nbytes(path) / (1024 * 1024),
+        'mtime_ns': stat.st_mtime_ns,
+        'fingerprint': file_fingerprint(path)
+    }
+
+def _is_current(entry, path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return entry.get('size_bytes') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+
+def record_checkpoint(path, state_dict=None, source='unknown', extra=None, metadata=None):
+    """Compute and store metadata for a checkpoint that was just written"""
+    saved_dir = os.path.dirname(path) or '.'
+    if metadata is None:
+        if state_dict is None:
+            state_dict = load_state_dict(path, map_location='cpu')
+        metadata = compute_checkpoint_metadata(state_dict)
+    entry = dict(metadata)
+    entry.update(_file_entry(path))
+    entry['source'] = source
+    entry['created'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    if extra:
+        entry['extra'] = extra
+    with index_lock(saved_dir):
+        index = load_index(saved_dir)
+        index['models'][entry['file']] = entry
+        save_index(index, saved_dir)
+    return entry
+
+def get_checkpoint_metadata(path, backfill=True, state_loader=None):
+    """Index entry for a checkpoint; backfills stale or missing entries on demand"""
+    saved_dir = os.path.dirname(path) or '.'
+    entry = load_index(saved_dir)['models'].get(os.path.basename(path))
+    if entry and _is_current(entry, path):
+        return entry
+    if not backfill:
+        return None
+    source = entry.get('source', 'backfill') if entry else 'backfill'
+    extra = entry.get('extra') if entry else None
+    state_dict = state_loader(path) if state_loader is not None else None
+    return record_checkpoint(path, state_dict=state_dict, source=source, extra=extra)
+
+def remove_checkpoint(path):
+    """Drop a checkpoint from the index"""
+    saved_dir = os.path.dirname(path) or '.'
+    with index_lock(saved_dir):
+        index = load_index(saved_dir)
+        if index['models'].pop(os.path.basename(path), None) is not None:
+            save_index(index, saved_dir)
+
+def list_index(saved_dir='saved'):
+    """All indexed entries whose files still exist"""
+    models = load_index(saved_dir)['models']
+    return {name: entry for name, entry in models.items() if os.path.exists(os.path.join(saved_dir, name))}
+
+def find_by_fingerprint(fingerprint, saved_dir='saved'):
+    """Indexed checkpoint whose content (or original upload) has this fingerprint"""
+    for name, entry in load_index(saved_dir)['models'].items():
+        extra = entry.get('extra') or {}
+        if fingerprint not in (entry.get('fingerprint'), extra.get('upload_fingerprint')):
+            continue
+        path = os.path.join(saved_dir, name)
+        if _is_current(entry, path):
+            return path
+    return None
@@ -0,0 +1,258 @@
+"""
+Content-Addressed Model Store
+- Checkpoints split into per-tensor blobs keyed by SHA-256 (saved/.store/blobs/ab/<sha>)
+- Logical checkpoints are small JSON manifests (saved/<name>.manifest) pointing at blobs
+- Identical tensors across pruned variants and re-uploads are stored once
+- Reference counting on delete, plus a garbage collector that rebuilds counts
+- Blob and refcount updates happen under a store-wide file lock
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import argparse
+import torch
+from flat_checkpoint import DTYPES, DTYPE_NAMES, tensor_bytes
+from coordination import file_lock, atomic_write
+
+MANIFEST_SUFFIX = '.manifest'
+MANIFEST_VERSION = 1
+DEFAULT_STORE_DIR = os.path.join('saved', '.store')
+REFCOUNT_FILE = 'refcounts.json'
+
+def is_manifest(path):
+    """Whether a path is a store manifest"""
+    return str(path).endswith(MANIFEST_SUFFIX)
+
+def store_dir_for(path):
+    """Store directory serving manifests in the same folder as path"""
+    return os.path.join(os.path.dirname(path) or '.', '.store')
+
+def blob_path(digest, store_dir=DEFAULT_STORE_DIR):
+    """Location of a blob (two-character fan-out keeps directories small)"""
+    return os.path.join(store_dir, 'blobs', digest[:2], digest)
+
+def _write_atomic(path, data):
+    with atomic_write(path, 'wb') as f:
+        f.write(data)
+
+def store_lock(store_dir=DEFAULT_STORE_DIR):
+    """Exclusive lock over a store's blobs and reference counts"""
+    return file_lock(os.path.join(store_dir, '.lock'))
+
+def load_refcounts(store_dir=DEFAULT_STORE_DIR):
+    """Blob reference counts"""
+    try:
+        with open(os.path.join(store_dir, REFCOUNT_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_refcounts(refcounts, store_dir=DEFAULT_STORE_DIR):
+    """Persist reference counts atomically"""
+    data = json.dumps(refcounts, indent=1, sort_keys=True).encode('utf-8')
+    _write_atomic(os.path.join(store_dir, REFCOUNT_FILE), data)
+
+def put_blob(data, store_dir=DEFAULT_STORE_DIR):
+    """Store raw bytes once; returns (digest, bytes newly written)"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest, store_dir)
+    if os.path.exists(path):
+        return digest, 0
+    _write_atomic(path, bytes(data))
+    return digest, len(data)
+
+def read_manifest(path):
+    """Parse a manifest"""
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != 'manifest' or not isinstance(manifest.get('tensors'), dict):
+        raise ValueError(f"{path}: not a model store manifest")
+    return manifest
+
+def _release(manifest, refcounts, store_dir):
+    """Drop one reference per blob; delete blobs nobody points at any more"""
+    removed = 0
+    for entry in manifest['tensors'].values():
+        digest = entry['blob']
+        count = refcounts.get(digest, 0) - 1
+        if count > 0:
+            refcounts[digest] = count
+            continue
+        refcounts.pop(digest, None)
+        try:
+            os.remove(blob_path(digest, store_dir))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def save_manifest(state_dict, path, metadata=None, store_dir=None):
+    """Write a state_dict into the store and a manifest at path"""
+    store_dir = store_dir or store_dir_for(path)
+    for name, tensor in state_dict.items():
+        if torch.is_tensor(tensor) and tensor.dtype not in DTYPE_NAMES:
+            raise ValueError(f"Unsupported dtype {tensor.dtype} for tensor '{name}'")
+    tensors = {}
+    os.makedirs(store_dir, exist_ok=True)
+    # A concurrent delete must not release a blob between put_blob and the refcount update
+    with store_lock(store_dir):
+        for name, tensor in state_dict.items():
+            if not torch.is_tensor(tensor):
+                continue
+            digest, _ = put_blob(tensor_bytes(tensor), store_dir)
+            tensors[name] = {
+                'dtype': DTYPE_NAMES[tensor.dtype],
+                'shape': list(tensor.shape),
+                'blob': digest,
+                'nbytes': tensor.numel() * tensor.element_size()
+            }
+        manifest = {'format': 'manifest', 'version': MANIFEST_VERSION, 'tensors': tensors}
+        if metadata:
+            manifest['metadata'] = {str(k): str(v) for k, v in metadata.items()}
+
+        refcounts = load_refcounts(store_dir)
+        for entry in tensors.values():
+            refcounts[entry['blob']] = refcounts.get(entry['blob'], 0) + 1
+        if os.path.exists(path):
+            # Overwriting a manifest releases the references it held
+            try:
+                _release(read_manifest(path), refcounts, store_dir)
+            except (OSError, ValueError):
+                pass
+        save_refcounts(refcounts, store_dir)
+        _write_atomic(path, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return path
+
+def _map_blob(path, dtype, shape, nbytes):
+    if nbytes == 0:
+        return torch.empty(shape, dtype=dtype)
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(buffer) != nbytes:
+        raise ValueError(f"{path}: blob size does not match its manifest entry")
+    count = nbytes // torch.empty((), dtype=dtype).element_size()
+    return torch.frombuffer(buffer, dtype=dtype, count=count).reshape(shape)
+
+def load_manifest(path, map_location='cpu', store_dir=None):
+    """Load a manifest's tensors as memory-mapped views of their blobs"""
+    store_dir = store_dir or store_dir_for(path)
+    state = {}
+    for name, entry in read_manifest(path)['tensors'].items():
+        dtype = DTYPES.get(entry.get('dtype'))
+        if dtype is None:
+            raise ValueError(f"{path}: tensor '{name}' has an unsupported dtype")
+        tensor = _map_blob(blob_path(entry['blob'], store_dir), dtype, entry['shape'], entry['nbytes'])
+        state[name] = tensor if str(map_location) == 'cpu' else tensor.to(map_location)
+    return state
+
+def manifest_nbytes(path):
+    """Logical (undeduplicated) size of the checkpoint a manifest describes"""
+    return sum(entry['nbytes'] for entry in read_manifest(path)['tensors'].values())
+
+def manifest_disk_nbytes(path, store_dir=None):
+    """On-disk footprint of a manifest: its file plus its share of each blob (split by refcount)"""
+    store_dir = store_dir or store_dir_for(path)
+    refcounts = load_refcounts(store_dir)
+    total = os.path.getsize(path)
+    for digest in {entry['blob'] for entry in read_manifest(path)['tensors'].values()}:
+        try:
+            total += os.path.getsize(blob_path(digest, store_dir)) / max(1, refcounts.get(digest, 1))
+        except OSError:
+            continue
+    return int(total)
+
+def delete_manifest(path, store_dir=None):
+    """Remove a manifest and release its blobs; returns the number of blobs deleted"""
+    store_dir = store_dir or store_dir_for(path)
+    with store_lock(store_dir):
+        manifest = read_manifest(path)
+        refcounts = load_refcounts(store_dir)
+        removed = _release(manifest, refcounts, store_dir)
+        save_refcounts(refcounts, store_dir)
+        os.remove(path)
+    return removed
+
+def import_checkpoint(path, remove_original=False):
+    """Move an existing .pth/.safetensors checkpoint into the store"""
+    from checkpoint_io import load_state_dict, checkpoint_path
+    out_path = checkpoint_path(path, 'manifest')
+    state = load_state_dict(path, map_location='cpu')
+    save_manifest(state, out_path, metadata={'imported_from': os.path.basename(path)})
+    if remove_original:
+        from delta_checkpoint import materialize_dependents
+        materialize_dependents(path)  # Deltas pin the original's bytes, which the manifest does not reproduce
+        os.remove(path)
+    return out_path
+
+def collect_garbage(saved_dir='saved'):
+    """Rebuild reference counts from the manifests on disk and delete orphaned blobs"""
+    store_dir = os.path.join(saved_dir, '.store')
+    if not os.path.isdir(store_dir):
+        return 0
+    with store_lock(store_dir):
+        refcounts = {}
+        for name in os.listdir(saved_dir):
+            if not is_manifest(name):
+                continue
+            try:
+                manifest = read_manifest(os.path.join(saved_dir, name))
+            except (OSError, ValueError):
+                continue
+            for entry in manifest['tensors'].values():
+                refcounts[entry['blob']] = refcounts.get(entry['blob'], 0) + 1
+        removed = 0
+        blobs_root = os.path.join(store_dir, 'blobs')
+        for root, _, files in os.walk(blobs_root):
+            for name in files:
+                if name not in refcounts:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        save_refcounts(refcounts, store_dir)
+    return removed
+
+def store_stats(saved_dir='saved'):
+    """Logical bytes referenced by manifests vs unique bytes on disk"""
+    store_dir = os.path.join(saved_dir, '.store')
+    logical = 0
+    manifests = 0
+    for name in os.listdir(saved_dir) if os.path.isdir(saved_dir) else []:
+        if is_manifest(name):
+            try:
+                logical += manifest_nbytes(os.path.join(saved_dir, name))
+                manifests += 1
+            except (OSError, ValueError):
+                pass
+    unique = 0
+    blobs = 0
+    for root, _, files in os.walk(os.path.join(store_dir, 'blobs')):
+        for name in files:
+            unique += os.path.getsize(os.path.join(root, name))
+            blobs += 1
+    return {
+        'manifests': manifests,
+        'blobs': blobs,
+        'logical_mb': logical / (1024 * 1024),
+        'unique_mb': unique / (1024 * 1024),
+        'dedup_ratio': logical / unique if unique else 1.0
+    }
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest='command', required=True)
+    import_parser = sub.add_parser('import', help='move checkpoints into the store')
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--keep', action='store_true', help='keep the original files')
+    gc_parser = sub.add_parser('gc', help='rebuild refcounts and delete orphaned blobs')
+    gc_parser.add_argument('--saved-dir', type=str, default='saved')
+    stats_parser = sub.add_parser('stats', help='show deduplication statistics')
+    stats_parser.add_argument('--saved-dir', type=str, default='saved')
+    args = parser.parse_args()
+    if args.command == 'import':
+        for p in args.paths:
+            print('Stored', p, '->', import_checkpoint(p, remove_original=not args.keep))
+    elif args.command == 'gc':
+        print('Removed', collect_garbage(args.saved_dir), 'orphaned blobs')
+    else:
+        print(json.dumps(store_stats(args.saved_dir), indent=2))
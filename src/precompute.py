@@ -0,0 +1,279 @@
+"""
+Idle-Time Precompute
+- Background scheduler that warms results for new or changed checkpoints in saved/
+- Per checkpoint: index metadata, evaluation with cached logits, weight histograms, parent comparison
+- Most recently modified checkpoints first; a checkpoint that changes again is re-queued at its new rank
+- Runs only while the governor and the job queue have no foreground work and the host is not loaded,
+  on a single thread
+- Foreground work or load arriving mid-step aborts the step at its next yield point; it is retried once idle again
+- At startup only checkpoints missing durable results (index entry, logits) are queued
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from fingerprint import file_fingerprint
+from model_index import get_checkpoint_metadata
+from checkpoint_io import open_checkpoint
+from logits_cache import load_logits, load_labels, has_logits
+from logit_metrics import compare_with_parent
+from lineage import get_parent
+from job_queue import queue_counts
+from inference import DEFAULT_INFERENCE_MODE
+
+LABEL_PREFIX = 'Precompute'
+STEPS = ('metadata', 'evaluation', 'histograms', 'parent')
+HISTOGRAM_BINS = 100
+IDLE_SECONDS = 2.0  # Foreground must have been quiet this long before a step starts
+IDLE_POLL_SECONDS = 0.5
+QUEUE_CHECK_SECONDS = 1.0  # The job queue is a database: yield points read it at most this often
+MAX_LOAD_FRACTION = 0.75  # 1-minute load average per core above which the host is not idle
+MAX_CACHED_MODELS = 64
+PRECOMPUTE_THREADS = int(os.environ.get('PRUNING_PRECOMPUTE_THREADS', '1'))
+
+class Yielded(Exception):
+    """Foreground work arrived; the current step is abandoned and retried later"""
+
+class PrecomputeScheduler:
+    """Priority queue of checkpoints worked through during idle time"""
+
+    def __init__(self, governor=None, mode=DEFAULT_INFERENCE_MODE, bins=HISTOGRAM_BINS, idle_seconds=IDLE_SECONDS):
+        self.governor = governor
+        self.mode = mode
+        self.bins = bins
+        self.idle_seconds = idle_seconds
+        self._cond = threading.Condition()
+        self._heap = []
+        self._queued = {}  # path -> mtime_ns of its newest queue entry
+        self._completed = {}  # path -> (mtime_ns, finished steps)
+        self._histograms = OrderedDict()  # fingerprint -> {layer: stats}
+        self._comparisons = OrderedDict()  # (fingerprint, parent fingerprint) -> compare_with_parent result
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+        self.current = None
+        self.counts = {'finished': 0, 'yielded': 0, 'failed': 0}
+        self._jobs_checked = None
+        self._jobs_busy = False
+
+    def submit(self, path):
+        """Queue a new or changed checkpoint (newer files are served first)"""
+        path = os.path.relpath(path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        with self._cond:
+            if self._queued.get(path) == mtime_ns:
+                return
+            done = self._completed.get(path)
+            if done and done[0] == mtime_ns and len(done[1]) == len(STEPS):
+                return
+            self._queued[path] = mtime_ns
+            heapq.heappush(self._heap, (-mtime_ns, next(self._seq), path))
+            self._cond.notify()
+
+    def submit_if_missing(self, path):
+        """Queue a checkpoint only if its durable results are missing (startup scan)"""
+        if self.missing_results(path):
+            self.submit(path)
+
+    def missing_results(self, path):
+        """Whether the index entry or the logits of a checkpoint (or of its parent) are missing"""
+        try:
+            entry = get_checkpoint_metadata(path, backfill=False)
+            if entry is None or not has_logits(entry['fingerprint']):
+                return True
+            parent = get_parent(path)
+            return parent is not None and not has_logits(file_fingerprint(parent))
+        except (OSError, ValueError, KeyError):
+            return True
+
+    def forget(self, path):
+        """Drop a deleted checkpoint from the queue"""
+        path = os.path.relpath(path)
+        with self._cond:
+            self._queued.pop(path, None)
+            self._completed.pop(path, None)
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='precompute', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def histogram(self, path, layer):
+        """Precomputed tensor stats (with histogram) for one layer, or None"""
+        try:
+            fingerprint = file_fingerprint(path)
+        except OSError:
+            return None
+        with self._cond:
+            return (self._histograms.get(fingerprint) or {}).get(layer)
+
+    def comparison(self, path, parent_path):
+        """Precomputed compare_with_parent result, or None"""
+        try:
+            key = (file_fingerprint(path), file_fingerprint(parent_path))
+        except OSError:
+            return None
+        with self._cond:
+            return self._comparisons.get(key)
+
+    def status(self):
+        """Queue length, current step and counters"""
+        with self._cond:
+            return {'queued': len(self._queued), 'current': self.current, **self.counts}
+
+    # Idle detection
+
+    def foreground_busy(self):
+        """Whether anything other than precompute is running or waiting for the governor or the worker pool"""
+        if self.governor is not None:
+            status = self.governor.status()
+            others = [op for op in status['running'] if not op['label'].startswith(LABEL_PREFIX)]
+            if others or status['queued']:
+                return True
+        return self._jobs_pending()
+
+    def _jobs_pending(self):
+        now = time.monotonic()
+        if self._jobs_checked is None or now - self._jobs_checked >= QUEUE_CHECK_SECONDS:
+            try:
+                counts = queue_counts()
+                self._jobs_busy = bool(counts.get('running') or counts.get('queued'))
+            except Exception:
+                self._jobs_busy = False  # No queue database yet
+            self._jobs_checked = now
+        return self._jobs_busy
+
+    def _host_loaded(self, own_threads=0):
+        if not hasattr(os, 'getloadavg'):
+            return False
+        # Mid-step the load average includes this scheduler's own threads
+        return os.getloadavg()[0] - own_threads > (os.cpu_count() or 1) * MAX_LOAD_FRACTION
+
+    def _wait_idle(self):
+        quiet_since = None
+        while not self._stop.is_set():
+            if self.foreground_busy() or self._host_loaded():
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = time.monotonic()
+            elif time.monotonic() - quiet_since >= self.idle_seconds:
+                return True
+            self._stop.wait(IDLE_POLL_SECONDS)
+        return False
+
+    def _yield_point(self, *args):
+        """Progress callback: abort the step as soon as foreground work shows up"""
+        if self._stop.is_set() or self.foreground_busy() or self._host_loaded(PRECOMPUTE_THREADS):
+            raise Yielded()
+
+    # Steps
+
+    def _metadata(self, path, fingerprint):
+        get_checkpoint_metadata(path)
+
+    def _evaluation(self, path, fingerprint):
+        from job_worker import evaluate_checkpoint
+        evaluate_checkpoint(path, self.mode, progress=self._yield_point)
+
+    def _histograms_step(self, path, fingerprint):
+        layers = {}
+        with open_checkpoint(path) as checkpoint:
+            for name in checkpoint.keys():
+                if 'weight' in name:
+                    self._yield_point()
+                    layers[name] = checkpoint.tensor_stats(name, bins=self.bins)
+        self._remember(self._histograms, fingerprint, layers)
+
+    def _parent(self, path, fingerprint):
+        parent = get_parent(path)
+        if parent is None:
+            return
+        from job_worker import evaluate_checkpoint
+        evaluate_checkpoint(parent, self.mode, progress=self._yield_point)
+        parent_fingerprint = file_fingerprint(parent)
+        logits, parent_logits, labels = load_logits(fingerprint), load_logits(parent_fingerprint), load_labels()
+        if logits is not None and parent_logits is not None and labels is not None:
+            self._remember(self._comparisons, (fingerprint, parent_fingerprint),
+                           compare_with_parent(logits, parent_logits, labels))
+
+    def _remember(self, cache, key, value):
+        with self._cond:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > MAX_CACHED_MODELS:
+                cache.popitem(last=False)
+
+    # Worker
+
+    def _next(self):
+        with self._cond:
+            while not self._stop.is_set():
+                while self._heap:
+                    neg_mtime, _, path = heapq.heappop(self._heap)
+                    if self._queued.get(path) == -neg_mtime:
+                        return path, -neg_mtime  # Superseded entries are skipped
+                self._cond.wait()
+        return None, None
+
+    def _run(self):
+        steps = {'metadata': self._metadata, 'evaluation': self._evaluation,
+                 'histograms': self._histograms_step, 'parent': self._parent}
+        while True:
+            path, mtime_ns = self._next()
+            if path is None:
+                return
+            if not self._wait_idle():
+                return
+            with self._cond:
+                done = self._completed.get(path)
+                finished = set(done[1]) if done and done[0] == mtime_ns else set()
+            try:
+                if not os.path.exists(path) or os.stat(path).st_mtime_ns != mtime_ns:
+                    raise FileNotFoundError(path)  # Changed or deleted: the watcher queues the new version
+                fingerprint = file_fingerprint(path)
+                for step in STEPS:
+                    if step in finished:
+                        continue
+                    if self.foreground_busy():
+                        raise Yielded()
+                    self.current = f"{os.path.basename(path)}: {step}"
+                    with self._slot(path, step):
+                        steps[step](path, fingerprint)
+                    finished.add(step)
+                with self._cond:
+                    self.counts['finished'] += 1
+                    if self._queued.get(path) == mtime_ns:
+                        del self._queued[path]
+            except Yielded:
+                with self._cond:
+                    self.counts['yielded'] += 1
+                    if self._queued.get(path) == mtime_ns:
+                        heapq.heappush(self._heap, (-mtime_ns, next(self._seq), path))
+            except Exception:
+                with self._cond:
+                    self.counts['failed'] += 1
+                    if self._queued.get(path) == mtime_ns:
+                        del self._queued[path]
+            finally:
+                self.current = None
+                with self._cond:
+                    self._completed[path] = (mtime_ns, finished)
+
+    def _slot(self, path, step):
+        if self.governor is None:
+            return nullcontext()
+        return self.governor.slot(f"{LABEL_PREFIX}: {os.path.basename(path)} ({step})", threads=PRECOMPUTE_THREADS)
@@ -0,0 +1,164 @@
+"""
+Startup Prewarm
+- Runs once per server process on a background thread when the dashboard boots
+- Decodes the CIFAR-10 test set into memory and loads the most recently modified checkpoints
+- A warm-up forward pass initializes the intra-op thread pool and kernels before the first click
+- Readiness is written to static/prewarm_status.json (served at /app/static/prewarm_status.json)
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+import torch
+from model import SimpleCNN
+from model_index import list_index
+from checkpoint_io import MODEL_FILE_SUFFIXES
+from evaluation import preload_test_set, build_test_loader
+from inference import DEFAULT_INFERENCE_MODE, prepare_model, prepare_input, inference_context
+from coordination import atomic_write
+
+STATUS_PATH = os.path.join('static', 'prewarm_status.json')
+DEFAULT_RECENT_MODELS = int(os.environ.get('PRUNING_PREWARM_MODELS', '3'))
+WARMUP_PASSES = 3
+STAGES = ('test_set', 'models', 'forward')
+
+def recent_checkpoints(saved_dir='saved', limit=DEFAULT_RECENT_MODELS):
+    """Most recently modified checkpoints, newest first (index first, directory listing as fallback)"""
+    entries = list_index(saved_dir)
+    if entries:
+        ranked = sorted(entries.items(), key=lambda item: item[1].get('mtime_ns', 0), reverse=True)
+        return [os.path.join(saved_dir, name) for name, _ in ranked[:limit]]
+    if not os.path.isdir(saved_dir):
+        return []
+    paths = [os.path.join(saved_dir, f) for f in os.listdir(saved_dir) if f.endswith(MODEL_FILE_SUFFIXES)]
+    return sorted(paths, key=os.path.getmtime, reverse=True)[:limit]
+
+class Prewarmer:
+    """Warms the test set, recent models and the forward pass on a daemon thread"""
+
+    def __init__(self, load_model, device=None, mode=DEFAULT_INFERENCE_MODE, saved_dir='saved', data_root='./data',
+                 recent=DEFAULT_RECENT_MODELS, governor=None, on_test_set=None, status_path=STATUS_PATH):
+        self.load_model = load_model  # path -> ready-to-run model, normally served from the shared model cache
+        self.device = device or torch.device('cpu')
+        self.mode = mode
+        self.saved_dir = saved_dir
+        self.data_root = data_root
+        self.recent = recent
+        self.governor = governor
+        self.on_test_set = on_test_set
+        self.status_path = status_path
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self._status = {
+            'pid': os.getpid(),
+            'ready': False,
+            'started': None,
+            'finished': None,
+            'stages': {stage: {'state': 'pending'} for stage in STAGES}
+        }
+
+    def start(self):
+        """Start the warm-up thread (no-op if it already ran)"""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._status['started'] = time.time()
+            self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+        self._write_status()
+        self._thread.start()
+        return self
+
+    def status(self):
+        """Copy of the readiness report"""
+        with self._lock:
+            status = dict(self._status)
+            status['stages'] = {stage: dict(info) for stage, info in self._status['stages'].items()}
+        return status
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the warm-up finished; returns whether it did"""
+        return self._done.wait(timeout)
+
+    def _write_status(self):
+        try:
+            with atomic_write(self.status_path, 'w', encoding='utf-8', fsync=False) as f:
+                json.dump(self.status(), f, indent=2)
+        except OSError:
+            pass  # The in-process status still answers
+
+    def _update(self, stage, **info):
+        with self._lock:
+            self._status['stages'][stage].update(info)
+        self._write_status()
+
+    def _stage(self, stage, fn):
+        self._update(stage, state='running')
+        start = time.perf_counter()
+        try:
+            detail = fn()
+            self._update(stage, state='done', seconds=time.perf_counter() - start, detail=detail)
+            return detail
+        except Exception as e:
+            self._update(stage, state='failed', seconds=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+            return None
+
+    def _slot(self, label):
+        if self.governor is None:
+            return nullcontext()
+        return self.governor.slot(label)
+
+    def _warm_test_set(self):
+        with self._slot('Prewarm: test set'):
+            samples = preload_test_set(self.data_root)
+        if self.on_test_set is not None:
+            self.on_test_set()
+        return {'samples': samples}
+
+    def _warm_models(self):
+        loaded = []
+        for path in recent_checkpoints(self.saved_dir, self.recent):
+            with self._slot(f"Prewarm: {os.path.basename(path)}"):
+                try:
+                    self.load_model(path)
+                    loaded.append(os.path.basename(path))
+                except Exception:
+                    continue  # Unreadable checkpoint: its page shows the error when it is opened
+        return {'loaded': loaded}
+
+    def _warm_forward(self, model_names):
+        model = None
+        if model_names:
+            model = self.load_model(os.path.join(self.saved_dir, model_names[0]))
+        model = prepare_model(model if model is not None else SimpleCNN(), self.mode, self.device)
+        if self.status()['stages']['test_set']['state'] == 'done':
+            inputs, _ = next(iter(build_test_loader(self.data_root, batch_size=100)))
+        else:
+            inputs = torch.randn(100, 3, 32, 32)  # Same shapes, so the kernels still warm up
+        inputs = prepare_input(inputs, self.mode, self.device)
+        with self._slot('Prewarm: forward pass'):
+            start = time.perf_counter()
+            with inference_context(self.mode):
+                for _ in range(WARMUP_PASSES):
+                    model(inputs)
+            elapsed = time.perf_counter() - start
+        return {'inference_mode': self.mode, 'threads': torch.get_num_threads(),
+                'ms_per_batch': elapsed * 1000 / WARMUP_PASSES}
+
+    def _run(self):
+        try:
+            self._stage('test_set', self._warm_test_set)
+            models = self._stage('models', self._warm_models) or {}
+            self._stage('forward', lambda: self._warm_forward(models.get('loaded')))
+        finally:
+            with self._lock:
+                self._status['ready'] = True
+                self._status['finished'] = time.time()
+            self._write_status()
+            self._done.set()
@@ -2,6 +2,12 @@
 import torch, argparse, os
 import numpy as np
 from model import SimpleCNN
+from model_index import record_checkpoint
+from lineage import register
+from fingerprint import file_fingerprint
+from checkpoint_io import CHECKPOINT_FORMATS, checkpoint_path, load_state_dict, save_state_dict
+from inference import (INFERENCE_MODES, DEFAULT_INFERENCE_MODE, resolve_mode, configure_threads,
+                       prepare_model, prepare_input, inference_context)
 
 def magnitude_prune_state_dict(state_dict, amount):
     # amount: fraction to prune overall (0..1)
@@ -23,12 +29,12 @@ def magnitude_prune_state_dict(state_dict, amount):
             new_state[k] = v
     return new_state
 
-def evaluate(model, testloader, device):
-    model.eval()
+def evaluate(model, testloader, device, mode=DEFAULT_INFERENCE_MODE):
+    model = prepare_model(model, mode, device)
     correct=0; total=0
-    with torch.no_grad():
+    with inference_context(mode):
         for images, labels in testloader:
-            images, labels = images.to(device), labels.to(device)
+            images, labels = prepare_input(images, mode, device), labels.to(device)
             outputs = model(images)
             _,pred = outputs.max(1)
             total += labels.size(0)
@@ -40,9 +46,18 @@ if __name__=='__main__':
     parser.add_argument('--model-path', type=str, required=True)
     parser.add_argument('--prune-percent', type=float, default=0.5, help='fraction to prune (0..1)')
     parser.add_argument('--save-dir', type=str, default='saved')
+    parser.add_argument('--inference-mode', type=str, default=DEFAULT_INFERENCE_MODE, choices=list(INFERENCE_MODES),
+                        help='execution mode used for the post-pruning evaluation')
+    parser.add_argument('--threads', type=int, default=None, help='intra-op thread count')
+    parser.add_argument('--format', type=str, default='pth', choices=list(CHECKPOINT_FORMATS),
+                        help='checkpoint format (safetensors: memory-mapped, manifest: deduplicated store, '
+                             'delta: packed masks referencing the parent)')
+    parser.add_argument('--interop-threads', type=int, default=None, help='inter-op thread count')
     args = parser.parse_args()
 
+    threads = configure_threads(args.threads, args.interop_threads)
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    mode = resolve_mode(args.inference_mode, device)
     model = SimpleCNN().to(device)
 
     # load testset
@@ -56,10 +71,19 @@ if __name__=='__main__':
     num_workers = 0 if platform.system() == 'Windows' else 2
     testloader = DataLoader(testset, batch_size=100, shuffle=False, num_workers=num_workers)
 
-    state = torch.load(args.model_path, map_location=device)
+    state = load_state_dict(args.model_path, map_location=device)
     pruned_state = magnitude_prune_state_dict(state, args.prune_percent)
     model.load_state_dict(pruned_state)
-    acc = evaluate(model, testloader, device)
+    acc = evaluate(model, testloader, device, mode=mode)
     os.makedirs(args.save_dir, exist_ok=True)
-    torch.save(pruned_state, os.path.join(args.save_dir, f'pruned_{int(args.prune_percent*100)}.pth'))
-    print(f'Pruned model saved. Test accuracy after pruning: {acc:.2f}%')
+    save_path = checkpoint_path(os.path.join(args.save_dir, f'pruned_{int(args.prune_percent*100)}.pth'), args.format)
+    # Delta checkpoints store only packed masks and reference the parent by fingerprint
+    save_state_dict(pruned_state, save_path, parent_path=args.model_path)
+    record_checkpoint(save_path, pruned_state, source='prune',
+                      extra={'parent': args.model_path, 'parent_fingerprint': file_fingerprint(args.model_path),
+                             'method': 'magnitude', 'amount': args.prune_percent,
+                             'accuracy': acc, 'inference_mode': mode})
+    register(save_path, parent_path=args.model_path, parent_fingerprint=file_fingerprint(args.model_path),
+             operation={'type': 'prune', 'method': 'magnitude', 'amount': args.prune_percent})
+    print(f'Pruned model saved. Test accuracy after pruning: {acc:.2f}% '
+          f'(inference mode: {mode}, threads: {threads["num_threads"]}/{threads["num_interop_threads"]})')
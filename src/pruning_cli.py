@@ -0,0 +1,106 @@
+"""
+Pruning CLI
+- Thin client for the warm worker daemon; starts in milliseconds (no torch import)
+- prune / evaluate / visualize / report / complexity with progress streamed to stderr
+- Results are printed to stdout as JSON for scripted pipelines
+- Daemon control: start, stop, status
+"""
+
+import sys
+import json
+import argparse
+from daemon import (DEFAULT_SOCKET_PATH, DEFAULT_CACHE_MB, DaemonError, request, is_running, start_daemon)
+
+EXIT_FAILED = 1
+EXIT_NO_DAEMON = 2
+
+def _progress_printer(quiet):
+    if quiet:
+        return None
+    def show(fraction, message):
+        print(f"[{fraction:4.0%}] {message or ''}", file=sys.stderr, flush=True)
+    return show
+
+def build_spec(args):
+    """Job spec for a command from parsed arguments (validated by the daemon)"""
+    spec = {'model_path': args.model_path}
+    if args.command == 'prune':
+        spec.update({'method': args.method, 'amount': args.amount, 'save_format': args.format,
+                     'evaluate': not args.no_evaluate, 'comparison_plot': not args.no_plot})
+    elif args.command == 'visualize':
+        spec['plots'] = args.plots
+        spec['out_dir'] = args.out_dir
+    elif args.command == 'report':
+        spec['out_dir'] = args.out_dir
+    elif args.command == 'complexity':
+        spec['other_path'] = args.other_path
+    if getattr(args, 'inference_mode', None):
+        spec['inference_mode'] = args.inference_mode
+    return {k: v for k, v in spec.items() if v is not None}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Send commands to the warm pruning daemon')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH)
+    parser.add_argument('--autostart', action='store_true', help='start the daemon if it is not running')
+    parser.add_argument('--quiet', action='store_true', help='no progress output')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    prune = commands.add_parser('prune', help='prune a checkpoint, save it with lineage and evaluate it')
+    prune.add_argument('--model-path', type=str, required=True)
+    prune.add_argument('--method', type=str, default='magnitude')
+    prune.add_argument('--amount', type=float, default=0.5, help='fraction to prune (0..1)')
+    prune.add_argument('--format', type=str, default=None, help='checkpoint format of the pruned model')
+    prune.add_argument('--no-evaluate', action='store_true')
+    prune.add_argument('--no-plot', action='store_true', help='skip the before/after comparison figure')
+
+    evaluate = commands.add_parser('evaluate', help='test-set accuracy (served from the logits cache when possible)')
+    evaluate.add_argument('--model-path', type=str, required=True)
+
+    visualize = commands.add_parser('visualize', help='weight distribution, heatmap, sparsity and stats figures')
+    visualize.add_argument('--model-path', type=str, required=True)
+    visualize.add_argument('--plots', nargs='+', default=None)
+    visualize.add_argument('--out-dir', type=str, default=None)
+
+    report = commands.add_parser('report', help='text analysis report')
+    report.add_argument('--model-path', type=str, required=True)
+    report.add_argument('--out-dir', type=str, default=None)
+
+    complexity = commands.add_parser('complexity', help='FLOPs, size and latency of two checkpoints')
+    complexity.add_argument('--model-path', type=str, required=True)
+    complexity.add_argument('--other-path', type=str, required=True)
+
+    for sub in (prune, evaluate, report, complexity):
+        sub.add_argument('--inference-mode', type=str, default=None)
+
+    start = commands.add_parser('start', help='start the daemon in the background')
+    start.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB)
+    commands.add_parser('stop', help='shut the daemon down')
+    commands.add_parser('status', help='uptime, queue and cache of the running daemon')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'start':
+        if not start_daemon(args.socket, cache_mb=args.cache_mb):
+            print("Daemon did not come up; see jobs/daemon.log", file=sys.stderr)
+            return EXIT_FAILED
+        return 0
+    if not is_running(args.socket):
+        if args.command == 'stop':
+            return 0
+        if not (args.autostart and start_daemon(args.socket)):
+            print(f"No daemon on {args.socket} (run 'python src/pruning_cli.py start' or pass --autostart)",
+                  file=sys.stderr)
+            return EXIT_NO_DAEMON
+    kind = 'shutdown' if args.command == 'stop' else args.command
+    spec = None if kind in ('shutdown', 'status') else build_spec(args)
+    try:
+        result = request(kind, spec, socket_path=args.socket, on_progress=_progress_printer(args.quiet))
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    print(json.dumps(result, indent=2, default=str))
+    return 0
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Resource Governor
+- Caps concurrent heavy operations across dashboard sessions (threads of one process)
+- Partitions cores: each operation runs with torch.set_num_threads(cores // slots)
+- FIFO admission with a visible queue position
+- Exclusive mode for latency benchmarks: waits for running work to drain and gets every core
+- Grants also hold a host-wide lock with the job workers, so benchmarks exclude them too
+- A gate lock gives the host lock writer preference: a waiting benchmark is not starved by a stream of jobs
+"""
+
+import os
+import time
+import threading
+import itertools
+from collections import deque
+from contextlib import contextmanager, ExitStack
+import torch
+from coordination import FCNTL_AVAILABLE, file_lock
+
+HOST_LOCK_FILE = os.path.join('jobs', 'cores.lock')
+GATE_SUFFIX = '.gate'
+WAIT_POLL_SECONDS = 0.5
+
+def default_slots(cores):
+    """Concurrent heavy operations for a core count (at least two cores each)"""
+    return max(1, cores // 2)
+
+@contextmanager
+def host_cores(exclusive=False, lock_file=HOST_LOCK_FILE):
+    """Advisory host-wide lock: workers hold it shared while running, benchmarks take it exclusively"""
+    if not FCNTL_AVAILABLE:
+        yield  # Shared locks need flock; without it workers would serialise each other
+        return
+    with ExitStack() as held:
+        # Everyone passes the gate to get the host lock; an exclusive holder keeps it while waiting,
+        # so new shared holders queue behind it instead of overlapping the ones already running
+        with file_lock(lock_file + GATE_SUFFIX):
+            held.enter_context(file_lock(lock_file, shared=not exclusive))
+        yield
+
+class Grant:
+    """What an admitted operation received"""
+
+    def __init__(self, ticket, label, threads, exclusive, waited):
+        self.ticket = ticket
+        self.label = label
+        self.threads = threads
+        self.exclusive = exclusive
+        self.waited = waited
+
+class ResourceGovernor:
+    """Admission control and core partitioning for heavy in-process work"""
+
+    def __init__(self, cores=None, max_concurrent=None):
+        self.cores = cores or int(os.environ.get('PRUNING_GOVERNOR_CORES', 0)) or os.cpu_count() or 1
+        self.max_concurrent = (max_concurrent or int(os.environ.get('PRUNING_GOVERNOR_SLOTS', 0))
+                               or default_slots(self.cores))
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._running = {}
+        self._tickets = itertools.count(1)
+
+    def threads_per_slot(self):
+        return max(1, self.cores // self.max_concurrent)
+
+    def _can_start(self, ticket, exclusive):
+        if not self._queue or self._queue[0][0] != ticket:
+            return False  # Strict FIFO: nobody overtakes a waiting benchmark
+        if any(info['exclusive'] for info in self._running.values()):
+            return False
+        if exclusive:
+            return not self._running
+        return len(self._running) < self.max_concurrent
+
+    def position(self, ticket):
+        """1-based place in the admission queue, or 0 once running"""
+        with self._cond:
+            for i, (queued, _, _) in enumerate(self._queue):
+                if queued == ticket:
+                    return i + 1
+        return 0
+
+    @contextmanager
+    def slot(self, label, exclusive=False, threads=None, on_wait=None):
+        """Run a block once admitted, with this operation's share of the cores"""
+        ticket = next(self._tickets)
+        requested = time.time()
+        with self._cond:
+            self._queue.append((ticket, label, exclusive))
+            try:
+                while not self._can_start(ticket, exclusive):
+                    if on_wait is not None:
+                        position = [q[0] for q in self._queue].index(ticket) + 1
+                        running = len(self._running)
+                        self._cond.release()
+                        try:
+                            on_wait(position, running)
+                        finally:
+                            self._cond.acquire()
+                    self._cond.wait(WAIT_POLL_SECONDS)
+            except BaseException:
+                # A rerun interrupted the wait: give up the place in line
+                self._queue.remove((ticket, label, exclusive))
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            granted_threads = self.cores if exclusive else self.threads_per_slot()
+            if threads:
+                granted_threads = min(granted_threads, int(threads))
+            self._running[ticket] = {'label': label, 'exclusive': exclusive, 'threads': granted_threads,
+                                     'started': time.time()}
+            self._cond.notify_all()
+
+        # Under PyTorch's default OpenMP backend this is per calling thread, i.e. per session
+        previous = torch.get_num_threads()
+        torch.set_num_threads(granted_threads)
+        try:
+            with host_cores(exclusive=exclusive):
+                yield Grant(ticket, label, granted_threads, exclusive, time.time() - requested)
+        finally:
+            torch.set_num_threads(previous)
+            with self._cond:
+                self._running.pop(ticket, None)
+                self._cond.notify_all()
+
+    def exclusive(self, label, on_wait=None):
+        """Slot with every core and nothing else running (for latency benchmarks)"""
+        return self.slot(label, exclusive=True, on_wait=on_wait)
+
+    def status(self):
+        """Running and queued operations"""
+        with self._cond:
+            now = time.time()
+            return {
+                'cores': self.cores,
+                'max_concurrent': self.max_concurrent,
+                'running': [{'label': info['label'], 'threads': info['threads'], 'exclusive': info['exclusive'],
+                             'seconds': now - info['started']} for info in self._running.values()],
+                'queued': [{'label': label, 'exclusive': exclusive} for _, label, exclusive in self._queue]
+            }
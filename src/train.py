@@ -1,4 +1,6 @@
 import os
+import time
+import signal
 import argparse
 import platform
 import torch
@@ -7,9 +9,48 @@ import torch.optim as optim
 from torchvision import datasets, transforms
 from torch.utils.data import DataLoader
 from model import SimpleCNN
+from model_index import record_checkpoint
+from lineage import register
+from checkpoint_io import CHECKPOINT_FORMATS, DERIVED_FORMATS, checkpoint_path, save_state_dict
+from training_jobs import EventLog
 from tqdm import tqdm
 
+STEP_EVENT_INTERVAL = 1.0  # Seconds between step events in the events file
+
+class StopRequested:
+    """Cancellation (marker file or SIGTERM) and wall-clock deadline for a training run"""
+
+    def __init__(self, cancel_file=None, max_seconds=None):
+        self.cancel_file = cancel_file
+        self.deadline = time.time() + max_seconds if max_seconds else None
+        self.signalled = False
+        try:
+            signal.signal(signal.SIGTERM, self._on_signal)
+        except ValueError:
+            pass  # Not in the main thread
+
+    def _on_signal(self, signum, frame):
+        self.signalled = True
+
+    def reason(self):
+        if self.signalled or (self.cancel_file and os.path.exists(self.cancel_file)):
+            return 'cancelled'
+        if self.deadline is not None and time.time() > self.deadline:
+            return 'timeout'
+        return None
+
 def train(args):
+    events = EventLog(args.events_file)
+    try:
+        return _train(args, events)
+    except Exception as e:
+        events.emit('end', status='failed', error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        events.close()
+
+def _train(args, events):
+    stop = StopRequested(args.cancel_file, args.max_seconds)
     transform = transforms.Compose([transforms.ToTensor(),
                                     transforms.Normalize((0.5,0.5,0.5),(0.5,0.5,0.5))])
     trainset = datasets.CIFAR10(root='./data', train=True, download=True, transform=transform)
@@ -50,8 +91,9 @@ def train(args):
         print("Using mixed precision training for speed boost!")
     
     # Try to compile model for faster execution (PyTorch 2.0+)
+    # reduce-overhead relies on CUDA graphs; on CPU use src/export.py for fused inference instead
     try:
-        if hasattr(torch, 'compile'):
+        if hasattr(torch, 'compile') and torch.cuda.is_available():
             model = torch.compile(model, mode='reduce-overhead')
             print("Model compiled for faster execution!")
     except:
@@ -65,10 +107,24 @@ def train(args):
     patience = 1  # Stop after 1 epoch without improvement
     patience_counter = 0
 
+    steps_per_epoch = len(trainloader)
+    total_steps = steps_per_epoch * args.epochs
+    events.emit('start', epochs=args.epochs, steps_per_epoch=steps_per_epoch, total_steps=total_steps,
+                batch_size=args.batch_size, device=str(device))
+    train_start = time.time()
+    global_step = 0
+    stopped = None
+
     for epoch in range(args.epochs):
         model.train()
         running = 0.0
-        for images, labels in tqdm(trainloader, desc=f"Epoch {epoch+1}", leave=False):
+        epoch_start = time.time()
+        last_event = epoch_start
+        window_samples = 0
+        for step, (images, labels) in enumerate(tqdm(trainloader, desc=f"Epoch {epoch+1}", leave=False)):
+            stopped = stop.reason()
+            if stopped:
+                break
             images, labels = images.to(device, non_blocking=True), labels.to(device, non_blocking=True)
             optimizer.zero_grad()
             
@@ -87,7 +143,26 @@ def train(args):
                 optimizer.step()
             
             running += loss.item()
-        print(f"Epoch {epoch+1}/{args.epochs} loss: {running/len(trainloader):.4f}")
+            global_step += 1
+            window_samples += labels.size(0)
+            now = time.time()
+            if args.events_file and now - last_event >= STEP_EVENT_INTERVAL:
+                elapsed = now - train_start
+                events.emit('step', epoch=epoch + 1, step=step + 1, global_step=global_step,
+                            total_steps=total_steps, loss=loss.item(),
+                            samples_per_sec=window_samples / (now - last_event),
+                            eta_seconds=elapsed / global_step * (total_steps - global_step))
+                last_event = now
+                window_samples = 0
+        if stopped:
+            print(f"Training stopped ({stopped}) during epoch {epoch+1}")
+            events.emit('end', status=stopped, epoch=epoch + 1, global_step=global_step)
+            return None
+        epoch_loss = running / len(trainloader)
+        print(f"Epoch {epoch+1}/{args.epochs} loss: {epoch_loss:.4f}")
+        elapsed = time.time() - train_start
+        events.emit('epoch', epoch=epoch + 1, loss=epoch_loss, seconds=time.time() - epoch_start,
+                    eta_seconds=elapsed / (epoch + 1) * (args.epochs - epoch - 1))
         
         # Evaluate only at the end for maximum speed (skip during training)
         if (epoch + 1) == args.epochs:
@@ -102,6 +177,7 @@ def train(args):
                     correct += predicted.eq(labels).sum().item()
             acc = 100.*correct/total
             print(f"Test accuracy after epoch {epoch+1}: {acc:.2f}%")
+            events.emit('eval', epoch=epoch + 1, accuracy=acc)
             
             # Early stopping (more aggressive in quick mode)
             if acc > best_acc:
@@ -117,8 +193,16 @@ def train(args):
                     print(f"Early stopping at epoch {epoch+1} (good enough accuracy: {acc:.2f}%)")
                     break
     os.makedirs(args.save_dir, exist_ok=True)
-    torch.save(model.state_dict(), os.path.join(args.save_dir, 'baseline.pth'))
-    print('Saved model to', os.path.join(args.save_dir, 'baseline.pth'))
+    save_path = checkpoint_path(os.path.join(args.save_dir, 'baseline.pth'), args.format)
+    state = model.state_dict()
+    save_state_dict(state, save_path)
+    record_checkpoint(save_path, state, source='train',
+                      extra={'epochs': args.epochs, 'quick_mode': args.quick_mode, 'accuracy': best_acc})
+    register(save_path, operation={'type': 'train', 'epochs': args.epochs, 'quick_mode': args.quick_mode})
+    print('Saved model to', save_path)
+    events.emit('end', status='completed', save_path=save_path, accuracy=best_acc,
+                seconds=time.time() - train_start)
+    return save_path
 
 if __name__=='__main__':
     parser = argparse.ArgumentParser()
@@ -127,5 +211,11 @@ if __name__=='__main__':
     parser.add_argument('--learning-rate', type=float, default=1e-3, help='Learning rate for optimizer')
     parser.add_argument('--save-dir', type=str, default='saved')
     parser.add_argument('--quick-mode', action='store_true', help='Use subset of data for faster training')
+    parser.add_argument('--format', type=str, default='pth',
+                        choices=[f for f in CHECKPOINT_FORMATS if f not in DERIVED_FORMATS],
+                        help='checkpoint format (safetensors loads memory-mapped, without pickle)')
+    parser.add_argument('--events-file', type=str, default=None, help='append JSON-lines progress events here')
+    parser.add_argument('--cancel-file', type=str, default=None, help='stop cleanly once this file exists')
+    parser.add_argument('--max-seconds', type=float, default=None, help='stop after this much wall-clock time')
     args = parser.parse_args()
     train(args)
@@ -0,0 +1,215 @@
+"""
+Training Jobs
+- Launch train.py as a detached process tracked under jobs/<id>/
+- Structured JSON-lines events (per-step / per-epoch loss, throughput, ETA)
+- Incremental tailing, cancellation (marker file + signal) and timeouts
+- Jobs outlive Streamlit reruns, browser refreshes and app restarts
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import subprocess
+from coordination import atomic_write
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_JOBS_DIR = 'jobs'
+JOB_FILE = 'job.json'
+EVENTS_FILE = 'events.jsonl'
+LOG_FILE = 'output.log'
+CANCEL_FILE = 'cancel'
+CANCEL_GRACE_SECONDS = 15
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'timeout')
+
+class EventLog:
+    """Append-only JSON-lines event writer used by the training process"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', buffering=1) if path else None
+
+    def emit(self, event_type, **fields):
+        if self._file is None:
+            return
+        fields['type'] = event_type
+        fields['time'] = time.time()
+        self._file.write(json.dumps(fields) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def job_dir(job_id, jobs_dir=DEFAULT_JOBS_DIR):
+    """Directory holding a job's files"""
+    return os.path.join(jobs_dir, job_id)
+
+def _write_job(job, jobs_dir):
+    path = os.path.join(job_dir(job['id'], jobs_dir), JOB_FILE)
+    with atomic_write(path, 'w', fsync=False) as f:
+        json.dump(job, f, indent=1)
+
+def load_job(job_id, jobs_dir=DEFAULT_JOBS_DIR):
+    """Job record, or None"""
+    try:
+        with open(os.path.join(job_dir(job_id, jobs_dir), JOB_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def start_training_job(train_args, jobs_dir=DEFAULT_JOBS_DIR, timeout_seconds=None, script='src/train.py'):
+    """Launch train.py detached; train_args is a list of CLI arguments"""
+    job_id = f"train_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    directory = job_dir(job_id, jobs_dir)
+    os.makedirs(directory, exist_ok=True)
+    events_path = os.path.join(directory, EVENTS_FILE)
+    cmd = [sys.executable, script] + list(train_args) + [
+        '--events-file', events_path,
+        '--cancel-file', os.path.join(directory, CANCEL_FILE)
+    ]
+    if timeout_seconds:
+        cmd += ['--max-seconds', str(timeout_seconds)]
+
+    popen_kwargs = {}
+    if os.name == 'nt':
+        popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs['start_new_session'] = True  # Not killed with the Streamlit process
+    with open(os.path.join(directory, LOG_FILE), 'ab') as log:
+        process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   **popen_kwargs)
+
+    job = {
+        'id': job_id,
+        'kind': 'train',
+        'cmd': cmd,
+        'pid': process.pid,
+        'status': 'running',
+        'started': time.time(),
+        'timeout_seconds': timeout_seconds,
+        'cancel_requested': False
+    }
+    _write_job(job, jobs_dir)
+    return job
+
+def _pid_alive(pid):
+    if PSUTIL_AVAILABLE:
+        try:
+            process = psutil.Process(pid)
+            return process.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+def read_events(job_id, offset=0, jobs_dir=DEFAULT_JOBS_DIR):
+    """Events appended since a byte offset; returns (events, new_offset)"""
+    path = os.path.join(job_dir(job_id, jobs_dir), EVENTS_FILE)
+    events = []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partially written line: pick it up next time
+                offset += len(line)
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return events, offset
+
+def final_event(job_id, jobs_dir=DEFAULT_JOBS_DIR):
+    """The job's 'end' event, or None if it never wrote one"""
+    events, _ = read_events(job_id, 0, jobs_dir)
+    return next((e for e in reversed(events) if e.get('type') == 'end'), None)
+
+def _kill_group(pid):
+    """Hard-kill a job and its data loader workers"""
+    try:
+        if os.name == 'nt':
+            if PSUTIL_AVAILABLE:
+                process = psutil.Process(pid)
+                for child in process.children(recursive=True):
+                    child.kill()
+                process.kill()
+            else:
+                os.kill(pid, signal.SIGTERM)
+        else:
+            os.killpg(pid, signal.SIGKILL)  # start_new_session made the job its own group leader
+    except (OSError, Exception):
+        pass
+
+def cancel_job(job_id, jobs_dir=DEFAULT_JOBS_DIR):
+    """Ask a job to stop at the next step (escalates to a signal after a grace period)"""
+    job = load_job(job_id, jobs_dir)
+    if job is None or job['status'] in TERMINAL_STATUSES:
+        return job
+    open(os.path.join(job_dir(job_id, jobs_dir), CANCEL_FILE), 'w').close()
+    job['cancel_requested'] = True
+    job['cancel_time'] = time.time()
+    _write_job(job, jobs_dir)
+    return job
+
+def refresh_job(job_id, last_event=None, jobs_dir=DEFAULT_JOBS_DIR):
+    """Reconcile a job record with its process and final event; returns the job"""
+    job = load_job(job_id, jobs_dir)
+    if job is None or job['status'] in TERMINAL_STATUSES:
+        return job
+    now = time.time()
+    if (last_event is None or last_event.get('type') != 'end') and not _pid_alive(job['pid']):
+        # Finished while nobody was tailing it: the end event is the authoritative outcome
+        last_event = final_event(job_id, jobs_dir)
+    if last_event is not None and last_event.get('type') == 'end':
+        job['status'] = last_event.get('status', 'completed')
+        job['result'] = {k: v for k, v in last_event.items() if k not in ('type', 'time')}
+        job['finished'] = last_event.get('time', now)
+    elif not _pid_alive(job['pid']):
+        job['status'] = 'cancelled' if job.get('cancel_requested') else 'failed'
+        job['finished'] = now
+    else:
+        # Hard stop if the process ignores the cancel marker or overruns its own deadline
+        overdue = job.get('timeout_seconds') and now - job['started'] > job['timeout_seconds'] + CANCEL_GRACE_SECONDS
+        stuck = job.get('cancel_requested') and now - job.get('cancel_time', now) > CANCEL_GRACE_SECONDS
+        if overdue or stuck:
+            _kill_group(job['pid'])
+            job['status'] = 'timeout' if overdue else 'cancelled'
+            job['finished'] = now
+        else:
+            return job
+    _write_job(job, jobs_dir)
+    return job
+
+def list_jobs(jobs_dir=DEFAULT_JOBS_DIR, limit=20):
+    """Most recent jobs first"""
+    if not os.path.isdir(jobs_dir):
+        return []
+    job_ids = sorted(os.listdir(jobs_dir), reverse=True)[:limit]
+    return [job for job in (load_job(job_id, jobs_dir) for job_id in job_ids) if job]
+
+def read_log_tail(job_id, max_bytes=4096, jobs_dir=DEFAULT_JOBS_DIR):
+    """Last part of a job's stdout/stderr"""
+    path = os.path.join(job_dir(job_id, jobs_dir), LOG_FILE)
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - max_bytes))
+            return f.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
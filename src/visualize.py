@@ -1,8 +1,9 @@
 
-import torch
 import matplotlib.pyplot as plt
 import numpy as np
 from model import SimpleCNN
+from checkpoint_io import load_state_dict
+from coordination import atomic_savefig
 import os
 
 def plot_weight_histograms(state_dict, out_dir='assets', prefix='weights'):
@@ -15,12 +16,12 @@ def plot_weight_histograms(state_dict, out_dir='assets', prefix='weights'):
             plt.title(k)
             plt.tight_layout()
             fname = os.path.join(out_dir, f"{prefix}_{k.replace('.','_')}.png")
-            plt.savefig(fname)
+            atomic_savefig(fname)
             plt.close()
 
 def visualize(model_path, out_dir='assets', prefix='baseline'):
     device = 'cpu'
-    state = torch.load(model_path, map_location=device)
+    state = load_state_dict(model_path, map_location=device)
     plot_weight_histograms(state, out_dir=out_dir, prefix=prefix)
     print('Saved weight histograms to', out_dir)
 
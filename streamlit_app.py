@@ -1,3 +1,5 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import streamlit as st
 import torch
 import os
@@ -5,44 +7,71 @@ import subprocess
 import sys
 import platform
 from pathlib import Path
-import matplotlib.pyplot as plt
 import numpy as np
-import time
 from functools import lru_cache
-import json
+from collections import deque
+from statistics import median
+from contextlib import contextmanager
 from datetime import datetime
 import hashlib
 
-# Try to import plotly for interactive charts
-try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
-
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from lazy_imports import (lazy_module, is_available, deferred_import_times, import_time_report,
+                          format_import_report)
+
+# Heavy plotting libraries load on first use, not on every cold start
+plt = lazy_module('matplotlib.pyplot')
+PLOTLY_AVAILABLE = is_available('plotly')
+go = lazy_module('plotly.graph_objects')
+plotly_subplots = lazy_module('plotly.subplots')
+
 from model import SimpleCNN
-from torchvision import datasets, transforms
 from torch.utils.data import DataLoader
+from fingerprint import file_fingerprint, last_fingerprint
+from file_watcher import DirectoryWatcher
+from evaluation import build_test_loader, collect_logits, get_test_transform
+from logits_cache import save_logits, load_logits, load_labels, logits_lock
+from logit_metrics import accuracy_from_logits, compare_with_parent, ensemble_accuracy
+from inference import INFERENCE_MODES, DEFAULT_INFERENCE_MODE, resolve_mode, configure_threads, describe_mode
+from logits_cache import load_logits_meta
+from export import export_checkpoint, artifact_path_for, is_torchscript_artifact, load_torchscript, DEFAULT_EXPORT_DIR
+from model_index import get_checkpoint_metadata, remove_checkpoint, list_index
+from model_cache import ModelCache, DEFAULT_CACHE_MB
+from checkpoint_io import (load_state_dict, open_checkpoint, checkpoint_path,
+                           delete_checkpoint_file, checkpoint_nbytes, checkpoint_disk_nbytes, CHECKPOINT_FORMATS,
+                           MODEL_FILE_SUFFIXES)
+from model_store import store_stats
+from delta_checkpoint import find_dependents
+from ingest import ingest_upload
+from bundle_export import (write_bundle, remove_old_bundles, download_name, ARCHIVE_FORMATS,
+                           BUNDLE_CHECKPOINT_FORMATS, EXPORT_DIR)
+from download_server import DownloadServer, DEFAULT_PORT as DOWNLOAD_PORT
+from lineage import (load_lineage, remove as remove_lineage, backfill as backfill_lineage,
+                     get_version as lineage_version, get_root as get_lineage_root, rollback_target)
+from job_queue import (submit as submit_job, get_job as get_queued_job, cancel as cancel_queued_job,
+                       queue_counts, FINAL_STATUSES)
+from job_worker import ensure_pool, pool_pid
+from resource_governor import ResourceGovernor
+from coordination import SingleFlight
+from prewarm import Prewarmer
+from precompute import PrecomputeScheduler
+from training_jobs import (start_training_job, read_events as read_job_events, refresh_job, cancel_job,
+                           list_jobs as list_training_jobs, read_log_tail, TERMINAL_STATUSES)
 
-# Import advanced modules
+# Import advanced modules (visualization and analysis load on first use)
 try:
-    from advanced_prune import magnitude_prune, l1_prune, structured_channel_prune, gradient_based_prune, random_prune
-    from advanced_visualize import (
-        plot_weight_distributions, plot_weight_heatmap, plot_sparsity_analysis,
-        plot_layer_statistics, visualize_activations, plot_pruning_comparison
-    )
-    from model_analyzer import (
-        calculate_flops, measure_inference_time, get_model_size_mb,
-        analyze_model_architecture, compare_model_complexity
-    )
-    ADVANCED_FEATURES = True
+    from advanced_prune import method_key
+    ADVANCED_FEATURES = is_available('matplotlib')
 except ImportError as e:
     ADVANCED_FEATURES = False
     # Will show warning in UI if needed
+advanced_visualize = lazy_module('advanced_visualize')
+model_analyzer = lazy_module('model_analyzer')
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+PAGE_TIMING_WINDOW = 50
+IMPORT_REPORT_MODULES = ['streamlit', 'torch', 'torchvision', 'numpy', 'matplotlib.pyplot', 'plotly.graph_objects']
 
 # Page configuration
 st.set_page_config(
@@ -973,40 +1002,358 @@ st.markdown("""
     </script>
 """, unsafe_allow_html=True)
 
+# Process-wide caches shared by every browser session
+@st.cache_resource
+def get_shared_model_cache():
+    """LRU cache of loaded checkpoints and models with a byte budget"""
+    return ModelCache(max_bytes=DEFAULT_CACHE_MB * 1024 * 1024)
+
+@st.cache_resource
+def get_shared_eval_results():
+    """Evaluation results (accuracy and details) shared across sessions, keyed by (path, inference mode)"""
+    return {'accuracy': {}, 'details': {}}
+
+@st.cache_resource
+def get_file_watcher():
+    """Watcher over saved/ and assets/ that invalidates only the caches of files that changed"""
+    model_cache = get_shared_model_cache()
+    eval_results = get_shared_eval_results()
+    known_fingerprints = {}
+    watcher = DirectoryWatcher({'saved': MODEL_FILE_SUFFIXES, 'assets': ('.png',)})
+    
+    def on_change(event, path):
+        rel_path = os.path.relpath(path)
+        if not rel_path.endswith(MODEL_FILE_SUFFIXES):
+            return
+        for fingerprint in {known_fingerprints.pop(rel_path, None), last_fingerprint(path)} - {None}:
+            model_cache.invalidate(fingerprint)
+        for results in eval_results.values():
+            for key in [k for k in list(results) if k[0] == rel_path]:
+                results.pop(key, None)
+        if event == 'deleted':
+            remove_checkpoint(rel_path)
+            remove_lineage(rel_path)
+        else:
+            known_fingerprints[rel_path] = file_fingerprint(path)
+            # Backfill the index for files written outside the dashboard (never unpickles objects)
+            get_checkpoint_metadata(rel_path, state_loader=lambda p: load_state_dict(p, trusted=False))
+    
+    # Seed from the initial scan, so the first change to a file also drops what was cached for its old content
+    indexed = list_index('saved')
+    for rel_path in watcher.files('saved'):
+        entry = indexed.get(Path(rel_path).name)
+        try:
+            stat = os.stat(rel_path)
+            if entry and entry.get('size_bytes') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+                known_fingerprints[rel_path] = entry['fingerprint']
+            else:
+                known_fingerprints[rel_path] = file_fingerprint(rel_path)
+        except (OSError, KeyError):
+            continue
+    
+    watcher.add_listener(on_change)
+    return watcher.start()
+
+@st.cache_resource
+def get_thread_settings():
+    """Server-wide inter-op pool size (PRUNING_INTEROP_THREADS), applied once per process"""
+    return configure_threads(None, int(os.environ.get('PRUNING_INTEROP_THREADS', '0')) or None)
+
+@st.cache_resource
+def get_single_flight():
+    """Coalesces identical heavy work (evaluations, activation maps) started by several sessions"""
+    return SingleFlight()
+
+@st.cache_resource
+def get_governor():
+    """Admission control and core partitioning shared by every session"""
+    return ResourceGovernor()
+
+@st.cache_resource
+def get_download_server():
+    """Streams bundles and TorchScript artifacts from disk to the sessions they were offered to"""
+    try:
+        return DownloadServer([EXPORT_DIR, os.path.abspath(DEFAULT_EXPORT_DIR)]).start()
+    except OSError:
+        return None  # Port taken: the export still lands on disk
+
+@st.cache_resource
+def get_startup_stats():
+    """Import time of the first script run in this server process (later reruns hit sys.modules)"""
+    return {'cold_import_seconds': IMPORT_SECONDS, 'started': time.time()}
+
+@contextmanager
+def governed(label, exclusive=False):
+    """Run heavy work once admitted by the governor, showing the queue position while waiting"""
+    placeholder = st.empty()
+    
+    def on_wait(position, running):
+        placeholder.info(f"⏳ {label}: waiting for CPU (position {position} in queue, {running} running)")
+    
+    threads = st.session_state.get('inference_threads') or None
+    try:
+        with get_governor().slot(label, exclusive=exclusive, threads=threads, on_wait=on_wait) as grant:
+            placeholder.empty()
+            yield grant
+    finally:
+        placeholder.empty()
+
+def coalesced(key, label, fn, exclusive=False):
+    """Run fn(report) once for every session asking for key, under a governor slot on a helper thread"""
+    flight = get_single_flight()
+    governor = get_governor()
+    threads = st.session_state.get('inference_threads') or None
+    status = st.empty()
+    if flight.in_flight(key):
+        status.progress(0.0, text=f"{label}: another session is already running this; waiting for its result")
+    
+    def work():
+        # Shared by every waiting session, so no widgets in here: progress goes through the flight
+        def on_wait(position, running):
+            flight.report(key, (0.0, f"⏳ {label}: waiting for CPU (position {position} in queue, {running} running)"))
+        with governor.slot(label, exclusive=exclusive, threads=threads, on_wait=on_wait):
+            flight.report(key, (0.0, label))
+            return fn(lambda fraction: flight.report(key, (min(max(fraction, 0.0), 1.0), label)))
+    
+    def show(progress):
+        if progress is not None:
+            status.progress(progress[0], text=progress[1])
+    
+    try:
+        return flight.do(key, work, on_wait=show)
+    finally:
+        status.empty()
+
+# st.fragment (1.37+) reruns only the progress panel; older versions fall back to a refresh button
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+JOB_POLL_SECONDS = 2
+
+def _format_eta(seconds):
+    seconds = int(max(0, seconds or 0))
+    return f"{seconds // 60}m {seconds % 60:02d}s" if seconds >= 60 else f"{seconds}s"
+
+def tail_training_job(job_id):
+    """New events since the last poll (byte offset kept in session state); returns (job, events)"""
+    tails = st.session_state.setdefault('job_event_tails', {})
+    offset, events = tails.get(job_id, (0, []))
+    new_events, offset = read_job_events(job_id, offset)
+    events = events + new_events
+    tails[job_id] = (offset, events)
+    end_event = next((e for e in reversed(events) if e['type'] == 'end'), None)
+    return refresh_job(job_id, end_event), events
+
+def _training_job_panel(job_id):
+    """Progress, live loss curve and cancel control for one training job"""
+    job, events = tail_training_job(job_id)
+    if job is None:
+        st.warning(f"Training job {job_id} no longer exists")
+        return
+    status = job['status']
+    start = next((e for e in events if e['type'] == 'start'), None)
+    steps = [e for e in events if e['type'] == 'step']
+    epochs = [e for e in events if e['type'] == 'epoch']
+    
+    st.markdown(f"**Job `{job_id}`** — {status}")
+    if start and start['total_steps']:
+        done = steps[-1]['global_step'] if steps else 0
+        if status == 'completed' or len(epochs) == start['epochs']:
+            done = start['total_steps']
+        st.progress(min(1.0, done / start['total_steps']), text=f"Step {done}/{start['total_steps']}")
+    elif status == 'running':
+        st.caption("Preparing data...")
+    
+    if steps:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Loss", f"{steps[-1]['loss']:.4f}")
+        with col2:
+            st.metric("Throughput", f"{steps[-1]['samples_per_sec']:.0f} img/s")
+        with col3:
+            st.metric("ETA", _format_eta(steps[-1]['eta_seconds']) if status == 'running' else "—")
+        st.line_chart({'loss': [e['loss'] for e in steps]}, height=180)
+    if epochs:
+        st.caption(" · ".join(f"Epoch {e['epoch']}: loss {e['loss']:.4f} ({e['seconds']:.0f}s)" for e in epochs))
+    
+    if status == 'running':
+        if job.get('cancel_requested'):
+            st.info("Cancellation requested; stopping after the current step...")
+        elif st.button("⏹️ Cancel Training", key=f"cancel_{job_id}"):
+            cancel_job(job_id)
+    elif status == 'completed':
+        result = job.get('result', {})
+        st.success(f"✅ Training finished: {result.get('accuracy', 0):.2f}% test accuracy")
+        handled = st.session_state.setdefault('finished_training_jobs', set())
+        if job_id not in handled:
+            handled.add(job_id)
+            # Invalidate only what was derived from the replaced baseline
+            if result.get('save_path'):
+                get_file_watcher().refresh(result['save_path'])
+            st.info("💡 Check the '📁 Models' tab to view your trained model.")
+    else:
+        error = (job.get('result') or {}).get('error')
+        st.error(f"❌ Training {status}" + (f": {error}" if error else ""))
+        with st.expander("View Output"):
+            st.code(read_log_tail(job_id), language="text")
+
+def training_job_running(job_id):
+    """Whether a training job is still running (a job whose record is gone counts as finished)"""
+    job = refresh_job(job_id)
+    return job is not None and job['status'] not in TERMINAL_STATUSES
+
+def render_training_job(job_id):
+    """Live view of a training job; polls incrementally while it runs"""
+    running = training_job_running(job_id)
+    if running and _fragment is not None:
+        _fragment(run_every=JOB_POLL_SECONDS)(_training_job_panel)(job_id)
+    else:
+        _training_job_panel(job_id)
+        if running:
+            st.button("🔄 Refresh Progress", key=f"refresh_{job_id}")
+
+def active_training_job():
+    """Job this session is following, or the newest running one (reattach after a page reload)"""
+    job_id = st.session_state.get('active_training_job')
+    if job_id:
+        return job_id
+    for job in list_training_jobs():
+        if training_job_running(job['id']):
+            st.session_state.active_training_job = job['id']
+            return job['id']
+    return None
+
+def submit_background_job(slot, kind, spec, priority=0, max_retries=1):
+    """Queue heavy work for the worker pool; the session remembers the job under a UI slot"""
+    ensure_pool()
+    # Sessions asking for the same evaluation, plots or report attach to one job (prunes always run)
+    job_id = submit_job(kind, spec, priority=priority, max_retries=max_retries, dedupe=kind != 'prune')
+    st.session_state.queued_jobs[slot] = job_id
+    return job_id
+
+def first_completion(job_id):
+    """True the first time this session sees a job as done (for one-off side effects)"""
+    seen = st.session_state.setdefault('completed_jobs_seen', set())
+    if job_id in seen:
+        return False
+    seen.add(job_id)
+    return True
+
+def remember_evaluation(model_path, details, mode=None):
+    """Publish a worker's evaluation to the shared accuracy cache"""
+    if details and details.get('accuracy') is not None:
+        key = (model_path, details.get('inference_mode') or mode or eval_mode_for(model_path))
+        st.session_state.eval_cache[key] = details['accuracy']
+        st.session_state.eval_details[key] = details
+
+def _queued_job_panel(job_id, on_done):
+    job = get_queued_job(job_id)
+    if job is None:
+        st.warning(f"Job #{job_id} no longer exists")
+        return
+    status = job['status']
+    if status == 'queued':
+        running = queue_counts().get('running', 0)
+        st.info(f"⏳ {job['kind'].title()} job #{job_id} is queued ({running} job(s) running)")
+    elif status == 'running':
+        st.progress(min(1.0, job['progress'] or 0.0), text=f"{job['kind'].title()} job #{job_id}: {job['message'] or 'running'}")
+    elif status == 'done':
+        if on_done is not None:
+            on_done(job)
+        return
+    else:
+        st.error(f"❌ {job['kind'].title()} job #{job_id} {status}" + (f": {job['error']}" if job['error'] else ""))
+        return
+    if job['cancel_requested']:
+        st.caption("Cancellation requested...")
+    elif st.button("⏹️ Cancel", key=f"cancel_job_{job_id}"):
+        cancel_queued_job(job_id)
+
+def render_queued_job(job_id, on_done=None):
+    """Status of a queued job; polls while it is pending and calls on_done(job) once it finished"""
+    job = get_queued_job(job_id)
+    pending = job is not None and job['status'] not in FINAL_STATUSES
+    if pending and _fragment is not None:
+        _fragment(run_every=JOB_POLL_SECONDS)(_queued_job_panel)(job_id, on_done)
+    else:
+        _queued_job_panel(job_id, on_done)
+        if pending:
+            st.button("🔄 Refresh Status", key=f"refresh_job_{job_id}")
+
 # Initialize session state
 if 'models_loaded' not in st.session_state:
     st.session_state.models_loaded = []
-if 'training_in_progress' not in st.session_state:
-    st.session_state.training_in_progress = False
-if 'model_cache' not in st.session_state:
-    st.session_state.model_cache = {}
+if 'active_training_job' not in st.session_state:
+    st.session_state.active_training_job = None
 if 'eval_cache' not in st.session_state:
-    st.session_state.eval_cache = {}
+    st.session_state.eval_cache = get_shared_eval_results()['accuracy']
 if 'training_step' not in st.session_state:
     st.session_state.training_step = 1
 if 'training_config' not in st.session_state:
     st.session_state.training_config = {}
-if 'model_versions' not in st.session_state:
-    st.session_state.model_versions = {}
 if 'notifications' not in st.session_state:
     st.session_state.notifications = []
+if 'eval_details' not in st.session_state:
+    st.session_state.eval_details = get_shared_eval_results()['details']
+if 'inference_mode' not in st.session_state:
+    st.session_state.inference_mode = DEFAULT_INFERENCE_MODE
+if 'queued_jobs' not in st.session_state:
+    st.session_state.queued_jobs = {}
 
-# Compact Header with Navigation - Removed duplicate title
-
-# Top Navigation Bar - Refactored to 6 Main Sections
-nav_options = [
-    "🏠 Home", 
-    "✂️ Pruning Jobs",  # Combined: Train Model + Advanced Prune
-    "📁 Models",  # Renamed from Model Manager
-    "📊 Analytics & Visualization",  # Combined: Visualize + Analysis + Analytics
-    "📈 Compare Models", 
-    "📄 Reports"  # Renamed from Export/Report
-]
-
-# Utility Navigation Bar removed - UI elements deleted as requested
-
-# Create tabs for navigation at the top
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(nav_options)
+# Sidebar: inference settings used by evaluation and benchmarking
+with st.sidebar:
+    st.markdown("### ⚙️ Inference Settings")
+    st.selectbox(
+        "Inference Mode",
+        list(INFERENCE_MODES),
+        key="inference_mode",
+        help="eager: fp32 NCHW (original) | cpu: inference_mode + channels_last (oneDNN) | "
+             "cpu_bf16: cpu + bfloat16 autocast where supported"
+    )
+    st.number_input("Intra-op Threads (0 = governor share)", min_value=0, max_value=256,
+                    value=0, key="inference_threads",
+                    help="Applied per operation (this session only); heavy operations get at most their governor share of the cores")
+    # Process-wide settings stay server-wide: a session never changes another session's threads
+    thread_settings = get_thread_settings()
+    st.caption(f"Threads: up to {get_governor().threads_per_slot()} intra-op per operation / "
+               f"{thread_settings['num_interop_threads']} inter-op (server-wide, PRUNING_INTEROP_THREADS)")
+    
+    cache_stats = get_shared_model_cache().stats()
+    st.markdown("### 🧠 Model Cache")
+    st.caption(f"{cache_stats['entries']} entries | {cache_stats['current_mb']:.1f} / {cache_stats['max_mb']:.0f} MB | "
+               f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+               f"{cache_stats['evictions']} evictions, {cache_stats['coalesced']} coalesced)")
+    watcher_errors = list(get_file_watcher().errors)
+    if watcher_errors:
+        _, event, path, error = watcher_errors[-1]
+        st.warning(f"File watcher: {len(watcher_errors)} failed update(s); last on {event} {Path(path).name}: {error}")
+    
+    governor_status = get_governor().status()
+    st.markdown("### 🚦 CPU Governor")
+    st.caption(f"{len(governor_status['running'])}/{governor_status['max_concurrent']} slots busy | "
+               f"{len(governor_status['queued'])} waiting | {governor_status['cores']} cores "
+               f"({get_governor().threads_per_slot()} per slot)")
+    for op in governor_status['running']:
+        st.caption(f"▶ {op['label']} — {op['threads']} threads{' (exclusive)' if op['exclusive'] else ''}, {op['seconds']:.0f}s")
+    
+    st.markdown("### 🧵 Background Jobs")
+    counts = queue_counts()
+    st.caption(f"Workers: {'running' if pool_pid() else 'idle'} | {counts.get('queued', 0)} queued | "
+               f"{counts.get('running', 0)} running | {counts.get('done', 0)} done | {counts.get('failed', 0)} failed")
+    
+    startup = get_startup_stats()
+    st.markdown("### ⏱️ Startup")
+    st.caption(f"Cold imports {startup['cold_import_seconds'] * 1000:.0f} ms | this run {IMPORT_SECONDS * 1000:.0f} ms")
+    deferred = deferred_import_times()
+    if deferred:
+        st.caption("Loaded on demand: " + ", ".join(f"{name} {seconds * 1000:.0f} ms"
+                                                    for name, seconds in sorted(deferred.items())))
+    with st.expander("Import-time report"):
+        st.caption("Fresh interpreter with `-X importtime`; shows which dependencies dominate a cold start")
+        if st.button("Measure cold imports", key="import_report_button"):
+            with st.spinner("Importing in a fresh interpreter..."):
+                st.session_state.import_report = import_time_report(IMPORT_REPORT_MODULES, top=15)
+        report = st.session_state.get('import_report')
+        if report:
+            st.code(format_import_report(report), language=None)
 
 # Display notifications
 if st.session_state.notifications:
@@ -1023,187 +1370,234 @@ if st.session_state.notifications:
 
 
 # Performance: Cache test dataset loading
-@st.cache_data(ttl=3600)
+@st.cache_resource(ttl=3600)
 def get_test_loader():
-    """Cache test dataset loader"""
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.5, 0.5, 0.5), (0.5, 0.5, 0.5))
-    ])
-    testset = datasets.CIFAR10(root='./data', train=False, download=True, transform=transform)
-    num_workers = 0 if platform.system() == 'Windows' else 2
-    return DataLoader(testset, batch_size=100, shuffle=False, num_workers=num_workers)
-
-# Performance: Cache model info with file modification time
+    """Cache test dataset loader (shared object, so the prewarmed in-memory test set is never re-pickled)"""
+    return build_test_loader(root='./data', batch_size=100)
+
+# Performance: Model info is read from the persistent metadata index
 def get_model_info(model_path):
-    """Get information about a model with caching"""
+    """Get information about a model from the metadata index (backfilled on first sight)"""
     try:
-        # Check cache with file modification time
-        file_mtime = os.path.getmtime(model_path)
-        cache_key = f"{model_path}_{file_mtime}"
-        
-        if cache_key in st.session_state.model_cache:
-            return st.session_state.model_cache[cache_key]
-        
-        device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        state = torch.load(model_path, map_location=device)
-        state = fix_state_dict(state)  # Fix _orig_mod prefix if present
-        
-        model = SimpleCNN().to(device)
-        model.load_state_dict(state, strict=False)  # Use strict=False to handle minor mismatches
-        
-        # Count parameters
-        total_params = sum(p.numel() for p in model.parameters())
-        trainable_params = sum(p.numel() for p in model.parameters() if p.requires_grad)
-        
-        # Count non-zero parameters (optimized)
-        non_zero = sum((p != 0).sum().item() for p in model.parameters())
-        sparsity = 1 - (non_zero / total_params) if total_params > 0 else 0
-        
-        # Get file size
-        file_size = os.path.getsize(model_path) / (1024 * 1024)  # MB
-        
-        info = {
-            'total_params': total_params,
-            'trainable_params': trainable_params,
-            'sparsity': sparsity,
-            'file_size_mb': file_size,
-            'state_dict': state
-        }
-        
-        # Cache the result
-        st.session_state.model_cache[cache_key] = info
-        return info
+        return get_checkpoint_metadata(model_path, state_loader=load_model_state)
     except Exception as e:
         st.error(f"Error loading model: {e}")
         return None
 
+# Performance: Loaded checkpoints live in the shared, fingerprint-keyed cache
+def load_model_state(model_path, cache=None):
+    """Load a checkpoint's state_dict for paths that need the tensors"""
+    if cache is None:
+        cache = get_shared_model_cache()
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    fingerprint = file_fingerprint(model_path)
+    
+    def load():
+        # Memory-mapped on CPU; tensors are only paged in (or copied to the GPU) when used
+        # Delta checkpoints rebuild from a parent that is itself served from this cache
+        state = load_state_dict(model_path, map_location='cpu', parent_loader=lambda path: load_model_state(path, cache))
+        if device.type != 'cpu':
+            state = {k: v.to(device) if torch.is_tensor(v) else v for k, v in state.items()}
+        return state
+    
+    return cache.get_or_load(('state', fingerprint, device.type), load, fingerprint=fingerprint)
+
+def build_model(state, device):
+    """Fresh SimpleCNN instance from a (cached) state_dict"""
+    model = SimpleCNN().to(device)
+    model.load_state_dict(state, strict=False)
+    model.eval()
+    return model
+
+def load_inference_model(model_path, device, mode, cache=None):
+    """Shared, ready-to-run model for evaluation (one instance per checkpoint, device and mode)"""
+    if cache is None:
+        cache = get_shared_model_cache()
+    fingerprint = file_fingerprint(model_path)
+    if is_torchscript_artifact(model_path):
+        return cache.get_or_load(
+            ('torchscript', fingerprint, device.type), lambda: load_torchscript(model_path, device), fingerprint=fingerprint
+        )
+    return cache.get_or_load(
+        ('model', fingerprint, device.type, mode),
+        lambda: build_model(load_model_state(model_path, cache), device),
+        fingerprint=fingerprint
+    )
+
+def forget_model(model_path):
+    """Drop cached tensors and evaluation results for a checkpoint that changed or was removed"""
+    try:
+        get_shared_model_cache().invalidate(file_fingerprint(model_path))
+    except OSError:
+        pass
+    for results in (st.session_state.eval_cache, st.session_state.eval_details):
+        for key in [k for k in list(results) if k[0] == model_path]:
+            results.pop(key, None)
+
 # Performance: Cache evaluation results
-def evaluate_model(model_path, use_cache=True):
-    """Evaluate model on test set with caching"""
+def get_cached_logits(model_path):
+    """Return (logits memmap, labels) from the logits cache, or (None, None)"""
+    try:
+        logits = load_logits(file_fingerprint(model_path))
+        labels = load_labels()
+        if logits is None or labels is None or len(logits) != len(labels):
+            return None, None
+        return logits, labels
+    except OSError:
+        return None, None
+
+def get_inference_mode(device):
+    """Inference mode selected in the sidebar, resolved for the device"""
+    return resolve_mode(st.session_state.get('inference_mode', DEFAULT_INFERENCE_MODE), device)
+
+def eval_mode_for(model_path):
+    """Inference mode this session evaluates a checkpoint in"""
+    mode = get_inference_mode(torch.device('cuda' if torch.cuda.is_available() else 'cpu'))
+    if is_torchscript_artifact(model_path) and mode == 'cpu_bf16':
+        mode = 'cpu'  # Frozen graphs already carry their own dtype decisions
+    return mode
+
+def cached_accuracy(model_path, mode=None):
+    """Accuracy cached for a checkpoint in this session's inference mode, or None"""
+    return st.session_state.eval_cache.get((model_path, mode or eval_mode_for(model_path)))
+
+def eval_mode_caption(model_path, mode=None):
+    """Caption naming the inference mode that produced a cached accuracy"""
+    details = st.session_state.eval_details.get((model_path, mode or eval_mode_for(model_path)))
+    if not details:
+        return ""
+    return f"Measured in '{details.get('inference_mode', DEFAULT_INFERENCE_MODE)}' mode ({details.get('num_threads', '?')} threads)"
+
+def evaluate_model(model_path, use_cache=True, save_logits_cache=False):
+    """Evaluate model on test set with caching (optionally persisting full logits)"""
     try:
-        if use_cache and model_path in st.session_state.eval_cache:
-            return st.session_state.eval_cache[model_path]
-        
         device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        model = SimpleCNN().to(device)
-        state = torch.load(model_path, map_location=device)
-        state = fix_state_dict(state)  # Fix _orig_mod prefix if present
-        model.load_state_dict(state, strict=False)
-        model.eval()
+        mode = eval_mode_for(model_path)
+        key = (model_path, mode)
+        if use_cache and key in st.session_state.eval_cache:
+            if not save_logits_cache or get_cached_logits(model_path)[0] is not None:
+                return st.session_state.eval_cache[key]
+        
+        # Cached logits answer accuracy without a forward pass (when they were produced in this mode)
+        if use_cache:
+            logits, labels = get_cached_logits(model_path)
+            meta = load_logits_meta(file_fingerprint(model_path)) if logits is not None else {}
+            if logits is not None and meta.get('inference_mode', DEFAULT_INFERENCE_MODE) == mode:
+                accuracy = accuracy_from_logits(logits, labels)
+                st.session_state.eval_cache[key] = accuracy
+                st.session_state.eval_details[key] = {
+                    'accuracy': accuracy,
+                    'inference_mode': mode,
+                    'num_threads': meta.get('num_threads'),
+                    'source': 'logits_cache'
+                }
+                return accuracy
         
+        fingerprint = file_fingerprint(model_path)
+        cache = get_shared_model_cache()
         testloader = get_test_loader()
         
-        correct = 0
-        total = 0
-        progress_bar = st.progress(0)
-        total_batches = len(testloader)
+        def forward(report):
+            model = load_inference_model(model_path, device, mode, cache=cache)
+            start = time.perf_counter()
+            logits, labels = collect_logits(
+                model, testloader, device,
+                progress_callback=lambda done, total: report(done / total),
+                mode=mode
+            )
+            elapsed = time.perf_counter() - start
+            details = describe_mode(mode)
+            details.update({
+                'accuracy': accuracy_from_logits(logits.numpy(), labels.numpy()),
+                'samples_per_sec': len(labels) / elapsed if elapsed > 0 else 0.0,
+                'source': 'forward'
+            })
+            return logits, labels, details
         
-        with torch.no_grad():
-            for batch_idx, (images, labels) in enumerate(testloader):
-                images, labels = images.to(device), labels.to(device)
-                outputs = model(images)
-                _, predicted = outputs.max(1)
-                total += labels.size(0)
-                correct += predicted.eq(labels).sum().item()
-                
-                # Update progress
-                if total_batches > 0:
-                    progress_bar.progress((batch_idx + 1) / total_batches)
+        # Sessions evaluating the same checkpoint in the same mode share one forward pass
+        logits, labels, details = coalesced(('evaluate', fingerprint, mode), f"Evaluating {Path(model_path).name}", forward)
+        details = dict(details)
+        accuracy = details['accuracy']
         
-        accuracy = 100. * correct / total
+        if save_logits_cache:
+            with logits_lock(fingerprint):
+                if load_logits(fingerprint) is None:
+                    meta = {'model_path': model_path}
+                    meta.update(details)
+                    save_logits(fingerprint, logits, labels, meta=meta)
         
         # Cache the result
+        st.session_state.eval_details[key] = details
         if use_cache:
-            st.session_state.eval_cache[model_path] = accuracy
+            st.session_state.eval_cache[key] = accuracy
         
-        progress_bar.empty()
         return accuracy
     except Exception as e:
         st.error(f"Evaluation error: {e}")
         return None
 
+def compare_cached_logits(model_path, parent_path):
+    """Parent-relative metrics from cached logits (evaluates and caches on a miss)"""
+    precomputed = get_precompute_scheduler().comparison(model_path, parent_path)
+    if precomputed is not None:
+        return precomputed
+    for path in (model_path, parent_path):
+        if get_cached_logits(path)[0] is None:
+            evaluate_model(path, use_cache=False, save_logits_cache=True)
+    logits, labels = get_cached_logits(model_path)
+    parent_logits, _ = get_cached_logits(parent_path)
+    if logits is None or parent_logits is None:
+        return None
+    return compare_with_parent(logits, parent_logits, labels)
+
 # Fast model list getter
-@st.cache_data(ttl=60)
 def get_model_files():
-    """Get list of model files with caching"""
-    saved_dir = Path("saved")
-    if saved_dir.exists():
-        return sorted([str(f) for f in saved_dir.glob("*.pth")], key=os.path.getmtime, reverse=True)
-    return []
-
-# Helper function to fix state_dict with _orig_mod prefix
-def fix_state_dict(state):
-    """Remove _orig_mod prefix from state_dict keys if present"""
-    if any(key.startswith('_orig_mod.') for key in state.keys()):
-        new_state = {}
-        for key, value in state.items():
-            if key.startswith('_orig_mod.'):
-                new_key = key.replace('_orig_mod.', '')
-                new_state[new_key] = value
-            else:
-                new_state[key] = value
-        return new_state
-    return state
+    """Model files in saved/, newest first (kept current by the directory watcher)"""
+    return get_file_watcher().files('saved')
+
+def render_download_link(path, name, label):
+    """Link that streams a file from disk (the token is only shown to this session)"""
+    server = get_download_server()
+    if server is None:
+        st.warning(f"Download server unavailable (port {DOWNLOAD_PORT} in use?); the file is at `{path}`")
+        return
+    # Same host the browser used for the dashboard, on the download server's port
+    context = getattr(st, 'context', None)
+    host = context.headers.get('Host', '').rsplit(':', 1)[0] if context is not None else ''
+    st.link_button(label, server.url(server.offer(path, name), host or None))
+
+def render_bundle_link(bundle_path):
+    """Download link for a bundle (exports/ is not statically served)"""
+    size_mb = os.path.getsize(bundle_path) / (1024 * 1024)
+    name = download_name(bundle_path)
+    st.success(f"✅ Bundle ready: {name} ({size_mb:.2f} MB)")
+    render_download_link(bundle_path, name, "⬇️ Download bundle")
+
+# Model Versioning Functions (backed by the lineage index)
+def ensure_lineage(model_files):
+    """Register checkpoints that predate the lineage index, using recorded parents where known"""
+    known = load_lineage("saved")['models']
+    if all(Path(f).name in known for f in model_files):
+        return
+    parent_hints = {}
+    for name, entry in list_index("saved").items():
+        parent = (entry.get('extra') or {}).get('parent')
+        if parent:
+            parent_hints[name] = Path(parent).name
+    backfill_lineage(model_files, "saved", parent_hints=parent_hints)
 
-# Model Versioning Functions
 def get_model_version(model_path):
     """Get version number for a model"""
-    model_name = Path(model_path).stem
-    if model_name not in st.session_state.model_versions:
-        # Initialize version based on existing models
-        model_files = get_model_files()
-        base_name = model_name.split('_v')[0] if '_v' in model_name else model_name
-        versions = []
-        for f in model_files:
-            fname = Path(f).stem
-            if base_name in fname or fname in base_name:
-                if '_v' in fname:
-                    try:
-                        version_str = fname.split('_v')[1]
-                        major, minor = map(int, version_str.split('.'))
-                        versions.append((major, minor))
-                    except:
-                        pass
-        if versions:
-            latest = max(versions)
-            st.session_state.model_versions[model_name] = f"v{latest[0]}.{latest[1]}"
-        else:
-            st.session_state.model_versions[model_name] = "v1.0"
-    return st.session_state.model_versions.get(model_name, "v1.0")
+    return lineage_version(model_path)
 
-def assign_next_version(base_name, is_major=False):
-    """Assign next version number for a model"""
-    model_files = get_model_files()
-    versions = []
-    for f in model_files:
-        fname = Path(f).stem
-        if base_name in fname or fname in base_name:
-            if '_v' in fname:
-                try:
-                    version_str = fname.split('_v')[1].split('.')[0] + '.' + fname.split('_v')[1].split('.')[1]
-                    major, minor = map(int, version_str.split('.'))
-                    versions.append((major, minor))
-                except:
-                    pass
-    
-    if versions:
-        latest = max(versions)
-        if is_major:
-            new_version = (latest[0] + 1, 0)
-        else:
-            new_version = (latest[0], latest[1] + 1)
-    else:
-        new_version = (1, 0)
-    
-    return f"v{new_version[0]}.{new_version[1]}"
-
-def calculate_size_reduction(model_path, original_path=None):
-    """Calculate size reduction percentage"""
+def calculate_size_reduction(model_path, original_path=None, physical=True):
+    """Calculate size reduction percentage (on disk, or of the loaded tensors with physical=False)"""
+    # Both sides are measured the same way, whatever format each one is stored in
+    nbytes = checkpoint_disk_nbytes if physical else checkpoint_nbytes
     try:
-        current_size = os.path.getsize(model_path) / (1024 * 1024)  # MB
+        current_size = nbytes(model_path) / (1024 * 1024)  # MB
         if original_path and os.path.exists(original_path):
-            original_size = os.path.getsize(original_path) / (1024 * 1024)  # MB
+            original_size = nbytes(original_path) / (1024 * 1024)  # MB
             if original_size > 0:
                 reduction = ((original_size - current_size) / original_size) * 100
                 return reduction
@@ -1213,6 +1607,105 @@ def calculate_size_reduction(model_path, original_path=None):
 
 
 
+def show_prune_result(job):
+    """Summary of a finished pruning job (notifications and cache refreshes happen once)"""
+    result = job['result']
+    pruned_path, parent = result['path'], result['parent']
+    evaluation = result.get('evaluation') or {}
+    accuracy = evaluation.get('accuracy')
+    if first_completion(job['id']):
+        get_file_watcher().refresh(pruned_path)
+        get_file_watcher().rescan('assets')
+        remember_evaluation(pruned_path, evaluation)
+        size_reduction = calculate_size_reduction(pruned_path, parent)
+        logical_reduction = calculate_size_reduction(pruned_path, parent, physical=False)
+        size_reduction_str = f"{size_reduction:.1f}%" if size_reduction else "N/A"
+        logical_reduction_str = f"{logical_reduction:.1f}%" if logical_reduction else "N/A"
+        add_notification(f"Your pruning job for {Path(pruned_path).name} is complete! "
+                         f"Size reduced by {size_reduction_str} on disk ({logical_reduction_str} in memory).", "success")
+        st.balloons()
+    if not os.path.exists(pruned_path):
+        st.info(f"{Path(pruned_path).name} has since been removed.")
+        return
+    
+    st.success(f"✅ Advanced Pruning Completed: `{Path(pruned_path).name}`")
+    col1, col2, col3, col4 = st.columns(4)
+    pruned_info = get_model_info(pruned_path)
+    if pruned_info:
+        with col1:
+            st.metric("Remaining Parameters", f"{pruned_info['total_params']:,}")
+        with col2:
+            st.metric("New Sparsity", f"{pruned_info['sparsity']:.2%}")
+        with col3:
+            st.metric("File Size", f"{pruned_info['file_size_mb']:.2f} MB")
+        with col4:
+            if accuracy:
+                st.metric("Test Accuracy", f"{accuracy:.2f}%")
+    
+    # Show comparison if original was evaluated
+    orig_acc = cached_accuracy(parent)
+    if accuracy and orig_acc is not None:
+        st.info(f"📈 Accuracy change: {accuracy - orig_acc:+.2f}% (Original: {orig_acc:.2f}% → Pruned: {accuracy:.2f}%)")
+    
+    # Agreement with the parent is free once both logits are cached
+    if get_cached_logits(parent)[0] is not None and get_cached_logits(pruned_path)[0] is not None:
+        logit_stats = compare_cached_logits(pruned_path, parent)
+        if logit_stats:
+            st.info(f"🎯 Agreement with parent: {logit_stats['agreement']:.2f}% | "
+                    f"Fidelity: {logit_stats['fidelity']:.2f}% | "
+                    f"Flipped correct → wrong: {len(logit_stats['correct_to_wrong'])}")
+    if result.get('figures'):
+        st.success("📈 Comparison visualizations generated in assets/")
+
+def show_evaluate_result(job):
+    """Accuracy from a finished evaluation job"""
+    model_path = job['spec']['model_path']
+    if first_completion(job['id']):
+        remember_evaluation(model_path, job['result'], mode=job['spec'].get('inference_mode'))
+    st.success(f"✅ Test Accuracy: {job['result']['accuracy']:.2f}%")
+    st.caption(eval_mode_caption(model_path, job['result'].get('inference_mode') or job['spec'].get('inference_mode')))
+
+def show_visualize_result(job):
+    """Figures produced by a finished visualization job"""
+    if first_completion(job['id']):
+        get_file_watcher().rescan('assets')
+    figures = job['result'].get('figures', [])
+    st.success(f"✅ {len(figures)} visualization(s) generated for {Path(job['spec']['model_path']).name}")
+
+def show_report_result(job):
+    """Download and preview for a finished report job"""
+    model_path = job['spec']['model_path']
+    report_path = job['result']['report']
+    if first_completion(job['id']):
+        remember_evaluation(model_path, {'accuracy': job['result'].get('accuracy')}, mode=job['spec'].get('inference_mode'))
+        add_notification(f"Full PDF report generated for {Path(model_path).name}", "success")
+        st.balloons()
+    try:
+        with open(report_path, encoding='utf-8') as f:
+            report = f.read()
+    except OSError:
+        st.warning(f"Report file {report_path} is no longer available")
+        return
+    st.success("✅ **Report Generated Successfully!**")
+    st.download_button(
+        label="⬇️ Download Full Report",
+        data=report,
+        file_name=Path(report_path).name,
+        mime="text/plain",
+        key=f"download_report_{job['id']}"
+    )
+    with st.expander("📄 Preview Report", expanded=True):
+        st.code(report)
+    st.info("🎉 **Project Complete!** All export options have been processed successfully.")
+
+def show_complexity_result(job):
+    """FLOPs, size and latency table from a finished complexity job"""
+    rows = "| Model | FLOPs | Size (MB) | Parameters | Mean Latency (ms) |\n|-------|-------|-----------|------------|-------------------|\n"
+    for model_path, stats in job['result'].items():
+        rows += (f"| {Path(model_path).name} | {stats['flops']/1e6:.2f}M | {stats['size_mb']:.2f} | "
+                 f"{stats['params']:,} | {stats['inference_time'].get('mean', 0):.3f} |\n")
+    st.markdown(rows)
+
 def add_notification(message, notification_type="info"):
     """Add notification to queue"""
     notification = {
@@ -1226,7 +1719,8 @@ def add_notification(message, notification_type="info"):
         st.session_state.notifications = st.session_state.notifications[-50:]
 
 # Home Page - Modern Dashboard Design
-with tab1:
+def render_home():
+    """Home page: overview, quick stats and recent activity"""
     # Centered Main Title - Enhanced with gradient and professional styling
     st.markdown("""
     <div style="background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); 
@@ -1266,10 +1760,10 @@ with tab1:
     
     # Get model data
     model_files = get_model_files()
-    evaluated_models = [f for f in model_files if f in st.session_state.eval_cache] if model_files else []
+    evaluated_models = [f for f in model_files if cached_accuracy(f) is not None] if model_files else []
     pruned_models = [f for f in model_files if 'pruned' in Path(f).name.lower()] if model_files else []
     baseline_models = [f for f in model_files if 'baseline' in Path(f).name.lower()] if model_files else []
-    total_size = sum(os.path.getsize(f) for f in model_files) / (1024 * 1024) if model_files else 0
+    total_size = sum(checkpoint_disk_nbytes(f) for f in model_files) / (1024 * 1024) if model_files else 0
     
     # Performance Summary Cards - Large, Distinct Cards with Icons
     st.markdown("### 📊 Performance Summary")
@@ -1450,7 +1944,8 @@ with tab1:
     st.caption("🔬 Built with PyTorch & Streamlit | ⚡ Optimized for Performance | 🚀 Advanced Features Enabled")
 
 # Pruning Jobs Page - Combined Train Model + Advanced Pruning
-with tab2:
+def render_pruning_jobs():
+    """Pruning Jobs page: training and pruning"""
     # Dark background wrapper for Pruning Jobs page
     st.markdown("""
     <div style="background: linear-gradient(135deg, #2a2a3e 0%, #1e1e2e 100%); 
@@ -1461,11 +1956,12 @@ with tab2:
     
     st.header("✂️ Pruning Jobs")
     
-    # Sub-tabs for Training and Pruning
-    job_tab1, job_tab2 = st.tabs(["🎯 Train New Model", "✂️ Advanced Pruning"])
+    # Sub-sections for Training and Pruning (only the selected one runs)
+    job_section = st.radio("Section", ["🎯 Train New Model", "✂️ Advanced Pruning"], horizontal=True,
+                           key="jobs_section", label_visibility="collapsed")
     
     # Train Model Section - Step-by-Step Flow
-    with job_tab1:
+    if job_section == "🎯 Train New Model":
         # Stepper Component
         st.markdown("""
         <div class="stepper-container">
@@ -1513,22 +2009,23 @@ with tab2:
                 st.caption("Upload a pre-trained model to continue training, or leave empty to train from scratch.")
                 
                 uploaded_model = st.file_uploader(
-                    "Choose a model file (.pth)",
-                    type=['pth'],
+                    "Choose a model file (.pth / .safetensors)",
+                    type=['pth', 'safetensors'],
                     help="Upload your trained model file to use as a starting point",
                     key="step1_upload_model"
                 )
                 
                 if uploaded_model is not None:
                     try:
-                        os.makedirs("saved", exist_ok=True)
-                        file_path = os.path.join("saved", uploaded_model.name)
-                        with open(file_path, "wb") as f:
-                            f.write(uploaded_model.getbuffer())
-                        st.success(f"✅ {uploaded_model.name} uploaded successfully!")
+                        ingested = ingest_upload(uploaded_model, uploaded_model.name, "saved")
+                        file_path = ingested['path']
+                        get_file_watcher().refresh(file_path)
+                        if ingested['duplicate_of']:
+                            st.success(f"✅ Identical model already stored as {Path(file_path).name}")
+                        else:
+                            st.success(f"✅ {uploaded_model.name} uploaded successfully!")
                         st.session_state.training_config['model_path'] = file_path
                         st.session_state.training_config['use_existing'] = False
-                        st.cache_data.clear()
                     except Exception as e:
                         st.error(f"❌ Upload failed: {e}")
                 else:
@@ -1839,6 +2336,10 @@ with tab2:
             else:
                 st.info(f"⏱️ Estimated training time: ~{estimated_time:.1f} minute(s)")
             
+            config['timeout_minutes'] = st.number_input("Time limit (minutes, 0 = none)", min_value=0, max_value=24 * 60,
+                                                        value=int(config.get('timeout_minutes', 0)),
+                                                        help="Stop the job cleanly once it has run this long")
+            
             col1, col2 = st.columns([1, 1])
             with col1:
                 if st.button("← Back to Configuration", use_container_width=True):
@@ -1848,68 +2349,49 @@ with tab2:
                 # Create button with loading state
                 button_key = "start_pruning_job_btn"
                 if st.button("🚀 Start Pruning Job", type="primary", use_container_width=True, key=button_key):
-                    if st.session_state.training_in_progress:
+                    running_job = active_training_job()
+                    if running_job and training_job_running(running_job):
                         st.warning("⚠️ Training already in progress!")
                     else:
-                        st.session_state.training_in_progress = True
                         config = st.session_state.training_config
-                        
-                        # Show loading spinner immediately
-                        loading_placeholder = st.empty()
-                        loading_placeholder.markdown("""
-                        <div style="text-align: center; padding: 1rem;">
-                            <div class="loading-spinner"></div>
-                            <p style="color: #ffffff; margin-top: 0.5rem;">Starting job...</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
                         try:
                             # Build command
-                            cmd = [
-                                sys.executable, 'src/train.py',
+                            train_args = [
                                 '--epochs', str(config.get('epochs', 2)),
                                 '--batch-size', str(config.get('batch_size', 1024)),
                                 '--learning-rate', str(config.get('learning_rate', 0.001)),
                                 '--save-dir', config.get('save_dir', 'saved')
                             ]
                             if config.get('quick_mode', True):
-                                cmd.append('--quick-mode')
+                                train_args.append('--quick-mode')
                             
-                            # Small delay to show spinner
-                            import time
-                            time.sleep(1.5)
-                            
-                            # Start training (run in background, show simple status)
-                            loading_placeholder.empty()
-                            with st.spinner("🚀 Starting training job..."):
-                                result = subprocess.run(cmd, capture_output=True, text=True)
+                            # Detached: keeps running across reruns and reports progress through its events file
+                            timeout_minutes = config.get('timeout_minutes', 0)
+                            job = start_training_job(train_args, timeout_seconds=timeout_minutes * 60 if timeout_minutes else None)
+                            st.session_state.active_training_job = job['id']
                             
-                            if result.returncode == 0:
-                                st.success("✅ Training job started successfully!")
-                                st.info("💡 Check the '📁 Models' tab to view your trained model after completion.")
-                                
-                                # Reset to step 1 for next training
-                                st.session_state.training_step = 1
-                                st.session_state.training_config = {}
-                                
-                                # Clear cache
-                                st.cache_data.clear()
-                                st.session_state.model_cache.clear()
-                            else:
-                                st.error(f"❌ Training failed: {result.stderr[:500]}")
-                                with st.expander("View Full Error"):
-                                    st.code(result.stderr, language="text")
-                        
+                            # Reset to step 1 for next training
+                            st.session_state.training_step = 1
+                            st.session_state.training_config = {}
+                            st.rerun()
                         except Exception as e:
-                            st.error(f"❌ Error during training: {e}")
+                            st.error(f"❌ Error starting training: {e}")
                             import traceback
                             with st.expander("Error Details"):
                                 st.code(traceback.format_exc())
-                        finally:
-                            st.session_state.training_in_progress = False
+        
+        # Live progress of the running (or most recent) training job
+        tracked_job = active_training_job()
+        if tracked_job:
+            st.markdown("---")
+            st.markdown("### 📡 Training Progress")
+            render_training_job(tracked_job)
+            if not training_job_running(tracked_job) and st.button("Dismiss", key="dismiss_training_job"):
+                st.session_state.active_training_job = None
+                st.rerun()
     
     # Advanced Pruning Section
-    with job_tab2:
+    if job_section == "✂️ Advanced Pruning":
         st.header("✂️ Advanced Pruning Techniques")
         
         if not ADVANCED_FEATURES:
@@ -1959,12 +2441,18 @@ with tab2:
                 with col2:
                     layer_specific = st.checkbox("Layer-specific Pruning", value=False,
                                                 help="Apply different pruning ratios per layer")
+                    save_format = st.selectbox("Save Format", list(CHECKPOINT_FORMATS),
+                                               index=list(CHECKPOINT_FORMATS).index('pth'),
+                                               help="manifest: deduplicated model store (tensors shared with the parent); "
+                                                    "delta: packed pruning masks referencing the parent; "
+                                                    "safetensors: memory-mapped, without pickle",
+                                               key="prune_save_format")
                 
                 # Layer-specific options
                 if layer_specific:
                     st.subheader("📊 Layer-wise Pruning Ratios")
                     layer_ratios = {}
-                    for k in info['state_dict'].keys():
+                    for k in info['layers'].keys():
                         if 'weight' in k:
                             layer_ratios[k] = st.slider(
                                 f"{k}", 0.0, 0.95, prune_frac, 0.05,
@@ -1979,121 +2467,23 @@ with tab2:
                 
                 if st.button("✂️ Apply Advanced Pruning", type="primary", use_container_width=True):
                     try:
-                        progress = st.progress(0)
-                        status = st.empty()
-                        
-                        status.text("🔧 Loading model...")
-                        progress.progress(20)
-                        
+                        # Runs in the worker pool: survives reruns and never blocks other sessions.
+                        # Never retried: a second attempt would save the same prune as a new version
                         device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-                        model = SimpleCNN().to(device)
-                        state = torch.load(selected_model, map_location=device)
-                        state = fix_state_dict(state)  # Fix _orig_mod prefix if present
-                        model.load_state_dict(state, strict=False)
-                        
-                        status.text(f"🔪 Applying {prune_method} pruning...")
-                        progress.progress(40)
-                        
-                        # Apply selected pruning method
-                        if ADVANCED_FEATURES:
-                            if "Magnitude" in prune_method:
-                                pruned_state = magnitude_prune(state, prune_frac)
-                            elif "L1" in prune_method:
-                                pruned_state = l1_prune(state, prune_frac)
-                            elif "Structured" in prune_method:
-                                pruned_state = structured_channel_prune(state, prune_frac, model)
-                            elif "Gradient" in prune_method:
-                                # Need dataloader for gradient-based
-                                transform = transforms.Compose([
-                                    transforms.ToTensor(),
-                                    transforms.Normalize((0.5, 0.5, 0.5), (0.5, 0.5, 0.5))
-                                ])
-                                testset = datasets.CIFAR10(root='./data', train=False, download=True, transform=transform)
-                                num_workers = 0 if platform.system() == 'Windows' else 2
-                                dataloader = DataLoader(testset, batch_size=32, shuffle=False, num_workers=num_workers)
-                                pruned_state = gradient_based_prune(state, model, dataloader, prune_frac, device)
-                            else:  # Random
-                                pruned_state = random_prune(state, prune_frac)
-                        else:
-                            # Fallback to standard pruning
-                            from src.prune import magnitude_prune_state_dict
-                            pruned_state = magnitude_prune_state_dict(state, prune_frac)
-                        
-                        progress.progress(60)
-                        status.text("💾 Saving pruned model...")
-                        
-                        os.makedirs("saved", exist_ok=True)
-                        method_name = prune_method.split()[0].lower()
-                        
-                        # Assign version number
-                        base_name = Path(selected_model).stem.split('_v')[0] if '_v' in Path(selected_model).stem else Path(selected_model).stem
-                        version = assign_next_version(base_name, is_major=False)
-                        pruned_path = f"saved/pruned_{method_name}_{int(prune_frac*100)}_v{version.replace('v', '')}.pth"
-                        torch.save(pruned_state, pruned_path)
-                        
-                        progress.progress(80)
-                        status.text("📊 Evaluating pruned model...")
-                        
-                        # Evaluate
-                        model.load_state_dict(pruned_state)
-                        accuracy = evaluate_model(pruned_path, use_cache=False)
-                        
-                        progress.progress(100)
-                        status.text("✅ Pruning completed!")
-                        
-                        # Show results
-                        st.success("✅ Advanced Pruning Completed!")
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        pruned_info = get_model_info(pruned_path)
-                        if pruned_info:
-                            with col1:
-                                st.metric("Remaining Parameters", f"{pruned_info['total_params']:,}")
-                            with col2:
-                                st.metric("New Sparsity", f"{pruned_info['sparsity']:.2%}")
-                            with col3:
-                                st.metric("File Size", f"{pruned_info['file_size_mb']:.2f} MB")
-                            with col4:
-                                if accuracy:
-                                    st.metric("Test Accuracy", f"{accuracy:.2f}%")
-                        
-                        # Show comparison if original was evaluated
-                        if selected_model in st.session_state.eval_cache:
-                            orig_acc = st.session_state.eval_cache[selected_model]
-                            if accuracy:
-                                diff = accuracy - orig_acc
-                                st.info(f"📈 Accuracy change: {diff:+.2f}% (Original: {orig_acc:.2f}% → Pruned: {accuracy:.2f}%)")
-                        
-                        # Calculate size reduction
-                        size_reduction = calculate_size_reduction(pruned_path, selected_model)
-                        size_reduction_str = f"{size_reduction:.1f}%" if size_reduction else "N/A"
-                        
-                        # Send notification
-                        model_name_display = Path(pruned_path).name
-                        notification_msg = f"Your pruning job for {model_name_display} is complete! Size reduced by {size_reduction_str}."
-                        add_notification(notification_msg, "success")
-                        
-                        # Generate comparison visualization
-                        if ADVANCED_FEATURES:
-                            with st.spinner("📊 Generating comparison visualizations..."):
-                                os.makedirs("assets", exist_ok=True)
-                                plot_pruning_comparison(state, pruned_state, out_dir='assets', 
-                                                       prefix=f'prune_{method_name}_{int(prune_frac*100)}')
-                                st.success("📈 Comparison visualizations generated in assets/")
-                        
-                        # Show notification banner
-                        st.success(f"✅ **Job Complete!** {notification_msg}")
-                        
-                        st.balloons()
-                        st.cache_data.clear()
-                        st.info("🔄 Please refresh the page to see the new visualizations.")
-                        # Don't auto-rerun to prevent freezing
-                        
+                        submit_background_job('prune', 'prune', {
+                            'model_path': selected_model,
+                            'method': method_key(prune_method) if ADVANCED_FEATURES else 'magnitude',
+                            'amount': float(prune_frac),
+                            'save_format': save_format,
+                            'inference_mode': get_inference_mode(device),
+                            'comparison_plot': ADVANCED_FEATURES
+                        }, priority=1, max_retries=0)
                     except Exception as e:
-                        st.error(f"❌ Error during pruning: {e}")
-                        import traceback
-                        with st.expander("Error Details"):
-                            st.code(traceback.format_exc())
+                        st.error(f"❌ Error queuing pruning job: {e}")
+                
+                prune_job = st.session_state.queued_jobs.get('prune')
+                if prune_job:
+                    render_queued_job(prune_job, on_done=show_prune_result)
             else:
                 st.error("❌ Could not load model info. Please select a valid model.")
         else:
@@ -2103,14 +2493,16 @@ with tab2:
     st.markdown("</div>", unsafe_allow_html=True)
 
 # Analytics & Visualization Page - Combined Visualize + Analysis + Analytics
-with tab4:
+def render_analytics():
+    """Analytics & Visualization page"""
     st.header("📊 Analytics & Visualization")
     
-    # Sub-tabs for different analysis types
-    analytics_tab1, analytics_tab2, analytics_tab3 = st.tabs(["📊 Visualization", "🔬 Model Analysis", "📉 Training Analytics"])
+    # Sub-sections for different analysis types (only the selected one runs)
+    analytics_section = st.radio("Section", ["📊 Visualization", "🔬 Model Analysis", "📉 Training Analytics"],
+                                 horizontal=True, key="analytics_section", label_visibility="collapsed")
     
     # Visualization Section
-    with analytics_tab1:
+    if analytics_section == "📊 Visualization":
         st.subheader("📊 Model Visualization")
         
         model_files = get_model_files()
@@ -2166,10 +2558,19 @@ with tab4:
                 
                 with col2:
                     if st.button("📊 Quick Evaluate", use_container_width=True):
-                        with st.spinner("Evaluating model..."):
-                            accuracy = evaluate_model(selected_model)
-                            if accuracy:
-                                st.success(f"✅ Test Accuracy: {accuracy:.2f}%")
+                        if cached_accuracy(selected_model) is not None:
+                            st.session_state.queued_jobs.pop('evaluate', None)
+                        else:
+                            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+                            submit_background_job('evaluate', 'evaluate', {
+                                'model_path': selected_model, 'inference_mode': get_inference_mode(device)
+                            }, priority=2)
+                    evaluate_job = st.session_state.queued_jobs.get('evaluate')
+                    if evaluate_job:
+                        render_queued_job(evaluate_job, on_done=show_evaluate_result)
+                    elif cached_accuracy(selected_model) is not None:
+                        st.success(f"✅ Test Accuracy: {cached_accuracy(selected_model):.2f}%")
+                        st.caption(eval_mode_caption(selected_model))
             
             elif viz_type == "🔥 Advanced Analysis":
                 st.subheader("🔥 Advanced Visualization Options")
@@ -2182,42 +2583,21 @@ with tab4:
                 with col1:
                     if st.button("📊 Weight Distributions", use_container_width=True):
                         if ADVANCED_FEATURES:
-                            try:
-                                with st.spinner("Generating weight distributions..."):
-                                    os.makedirs("assets", exist_ok=True)
-                                    plot_weight_distributions(info['state_dict'], out_dir='assets', 
-                                                             prefix=f"{Path(selected_model).stem}_dist")
-                                    st.success("✅ Weight distributions generated!")
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            submit_background_job('visualize', 'visualize', {'model_path': selected_model, 'plots': ['distributions']})
                         else:
                             st.info("Advanced features not available")
                 
                 with col2:
                     if st.button("🔥 Filter Heatmaps", use_container_width=True):
                         if ADVANCED_FEATURES:
-                            try:
-                                with st.spinner("Generating filter heatmaps..."):
-                                    os.makedirs("assets", exist_ok=True)
-                                    plot_weight_heatmap(info['state_dict'], out_dir='assets',
-                                                       prefix=f"{Path(selected_model).stem}_heatmap")
-                                    st.success("✅ Filter heatmaps generated!")
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            submit_background_job('visualize', 'visualize', {'model_path': selected_model, 'plots': ['heatmap']})
                         else:
                             st.info("Advanced features not available")
                 
                 with col3:
                     if st.button("📉 Sparsity Analysis", use_container_width=True):
                         if ADVANCED_FEATURES:
-                            try:
-                                with st.spinner("Analyzing sparsity..."):
-                                    os.makedirs("assets", exist_ok=True)
-                                    plot_sparsity_analysis(info['state_dict'], out_dir='assets',
-                                                         prefix=f"{Path(selected_model).stem}_sparsity")
-                                    st.success("✅ Sparsity analysis generated!")
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            submit_background_job('visualize', 'visualize', {'model_path': selected_model, 'plots': ['sparsity']})
                         else:
                             st.info("Advanced features not available")
                 
@@ -2225,14 +2605,7 @@ with tab4:
                 with col1:
                     if st.button("📈 Layer Statistics", use_container_width=True):
                         if ADVANCED_FEATURES:
-                            try:
-                                with st.spinner("Generating layer statistics..."):
-                                    os.makedirs("assets", exist_ok=True)
-                                    plot_layer_statistics(info['state_dict'], out_dir='assets',
-                                                         prefix=f"{Path(selected_model).stem}_stats")
-                                    st.success("✅ Layer statistics generated!")
-                            except Exception as e:
-                                st.error(f"Error: {e}")
+                            submit_background_job('visualize', 'visualize', {'model_path': selected_model, 'plots': ['stats']})
                         else:
                             st.info("Advanced features not available")
                 
@@ -2241,57 +2614,37 @@ with tab4:
                         if ADVANCED_FEATURES:
                             try:
                                 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-                                model = SimpleCNN().to(device)
-                                model.load_state_dict(info['state_dict'])
+                                model = build_model(load_model_state(selected_model), device)
                                 
-                                transform = transforms.Compose([
-                                    transforms.ToTensor(),
-                                    transforms.Normalize((0.5, 0.5, 0.5), (0.5, 0.5, 0.5))
-                                ])
-                                testset = datasets.CIFAR10(root='./data', train=False, download=True, transform=transform)
+                                from torchvision import datasets
+                                testset = datasets.CIFAR10(root='./data', train=False, download=True,
+                                                           transform=get_test_transform())
                                 num_workers = 0 if platform.system() == 'Windows' else 2
                                 dataloader = DataLoader(testset, batch_size=4, shuffle=False, num_workers=num_workers)
                                 
-                                with st.spinner("Generating activation maps..."):
+                                def render_activations(report):
                                     os.makedirs("assets", exist_ok=True)
-                                    visualize_activations(model, dataloader, device, out_dir='assets',
-                                                         prefix=f"{Path(selected_model).stem}_activations")
+                                    advanced_visualize.visualize_activations(model, dataloader, device, out_dir='assets',
+                                                                             prefix=f"{Path(selected_model).stem}_activations")
+                                
+                                with st.spinner("Generating activation maps..."):
+                                    coalesced(('activations', file_fingerprint(selected_model)), "Activation maps",
+                                              render_activations)
                                     st.success("✅ Activation maps generated!")
                             except Exception as e:
                                 st.error(f"Error: {e}")
                         else:
                             st.info("Advanced features not available")
+                
+                visualize_job = st.session_state.queued_jobs.get('visualize')
+                if visualize_job:
+                    render_queued_job(visualize_job, on_done=show_visualize_result)
             
             elif viz_type == "📈 Comprehensive Report":
                 if st.button("📄 Generate All Visualizations", type="primary", use_container_width=True):
                     try:
-                        progress = st.progress(0)
-                        status = st.empty()
-                        
-                        os.makedirs("assets", exist_ok=True)
-                        
                         if ADVANCED_FEATURES:
-                            status.text("Generating comprehensive visualizations...")
-                            progress.progress(20)
-                            
-                            plot_weight_distributions(info['state_dict'], out_dir='assets', 
-                                                    prefix=f"{Path(selected_model).stem}_dist")
-                            progress.progress(40)
-                            
-                            plot_weight_heatmap(info['state_dict'], out_dir='assets',
-                                              prefix=f"{Path(selected_model).stem}_heatmap")
-                            progress.progress(60)
-                            
-                            plot_sparsity_analysis(info['state_dict'], out_dir='assets',
-                                                 prefix=f"{Path(selected_model).stem}_sparsity")
-                            progress.progress(80)
-                            
-                            plot_layer_statistics(info['state_dict'], out_dir='assets',
-                                                prefix=f"{Path(selected_model).stem}_stats")
-                            progress.progress(100)
-                            
-                            st.success("✅ All advanced visualizations generated!")
-                            st.balloons()
+                            submit_background_job('visualize_all', 'visualize', {'model_path': selected_model})
                         else:
                             # Basic visualization
                             cmd = [
@@ -2308,23 +2661,26 @@ with tab4:
                                 
                     except Exception as e:
                         st.error(f"Error: {e}")
+                
+                visualize_all_job = st.session_state.queued_jobs.get('visualize_all')
+                if visualize_all_job:
+                    render_queued_job(visualize_all_job, on_done=show_visualize_result)
             
-            # Display visualizations
-            assets_dir = Path("assets")
-            if assets_dir.exists():
-                image_files = sorted(list(assets_dir.glob("*.png")), key=os.path.getmtime, reverse=True)
-                if image_files:
-                    st.subheader("📈 Generated Visualizations")
-                    num_cols = st.slider("Columns", 2, 4, 2)
-                    cols = st.columns(num_cols)
-                    for idx, img_file in enumerate(image_files[:16]):  # Show first 16 images
-                        with cols[idx % num_cols]:
-                            st.image(str(img_file), caption=img_file.name, use_container_width=True)
+            # Display visualizations (rescan picks up figures generated during this run)
+            get_file_watcher().rescan('assets')
+            image_files = [Path(f) for f in get_file_watcher().files('assets')]
+            if image_files:
+                st.subheader("📈 Generated Visualizations")
+                num_cols = st.slider("Columns", 2, 4, 2)
+                cols = st.columns(num_cols)
+                for idx, img_file in enumerate(image_files[:16]):  # Show first 16 images
+                    with cols[idx % num_cols]:
+                        st.image(str(img_file), caption=img_file.name, use_container_width=True)
         else:
             st.warning("⚠️ No models found. Please train a model first or upload one.")
     
     # Model Analysis Section
-    with analytics_tab2:
+    if analytics_section == "🔬 Model Analysis":
         st.header("🔬 Model Analysis")
         
         if not ADVANCED_FEATURES:
@@ -2344,15 +2700,13 @@ with tab4:
             if st.button("🔬 Run Analysis", type="primary", use_container_width=True):
                 try:
                     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-                    model = SimpleCNN().to(device)
-                    state = torch.load(selected_model, map_location=device)
-                    state = fix_state_dict(state)  # Fix _orig_mod prefix if present
-                    model.load_state_dict(state, strict=False)
+                    # The layer deep dive streams single tensors and never needs a full model
+                    model = None if analysis_type == "🔍 Layer-wise Deep Dive" else build_model(load_model_state(selected_model), device)
                     
                     if analysis_type == "📊 Architecture Analysis":
                         st.subheader("📊 Model Architecture")
                         if ADVANCED_FEATURES:
-                            arch = analyze_model_architecture(model)
+                            arch = model_analyzer.analyze_model_architecture(model)
                             
                             st.metric("Total Parameters", f"{arch['total_params']:,}")
                             st.metric("Trainable Parameters", f"{arch['trainable_params']:,}")
@@ -2375,7 +2729,7 @@ with tab4:
                             try:
                                 with st.spinner("Calculating FLOPs..."):
                                     try:
-                                        flops = calculate_flops(model)
+                                        flops = model_analyzer.calculate_flops(model)
                                         st.metric("FLOPs", f"{flops/1e6:.2f}M")
                                         st.success("✅ FLOPs calculated successfully")
                                     except Exception as e:
@@ -2384,15 +2738,42 @@ with tab4:
                                 
                                 with st.spinner("Measuring inference time..."):
                                     try:
-                                        inference_stats = measure_inference_time(model, device=device.type)
+                                        # Exclusive: nothing else runs while the latency is measured
+                                        artifact_path = artifact_path_for(selected_model)
+                                        ts_stats = None
+                                        with governed("Latency benchmark", exclusive=True):
+                                            inference_stats = model_analyzer.measure_inference_time(model, device=device.type,
+                                                                                                    mode=get_inference_mode(device))
+                                            if os.path.exists(artifact_path):
+                                                ts_mode = get_inference_mode(device)
+                                                ts_stats = model_analyzer.measure_inference_time(
+                                                    load_torchscript(artifact_path, device), device=device.type,
+                                                    mode='cpu' if ts_mode == 'cpu_bf16' else ts_mode
+                                                )
                                         if inference_stats and isinstance(inference_stats, dict):
-                                            col1, col2, col3 = st.columns(3)
+                                            col1, col2, col3, col4 = st.columns(4)
                                             with col1:
                                                 st.metric("Mean Inference", f"{inference_stats.get('mean', 0):.2f} ms")
                                             with col2:
                                                 st.metric("Min Inference", f"{inference_stats.get('min', 0):.2f} ms")
                                             with col3:
                                                 st.metric("Max Inference", f"{inference_stats.get('max', 0):.2f} ms")
+                                            with col4:
+                                                st.metric("Throughput", f"{inference_stats.get('throughput', 0):.0f} /s")
+                                            st.caption(f"Inference mode: {inference_stats.get('inference_mode', 'eager')} | "
+                                                       f"Threads: {inference_stats.get('num_threads', '?')}")
+                                            
+                                            # Fused TorchScript latency for the same checkpoint
+                                            if ts_stats is not None:
+                                                ts_col1, ts_col2 = st.columns(2)
+                                                with ts_col1:
+                                                    st.metric("TorchScript Mean Inference", f"{ts_stats.get('mean', 0):.2f} ms",
+                                                             f"{ts_stats.get('mean', 0) - inference_stats.get('mean', 0):+.2f} ms",
+                                                             delta_color="inverse")
+                                                with ts_col2:
+                                                    st.metric("TorchScript Throughput", f"{ts_stats.get('throughput', 0):.0f} /s")
+                                            else:
+                                                st.caption("💡 Export a TorchScript artifact from the Reports tab to benchmark fused execution.")
                                             st.success("✅ Inference time measured successfully")
                                         else:
                                             st.warning("⚠️ Could not measure inference time")
@@ -2403,7 +2784,7 @@ with tab4:
                                             st.code(traceback.format_exc())
                                 
                                 try:
-                                    model_size = get_model_size_mb(model)
+                                    model_size = model_analyzer.get_model_size_mb(model)
                                     st.metric("Model Size in Memory", f"{model_size:.2f} MB")
                                 except Exception as e:
                                     st.warning(f"⚠️ Could not calculate model size: {e}")
@@ -2420,7 +2801,7 @@ with tab4:
                     elif analysis_type == "💾 Memory Analysis":
                         st.subheader("💾 Memory Analysis")
                         if ADVANCED_FEATURES:
-                            model_size = get_model_size_mb(model)
+                            model_size = model_analyzer.get_model_size_mb(model)
                             info = get_model_info(selected_model)
                             
                             col1, col2, col3 = st.columns(3)
@@ -2440,27 +2821,30 @@ with tab4:
                         st.subheader("🔍 Layer-wise Analysis")
                         info = get_model_info(selected_model)
                         if info:
-                            state_dict = info['state_dict']
-                            
+                            # Layer names come from the index; only the selected tensor is paged in
                             selected_layer = st.selectbox("Select Layer", 
-                                                         [k for k in state_dict.keys() if 'weight' in k],
+                                                         [k for k in info['layers'].keys() if 'weight' in k],
                                                          key="layer_select")
                             
                             if selected_layer:
-                                weights = state_dict[selected_layer].cpu().numpy()
+                                layer_stats = get_precompute_scheduler().histogram(selected_model, selected_layer)
+                                if layer_stats is None:
+                                    with open_checkpoint(selected_model) as checkpoint:
+                                        layer_stats = checkpoint.tensor_stats(selected_layer, bins=100)
                                 
                                 col1, col2 = st.columns(2)
                                 with col1:
                                     st.write("**Statistics:**")
-                                    st.write(f"- Mean: {weights.mean():.6f}")
-                                    st.write(f"- Std: {weights.std():.6f}")
-                                    st.write(f"- Min: {weights.min():.6f}")
-                                    st.write(f"- Max: {weights.max():.6f}")
-                                    st.write(f"- Sparsity: {(weights == 0).sum() / weights.size * 100:.2f}%")
+                                    st.write(f"- Mean: {layer_stats['mean']:.6f}")
+                                    st.write(f"- Std: {layer_stats['std']:.6f}")
+                                    st.write(f"- Min: {layer_stats['min']:.6f}")
+                                    st.write(f"- Max: {layer_stats['max']:.6f}")
+                                    st.write(f"- Sparsity: {layer_stats['sparsity'] * 100:.2f}%")
                                 
                                 with col2:
                                     fig, ax = plt.subplots(figsize=(8, 5))
-                                    ax.hist(weights.flatten(), bins=100, alpha=0.7, edgecolor='black')
+                                    ax.stairs(layer_stats['hist_counts'], layer_stats['hist_edges'],
+                                              fill=True, alpha=0.7, edgecolor='black')
                                     ax.set_title(f'Weight Distribution: {selected_layer}')
                                     ax.set_xlabel('Weight Value')
                                     ax.set_ylabel('Frequency')
@@ -2476,7 +2860,7 @@ with tab4:
             st.warning("⚠️ No models found. Please train a model first.")
     
     # Training Analytics Section
-    with analytics_tab3:
+    if analytics_section == "📉 Training Analytics":
         st.header("📉 Training Analytics & History")
         
         st.info("📊 Track and visualize training progress, loss curves, and model performance over time.")
@@ -2542,7 +2926,7 @@ with tab4:
                     st.plotly_chart(fig_throughput, use_container_width=True)
                     
                     # Combined Performance Chart
-                    fig_combined = make_subplots(
+                    fig_combined = plotly_subplots.make_subplots(
                         rows=1, cols=2,
                         subplot_titles=('Latency (ms)', 'Throughput (samples/sec)'),
                         specs=[[{"secondary_y": False}, {"secondary_y": False}]]
@@ -2612,10 +2996,10 @@ with tab4:
         with col1:
             st.metric("Total Models", len(model_files) if model_files else 0)
         with col2:
-            total_size = sum(os.path.getsize(f) for f in model_files) / (1024 * 1024) if model_files else 0
+            total_size = sum(checkpoint_disk_nbytes(f) for f in model_files) / (1024 * 1024) if model_files else 0
             st.metric("Total Size", f"{total_size:.2f} MB")
         with col3:
-            evaluated = len([f for f in model_files if f in st.session_state.eval_cache]) if model_files else 0
+            evaluated = len([f for f in model_files if cached_accuracy(f) is not None]) if model_files else 0
             st.metric("Evaluated", evaluated)
         with col4:
             if model_files:
@@ -2623,7 +3007,8 @@ with tab4:
                 st.metric("Latest Model", Path(latest).stem[:15])
 
 # Compare Models Page - Enhanced
-with tab5:
+def render_compare():
+    """Compare Models page"""
     st.header("📈 Compare Models")
     
     model_files = get_model_files()
@@ -2668,8 +3053,8 @@ with tab5:
                 
                 # Evaluate both models with progress
                 with st.spinner("📊 Evaluating models..."):
-                    acc1 = evaluate_model(model1)
-                    acc2 = evaluate_model(model2)
+                    acc1 = evaluate_model(model1, save_logits_cache=True)
+                    acc2 = evaluate_model(model2, save_logits_cache=True)
                 
                 if acc1 and acc2:
                     col1, col2, col3 = st.columns(3)
@@ -2683,6 +3068,7 @@ with tab5:
                     with col3:
                         better = "Model 1" if acc1 > acc2 else "Model 2" if acc2 > acc1 else "Equal"
                         st.metric("Better Model", better)
+                    st.caption(f"Model 1: {eval_mode_caption(model1)} | Model 2: {eval_mode_caption(model2)}")
                     
                     # Enhanced accuracy comparison chart
                     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
@@ -2710,11 +3096,49 @@ with tab5:
                     
                     plt.tight_layout()
                     st.pyplot(fig)
+                    
+                    # Prediction-level comparison straight from cached logits
+                    logit_stats = compare_cached_logits(model2, model1)
+                    if logit_stats:
+                        st.subheader("🎯 Prediction Agreement (Model 2 vs Model 1)")
+                        agree_col1, agree_col2, agree_col3, agree_col4 = st.columns(4)
+                        with agree_col1:
+                            st.metric("Agreement", f"{logit_stats['agreement']:.2f}%")
+                        with agree_col2:
+                            st.metric("Fidelity", f"{logit_stats['fidelity']:.2f}%",
+                                     help="Share of Model 1's correct predictions that Model 2 keeps")
+                        with agree_col3:
+                            st.metric("KL Divergence", f"{logit_stats['kl_divergence']:.4f}")
+                        with agree_col4:
+                            logits1, labels = get_cached_logits(model1)
+                            logits2, _ = get_cached_logits(model2)
+                            st.metric("Ensemble Accuracy", f"{ensemble_accuracy([logits1, logits2], labels):.2f}%")
+                        
+                        flip_col1, flip_col2 = st.columns(2)
+                        with flip_col1:
+                            st.write(f"**Correct → Wrong:** {len(logit_stats['correct_to_wrong'])} samples")
+                            if logit_stats['correct_to_wrong']:
+                                st.caption(f"First indices: {logit_stats['correct_to_wrong'][:20]}")
+                        with flip_col2:
+                            st.write(f"**Wrong → Correct:** {len(logit_stats['wrong_to_correct'])} samples")
+                            if logit_stats['wrong_to_correct']:
+                                st.caption(f"First indices: {logit_stats['wrong_to_correct'][:20]}")
+        
+        # FLOPs and latency benchmarks run in the worker pool
+        if ADVANCED_FEATURES and st.button("⚖️ Compare Complexity (FLOPs, size, latency)", use_container_width=True):
+            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            submit_background_job('complexity', 'complexity', {
+                'model_path': model1, 'other_path': model2, 'inference_mode': get_inference_mode(device)
+            })
+        complexity_job = st.session_state.queued_jobs.get('complexity')
+        if complexity_job:
+            render_queued_job(complexity_job, on_done=show_complexity_result)
     else:
         st.warning("⚠️ Need at least 2 models to compare. Please train or upload more models.")
 
 # Models Page - Renamed from Model Manager
-with tab3:
+def render_models():
+    """Models page: every saved checkpoint with its actions"""
     st.header("📁 Models")
     
     # Upload Section at the top
@@ -2728,15 +3152,19 @@ with tab3:
         key="upload_type_radio"
     )
     
+    store_upload = False
     upload_help_col1, upload_help_col2 = st.columns([4, 1])
     with upload_help_col1:
         if upload_type == "🤖 Model File (.pth)":
             uploaded_file = st.file_uploader(
-                "Choose a model file (.pth) to upload",
-                type=['pth'],
-                help="Upload your trained PyTorch model file (.pth format). The file will be saved to 'saved/' directory.",
+                "Choose a model file (.pth / .safetensors) to upload",
+                type=['pth', 'safetensors'],
+                help="Upload your trained PyTorch model file (.pth or .safetensors format). The file will be saved to 'saved/' directory.",
                 key="manager_upload_model"
             )
+            store_upload = st.checkbox("🗃️ Deduplicate into model store", value=True,
+                                       help="Store tensors as shared, content-addressed blobs (identical tensors are kept once)",
+                                       key="manager_upload_store")
         elif upload_type == "📄 PDF Document":
             uploaded_file = st.file_uploader(
                 "Choose a PDF file to upload",
@@ -2766,6 +3194,7 @@ with tab3:
                 
                 **✅ Supported Format:**
                 - PyTorch model files (.pth)
+                - Flat tensor files (.safetensors), inspected without unpickling
                 - Must be compatible with SimpleCNN architecture
                 
                 **💡 Tip:** You can upload models trained elsewhere!
@@ -2802,22 +3231,26 @@ with tab3:
         try:
             file_ext = Path(uploaded_file.name).suffix.lower()
             
-            if upload_type == "🤖 Model File (.pth)" or file_ext == '.pth':
+            if upload_type == "🤖 Model File (.pth)" or file_ext in MODEL_FILE_SUFFIXES:
                 # Handle model file upload
                 with st.spinner("Uploading model..."):
-                    os.makedirs("saved", exist_ok=True)
-                    file_path = os.path.join("saved", uploaded_file.name)
-                    
                     # Check if file exists
-                    file_exists = os.path.exists(file_path)
-                    if file_exists:
-                        st.warning(f"⚠️ {uploaded_file.name} already exists. It will be overwritten.")
+                    file_path = os.path.join("saved", Path(uploaded_file.name).name)
+                    if store_upload:
+                        file_path = checkpoint_path(file_path, 'manifest')
+                    if os.path.exists(file_path):
+                        st.warning(f"⚠️ {Path(file_path).name} already exists. It will be overwritten.")
                     
-                    # Save file
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                    # Stream to disk, validate without unpickling objects, dedupe and move into place
+                    ingested = ingest_upload(uploaded_file, uploaded_file.name, "saved", store=store_upload)
+                    file_path = ingested['path']
+                    get_file_watcher().refresh(file_path)
+                    if ingested['duplicate_of']:
+                        st.info(f"♻️ Identical content already stored as `{Path(file_path).name}`; nothing was written.")
+                    elif ingested['normalized']:
+                        st.info("🔧 Removed the torch.compile `_orig_mod.` prefix from parameter names.")
                     
-                    file_size = os.path.getsize(file_path) / (1024 * 1024)
+                    file_size = checkpoint_disk_nbytes(file_path) / (1024 * 1024)
                     st.success(f"✅ Model uploaded successfully! ({file_size:.2f} MB)")
                     
                     # Show model info
@@ -2843,9 +3276,6 @@ with tab3:
                                 if accuracy:
                                     st.success(f"✅ Test Accuracy: {accuracy:.2f}%")
                     
-                    # Clear cache and refresh
-                    st.cache_data.clear()
-                    st.session_state.model_cache.clear()
                     st.balloons()
                     # Don't auto-rerun to prevent freezing
                     st.info("🔄 Please refresh the page to see the new model in the list.")
@@ -2928,8 +3358,14 @@ with tab3:
     
     st.markdown("---")
     st.subheader("📁 All Saved Models")
+    if st.button("🗃️ Model Store Usage", key="store_usage_btn"):
+        usage = store_stats("saved")
+        st.caption(f"{usage['manifests']} stored models | {usage['blobs']} unique tensors | "
+                   f"{usage['logical_mb']:.1f} MB logical → {usage['unique_mb']:.1f} MB on disk "
+                   f"({usage['dedup_ratio']:.1f}x deduplication)")
     
     model_files = get_model_files()
+    ensure_lineage(model_files)
     
     if model_files:
         st.subheader(f"📊 Saved Models ({len(model_files)} total)")
@@ -2952,17 +3388,11 @@ with tab3:
                 status = "Ready"
                 status_class = "status-tag-ready"
             
-            # Get version and size reduction
+            # Get version and size reduction (relative to the lineage root)
             version = get_model_version(model_file)
-            
-            # Find original model for size reduction calculation
-            base_name = model_name.split('_v')[0] if '_v' in model_name else model_name.split('_pruned')[0] if '_pruned' in model_name else model_name
-            original_model = None
-            for f in model_files:
-                fname = Path(f).stem
-                if base_name in fname and 'baseline' in fname.lower():
-                    original_model = f
-                    break
+            original_model = get_lineage_root(model_file)
+            if original_model == model_file:
+                original_model = None
             
             size_reduction = calculate_size_reduction(model_file, original_model)
             
@@ -2995,12 +3425,9 @@ with tab3:
                     # Rollback button
                     rollback_key = f"rollback_{Path(model_file).name}"
                     if st.button("↩️", key=rollback_key, help="Rollback to previous version", use_container_width=True):
-                        # Find previous version
-                        model_files_sorted = sorted([f for f in model_files if base_name in Path(f).name], 
-                                                    key=lambda x: os.path.getmtime(x), reverse=True)
-                        current_idx = next((i for i, f in enumerate(model_files_sorted) if f == model_file), -1)
-                        if current_idx > 0:
-                            prev_model = model_files_sorted[current_idx - 1]
+                        # Previous version is the parent this model was derived from
+                        prev_model = rollback_target(model_file)
+                        if prev_model:
                             st.info(f"🔄 Rolling back to: {Path(prev_model).name}")
                             st.session_state.current_model = prev_model
                             st.success(f"✅ Switched to previous version: {Path(prev_model).name}")
@@ -3085,16 +3512,17 @@ with tab3:
                             with confirm_col2:
                                 if st.button("🗑️ Delete Permanently", key=confirm_key, type="primary", use_container_width=True):
                                     try:
-                                        os.remove(model_file)
+                                        dependents = find_dependents(model_file)
+                                        if dependents:
+                                            raise ValueError("delta checkpoints are derived from this model: "
+                                                             + ", ".join(Path(d).name for d in dependents))
+                                        forget_model(model_file)
+                                        delete_checkpoint_file(model_file)  # Manifests release their blobs
+                                        remove_checkpoint(model_file)
                                         st.success(f"✅ Deleted {Path(model_file).name}")
                                         
-                                        # Clear caches
-                                        st.cache_data.clear()
-                                        st.session_state.model_cache.clear()
-                                        if model_file in st.session_state.eval_cache:
-                                            del st.session_state.eval_cache[model_file]
+                                        get_file_watcher().refresh(model_file)
                                         st.session_state[f"{delete_key}_confirming"] = False
-                                        st.cache_data.clear()
                                         st.info("🔄 Please refresh the page to see the updated list.")
                                         # Don't auto-rerun to prevent freezing
                                     except Exception as e:
@@ -3109,6 +3537,7 @@ with tab3:
                                 accuracy = evaluate_model(str(model_file))
                                 if accuracy is not None:
                                     st.success(f"✅ Test Accuracy: {accuracy:.2f}%")
+                                    st.caption(eval_mode_caption(str(model_file)))
                                 else:
                                     st.error("❌ Failed to evaluate model")
                     with action_col2:
@@ -3122,7 +3551,8 @@ with tab3:
         st.info("📭 No models saved yet.")
 
 # Reports Page - Renamed from Export/Report
-with tab6:
+def render_reports():
+    """Reports page"""
     st.header("📄 Reports")
     
     model_files = get_model_files()
@@ -3132,18 +3562,20 @@ with tab6:
         
         st.subheader("📤 Export Options")
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            if st.button("💾 Export Model", use_container_width=True):
+            bundle_models = st.multiselect("Models to bundle", model_files, default=[selected_model],
+                                           format_func=lambda p: Path(p).name, key="bundle_models")
+            bundle_archive = st.selectbox("Archive", list(ARCHIVE_FORMATS), key="bundle_archive")
+            bundle_format = st.selectbox("Checkpoint format", list(BUNDLE_CHECKPOINT_FORMATS), key="bundle_format",
+                                         help="sparse: packed masks + non-zero values for pruned layers")
+            if st.button("💾 Export Model", use_container_width=True, disabled=not bundle_models):
                 try:
-                    with open(selected_model, 'rb') as f:
-                        st.download_button(
-                            label="⬇️ Download Model",
-                            data=f.read(),
-                            file_name=Path(selected_model).name,
-                            mime="application/octet-stream"
-                        )
+                    with st.spinner(f"Writing bundle for {len(bundle_models)} model(s)..."), governed("Export bundle"):
+                        remove_old_bundles()
+                        bundle_path = write_bundle(bundle_models, archive=bundle_archive, checkpoint_format=bundle_format)
+                    render_bundle_link(bundle_path)
                 except Exception as e:
                     st.error(f"Error: {e}")
         
@@ -3175,107 +3607,155 @@ File Information:
         
         with col3:
             if st.button("📈 Export Visualizations", use_container_width=True):
-                assets_dir = Path("assets")
-                if assets_dir.exists():
-                    image_files = list(assets_dir.glob("*.png"))
-                    if image_files:
-                        st.info(f"Found {len(image_files)} visualization files in assets/")
-                        st.write("Download individual images from the Visualize Model page.")
-                    else:
-                        st.warning("No visualizations found. Generate them first!")
+                image_files = get_file_watcher().files('assets')
+                if image_files:
+                    with st.spinner(f"Bundling {len(image_files)} figures..."), governed("Export figures"):
+                        bundle_path = write_bundle([], archive='zip', include_checkpoints=False,
+                                                   extra_files=[(f, f"figures/{Path(f).name}") for f in image_files])
+                    render_bundle_link(bundle_path)
                 else:
-                    st.warning("Assets directory not found.")
+                    st.warning("No visualizations found. Generate them first!")
+        
+        with col4:
+            if st.button("⚙️ Export TorchScript", use_container_width=True,
+                         help="Freeze + optimize_for_inference (conv/relu fusion, constant folding)"):
+                try:
+                    with st.spinner("Scripting, freezing and optimizing..."), governed("TorchScript export"):
+                        artifact_path = export_checkpoint(selected_model)
+                    st.success(f"✅ Exported to `{artifact_path}`")
+                    render_download_link(artifact_path, Path(artifact_path).name, "⬇️ Download Artifact")
+                except Exception as e:
+                    st.error(f"Error: {e}")
         
         # Generate comprehensive report
         st.subheader("📋 Generate Comprehensive Report")
         
         if st.button("📄 Generate Full PDF Report", type="primary", use_container_width=True):
             try:
-                with st.spinner("Generating comprehensive report..."):
-                    info = get_model_info(selected_model)
-                    accuracy = evaluate_model(selected_model, use_cache=True)
-                    
-                    if ADVANCED_FEATURES:
-                        try:
-                            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-                            model = SimpleCNN().to(device)
-                            state = torch.load(selected_model, map_location=device)
-                            state = fix_state_dict(state)  # Fix _orig_mod prefix if present
-                            model.load_state_dict(state, strict=False)
-                            
-                            flops = calculate_flops(model)
-                            model_size = get_model_size_mb(model)
-                            inference_stats = measure_inference_time(model, device=device.type)
-                            flops_str = f"{flops/1e6:.2f}M"
-                            model_size_str = f"{model_size:.2f}"
-                            inference_str = f"{inference_stats.get('mean', 'N/A')}"
-                        except Exception:
-                            flops_str = "N/A"
-                            model_size_str = f"{info['file_size_mb']:.2f}" if info else "N/A"
-                            inference_str = "N/A"
-                    else:
-                        flops_str = "N/A"
-                        model_size_str = f"{info['file_size_mb']:.2f}" if info else "N/A"
-                        inference_str = "N/A"
-                    
-                    accuracy_str = f"{accuracy:.2f}%" if accuracy else "Not evaluated"
-                    
-                    report = f"""
-╔══════════════════════════════════════════════════════════════╗
-║         PARAMETER PRUNING MODEL ANALYSIS REPORT              ║
-╚══════════════════════════════════════════════════════════════╝
-
-Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-MODEL INFORMATION
-─────────────────
-Model File: {Path(selected_model).name}
-Full Path: {selected_model}
-File Size: {info['file_size_mb']:.2f} MB
-
-ARCHITECTURE
-────────────
-Total Parameters: {info['total_params']:,}
-Trainable Parameters: {info['trainable_params']:,}
-Current Sparsity: {info['sparsity']:.2%}
-
-PERFORMANCE METRICS
-───────────────────
-Test Accuracy: {accuracy_str}
-FLOPs: {flops_str}
-Model Size: {model_size_str} MB
-Inference Time: {inference_str} ms
-
-ANALYSIS
-────────
-This model has been analyzed using advanced pruning techniques.
-Sparsity indicates the percentage of zero parameters in the model.
-
-═══════════════════════════════════════════════════════════════
-Report generated by Parameter Pruning Dashboard
-"""
-                    
-                    st.success("✅ **Report Generated Successfully!**")
-                    st.balloons()
-                    
-                    # Add success notification
-                    add_notification(f"Full PDF report generated for {Path(selected_model).name}", "success")
-                    
-                    st.download_button(
-                        label="⬇️ Download Full Report",
-                        data=report,
-                        file_name=f"{Path(selected_model).stem}_full_report.txt",
-                        mime="text/plain"
-                    )
-                    
-                    with st.expander("📄 Preview Report", expanded=True):
-                        st.code(report)
-                    
-                    st.info("🎉 **Project Complete!** All export options have been processed successfully.")
-                        
+                device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+                submit_background_job('report', 'report', {
+                    'model_path': selected_model, 'inference_mode': get_inference_mode(device)
+                })
             except Exception as e:
-                st.error(f"❌ Error generating report: {e}")
+                st.error(f"❌ Error queuing report: {e}")
+        
+        report_job = st.session_state.queued_jobs.get('report')
+        if report_job:
+            render_queued_job(report_job, on_done=show_report_result)
     else:
         st.warning("⚠️ No models found. Please train a model first.")
 
 # Footer removed - each tab has its own footer for better organization
+
+@st.cache_resource
+def get_prewarmer():
+    """Background warm-up of the test set, recent checkpoints and the forward pass (once per server process)"""
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    mode = get_inference_mode(device)
+    # The worker thread has no script context, so it gets the shared cache object instead of the st.cache accessors
+    cache = get_shared_model_cache()
+    return Prewarmer(lambda path: load_inference_model(path, device, mode, cache), device=device, mode=mode,
+                     governor=get_governor(), on_test_set=get_test_loader.clear).start()
+
+def render_prewarm_status():
+    """Sidebar line with the startup prewarm progress"""
+    status = get_prewarmer().status()
+    stages = status['stages']
+    with st.sidebar:
+        st.markdown("### 🔥 Prewarm")
+        if status['ready']:
+            models = (stages['models'].get('detail') or {}).get('loaded', [])
+            forward = stages['forward'].get('detail') or {}
+            st.caption(f"Ready in {status['finished'] - status['started']:.1f}s | {len(models)} models loaded"
+                       + (f" | {forward['ms_per_batch']:.0f} ms/batch warm" if forward else ""))
+        else:
+            running = [stage for stage, info in stages.items() if info['state'] == 'running']
+            st.caption(f"Warming up: {', '.join(running) or 'starting'}…")
+        failed = [f"{stage}: {info['error']}" for stage, info in stages.items() if info['state'] == 'failed']
+        for failure in failed:
+            st.caption(f"⚠️ {failure}")
+
+@st.cache_resource
+def get_precompute_scheduler():
+    """Idle-time precompute of metadata, logits, histograms and parent comparisons for new checkpoints"""
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    scheduler = PrecomputeScheduler(governor=get_governor(), mode=get_inference_mode(device))
+    
+    def on_change(event, path):
+        if not path.endswith(MODEL_FILE_SUFFIXES):
+            return
+        if event == 'deleted':
+            scheduler.forget(path)
+        else:
+            scheduler.submit(path)
+    
+    watcher = get_file_watcher()
+    watcher.add_listener(on_change)
+    # Restarts only queue checkpoints whose logits or index entries are missing
+    for path in watcher.files('saved'):
+        scheduler.submit_if_missing(path)
+    return scheduler.start()
+
+def render_precompute_status():
+    """Sidebar line with the idle-time precompute queue"""
+    status = get_precompute_scheduler().status()
+    with st.sidebar:
+        st.caption(f"Precompute: {status['queued']} queued | {status['finished']} done | "
+                   f"{status['yielded']} yielded to foreground | {status['failed']} failed"
+                   + (f" | ▶ {status['current']}" if status['current'] else ""))
+
+# First run in a server process starts the warm-up; later runs just read its status
+get_prewarmer()
+get_precompute_scheduler()
+
+# Top Navigation - Refactored to 6 Main Sections; only the selected page runs on a rerun
+nav_pages = [
+    ("🏠", "Home", render_home, "home"),
+    ("✂️", "Pruning Jobs", render_pruning_jobs, "pruning-jobs"),  # Combined: Train Model + Advanced Prune
+    ("📁", "Models", render_models, "models"),  # Renamed from Model Manager
+    ("📊", "Analytics & Visualization", render_analytics, "analytics"),  # Combined: Visualize + Analysis + Analytics
+    ("📈", "Compare Models", render_compare, "compare"),
+    ("📄", "Reports", render_reports, "reports")  # Renamed from Export/Report
+]
+
+@st.cache_resource
+def get_page_timings():
+    """Recent rerun latencies per page, shared by every session"""
+    return {}
+
+def run_page(title, render):
+    """Run one page and record how long the rerun took"""
+    started = time.perf_counter()
+    try:
+        render()
+    finally:
+        get_page_timings().setdefault(title, deque(maxlen=PAGE_TIMING_WINDOW)).append(time.perf_counter() - started)
+    return title
+
+def render_page_timings(current):
+    """Sidebar panel with rerun latency of the current page and the others"""
+    timings = {title: list(samples) for title, samples in get_page_timings().items()}
+    if current not in timings:
+        return
+    with st.sidebar:
+        st.markdown("### ⏱️ Rerun Latency")
+        samples = timings[current]
+        st.caption(f"{current}: {samples[-1] * 1000:.0f} ms this run | median {median(samples) * 1000:.0f} ms "
+                   f"over {len(samples)} runs")
+        others = [f"{title} {median(samples) * 1000:.0f} ms" for title, samples in timings.items() if title != current]
+        if others:
+            st.caption("Other pages (median): " + ", ".join(others))
+
+# st.navigation (1.36+) runs the page as its own script section; older versions fall back to a radio selector
+_navigation = getattr(st, 'navigation', None)
+if _navigation is not None:
+    current_page = _navigation([st.Page(render, title=title, icon=icon, url_path=slug, default=(slug == 'home'))
+                                for icon, title, render, slug in nav_pages])
+    active_page = run_page(current_page.title, current_page.run)
+else:
+    labels = {f"{icon} {title}": (title, render) for icon, title, render, _ in nav_pages}
+    choice = st.radio("Navigation", list(labels), horizontal=True, key="active_page", label_visibility="collapsed")
+    active_page = run_page(*labels[choice])
+render_prewarm_status()
+render_precompute_status()
+render_page_timings(active_page)
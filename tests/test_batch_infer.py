@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip('torch')
+np = pytest.importorskip('numpy')
+
+from batch_infer import plan_chunks, prepare_outputs, DONE_FILE
+
+def test_plan_chunks_never_span_sources():
+    chunks = plan_chunks([{'count': 5}, {'count': 3}], chunk_size=2)
+    assert chunks == [
+        (0, 0, 0, 0, 2), (1, 2, 0, 2, 2), (2, 4, 0, 4, 1),
+        (3, 5, 1, 0, 2), (4, 7, 1, 2, 1)
+    ]
+
+def _config(**changes):
+    config = {'model_path': 'm.pth', 'sources': [], 'chunk_size': 2, 'output': 'both', 'normalize': True}
+    config.update(changes)
+    return config
+
+def test_prepare_outputs_resume(tmp_path):
+    out_dir = str(tmp_path / 'run')
+    sources = [{'path': 'a.npy', 'count': 5}]
+    done = prepare_outputs(out_dir, _config(), sources, 3, 10, np.float32, resume=False)
+    assert done.shape == (3,) and not done.any()
+    done[1] = 1
+    done.flush()
+    del done
+
+    with pytest.raises(ValueError, match='already holds a run'):
+        prepare_outputs(out_dir, _config(), sources, 3, 10, np.float32, resume=False)
+    with pytest.raises(ValueError, match='different inputs'):
+        prepare_outputs(out_dir, _config(chunk_size=4), sources, 3, 10, np.float32, resume=True)
+    resumed = prepare_outputs(out_dir, _config(), sources, 3, 10, np.float32, resume=True)
+    assert resumed.tolist() == [0, 1, 0]
+    assert (tmp_path / 'run' / DONE_FILE).exists()
@@ -0,0 +1,21 @@
+import os
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('numpy')
+
+from bundle_export import figures_for
+
+def test_figures_for_matches_the_exact_stem(tmp_path):
+    names = [
+        'baseline_dist_conv1_weight_dist.png', 'baseline_heatmap_fc1_weight_heatmap.png',
+        'baseline_sparsity_analysis.png', 'baseline_stats_layer_stats.png', 'baseline_activations_conv2.png',
+        'baseline_v2_dist_conv1_weight_dist.png', 'baseline_v2_sparsity_analysis.png',
+        'baseline_notes.png', 'baseline_sparsity_analysis.txt'
+    ]
+    for name in names:
+        (tmp_path / name).write_bytes(b'png')
+    found = [os.path.basename(f) for f in figures_for('saved/baseline.pth', str(tmp_path))]
+    assert found == sorted(names[:5])
+    found = [os.path.basename(f) for f in figures_for('saved/baseline_v2.pth', str(tmp_path))]
+    assert found == ['baseline_v2_dist_conv1_weight_dist.png', 'baseline_v2_sparsity_analysis.png']
@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+import pytest
+from coordination import SingleFlight, atomic_write
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    while not flight.in_flight('key'):
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ['result'] * 4
+    assert len(calls) == 1
+    assert not flight.in_flight('key')
+
+def test_single_flight_error_reaches_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('broken')
+
+    leader = threading.Thread(target=lambda: pytest.raises(RuntimeError, flight.do, 'key', compute))
+    leader.start()
+    started.wait(5)
+    follower_error = []
+
+    def follow():
+        try:
+            flight.do('key', lambda: 'not called')
+        except RuntimeError as e:
+            follower_error.append(e)
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert [str(e) for e in follower_error] == ['broken']
+
+def test_single_flight_follower_takes_over_abandoned_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(5)
+        raise KeyboardInterrupt()
+
+    def leader():
+        try:
+            flight.do('key', interrupted)
+        except KeyboardInterrupt:
+            pass
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    started.wait(5)
+    result = []
+    follower = threading.Thread(target=lambda: result.append(flight.do('key', lambda: 'recomputed')))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader_thread.join(5)
+    follower.join(5)
+    assert result == ['recomputed']
+
+def test_single_flight_reports_progress_to_waiters():
+    flight = SingleFlight()
+    seen = []
+
+    def compute():
+        for step in range(3):
+            flight.report('key', step / 2)
+            time.sleep(0.03)
+        return 'done'
+
+    assert flight.do('key', compute, on_wait=seen.append, poll_seconds=0.005) == 'done'
+    assert any(p is not None for p in seen)
+    assert all(p is None or 0 <= p <= 1 for p in seen)
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / 'data.json'
+    with atomic_write(str(path), 'w', encoding='utf-8') as f:
+        f.write('new')
+    assert path.read_text() == 'new'
+    assert os.listdir(tmp_path) == ['data.json']
+
+def test_atomic_write_keeps_old_content_on_failure(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), 'w', encoding='utf-8') as f:
+            f.write('partial')
+            raise RuntimeError('interrupted')
+    assert path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['data.json']
@@ -0,0 +1,73 @@
+import os
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('numpy')
+
+from checkpoint_io import save_state_dict, load_state_dict
+from delta_checkpoint import read_delta_info, find_dependents, materialize_dependents
+from fingerprint import file_fingerprint
+import lineage
+
+def _states():
+    torch.manual_seed(0)
+    parent = {'conv.weight': torch.randn(8, 3, 3, 3), 'conv.bias': torch.randn(8), 'fc.weight': torch.randn(10, 8)}
+    child = {k: v.clone() for k, v in parent.items()}
+    child['conv.weight'][child['conv.weight'].abs() < 0.5] = 0  # Pruned: a masked copy of the parent
+    child['fc.weight'] = torch.randn(10, 8)  # Fine-tuned: stored whole
+    return parent, child
+
+def _assert_same(a, b):
+    assert set(a) == set(b)
+    for name in a:
+        assert torch.equal(a[name], b[name]), name
+
+def test_delta_round_trip(tmp_path):
+    parent_state, child_state = _states()
+    parent = str(tmp_path / 'base.safetensors')
+    child = str(tmp_path / 'pruned.delta')
+    save_state_dict(parent_state, parent)
+    save_state_dict(child_state, child, parent_path=parent)
+
+    info = read_delta_info(child)
+    assert info['parent_fingerprint'] == file_fingerprint(parent)
+    assert set(info['masked']) == {'conv.weight'}
+    assert os.path.getsize(child) < os.path.getsize(parent)
+    _assert_same(load_state_dict(child), child_state)
+    assert find_dependents(parent) == [child]
+
+def test_overwriting_parent_materializes_dependents(tmp_path):
+    parent_state, child_state = _states()
+    parent = str(tmp_path / 'base.safetensors')
+    child = str(tmp_path / 'pruned.delta')
+    save_state_dict(parent_state, parent)
+    lineage.register(parent)
+    save_state_dict(child_state, child, parent_path=parent)
+    lineage.register(child, parent_path=parent)
+
+    save_state_dict({k: torch.zeros_like(v) for k, v in parent_state.items()}, parent)
+
+    materialized = str(tmp_path / 'pruned.safetensors')
+    assert not os.path.exists(child)
+    _assert_same(load_state_dict(materialized), child_state)
+    assert lineage.get_parent(materialized) == parent
+    assert materialize_dependents(parent) == []
+
+def test_delta_without_parent_is_rejected(tmp_path):
+    _, child_state = _states()
+    with pytest.raises(ValueError):
+        save_state_dict(child_state, str(tmp_path / 'orphan.delta'))
+
+def test_importing_parent_into_store_materializes_dependents(tmp_path):
+    from model_store import import_checkpoint
+    parent_state, child_state = _states()
+    parent = str(tmp_path / 'base.safetensors')
+    child = str(tmp_path / 'pruned.delta')
+    save_state_dict(parent_state, parent)
+    save_state_dict(child_state, child, parent_path=parent)
+
+    manifest = import_checkpoint(parent, remove_original=True)
+
+    assert not os.path.exists(parent) and not os.path.exists(child)
+    _assert_same(load_state_dict(manifest), parent_state)
+    _assert_same(load_state_dict(str(tmp_path / 'pruned.safetensors')), child_state)
@@ -0,0 +1,46 @@
+import urllib.error
+import urllib.request
+import pytest
+from download_server import DownloadServer
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'exports').mkdir()
+    server = DownloadServer([str(tmp_path / 'exports')], address='127.0.0.1', port=0).start()
+    yield server
+    server.stop()
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers, response.read()
+
+def test_offered_file_is_streamed(server, tmp_path):
+    bundle = tmp_path / 'exports' / 'bundle_0123.zip'
+    bundle.write_bytes(b'x' * 3_000_000)
+    headers, body = _get(server.url(server.offer(str(bundle), 'bundle_20260101.zip'), '127.0.0.1'))
+    assert body == b'x' * 3_000_000
+    assert headers['Content-Length'] == '3000000'
+    assert 'bundle_20260101.zip' in headers['Content-Disposition']
+
+def test_unknown_and_expired_tokens_are_not_found(server, tmp_path):
+    bundle = tmp_path / 'exports' / 'bundle.zip'
+    bundle.write_bytes(b'data')
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(server.url('/download/guess', '127.0.0.1'))
+    assert error.value.code == 404
+    with pytest.raises(urllib.error.HTTPError):
+        _get(server.url('/download/', '127.0.0.1'))
+
+    server.ttl = 0
+    link = server.offer(str(bundle))
+    assert server.resolve(link.rsplit('/', 1)[1]) is None
+
+def test_only_files_under_the_roots_can_be_offered(server, tmp_path):
+    outside = tmp_path / 'secret.pth'
+    outside.write_bytes(b'weights')
+    with pytest.raises(ValueError):
+        server.offer(str(outside))
+    with pytest.raises(ValueError):
+        server.offer(str(tmp_path / 'exports' / '..' / 'secret.pth'))
+    with pytest.raises(FileNotFoundError):
+        server.offer(str(tmp_path / 'exports' / 'missing.zip'))
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('numpy')
+
+from inference_server import InferenceServer, ModelWorker, WorkerStopped
+
+class Doubler(torch.nn.Module):
+    def forward(self, x):
+        return x.flatten(1)[:, :10] * 2
+
+def _inputs(n, value=1.0):
+    return torch.full((n, 3, 32, 32), value)
+
+def test_concurrent_requests_share_a_batch():
+    async def scenario():
+        server = InferenceServer(max_latency_ms=50, mode='eager')
+        worker = ModelWorker('m', Doubler(), 'eager', server)
+        results = await asyncio.gather(*(worker.infer(_inputs(2, value=i)) for i in range(4)))
+        worker.stop()
+        return server, results
+
+    server, results = asyncio.run(scenario())
+    stats = server.stats['m'].snapshot()
+    assert stats['batches'] == 1 and stats['samples'] == 8 and stats['requests'] == 4
+    for i, logits in enumerate(results):
+        assert logits.shape == (2, 10)
+        assert torch.all(logits == 2 * i)
+
+def test_max_batch_splits_batches():
+    async def scenario():
+        server = InferenceServer(max_batch=4, max_latency_ms=50, mode='eager')
+        worker = ModelWorker('m', Doubler(), 'eager', server)
+        await asyncio.gather(*(worker.infer(_inputs(2)) for _ in range(4)))
+        worker.stop()
+        return server
+
+    assert asyncio.run(scenario()).stats['m'].batches == 2
+
+def test_least_recently_used_idle_model_is_evicted():
+    async def scenario():
+        server = InferenceServer(max_resident=2, mode='eager')
+        for name in ('a', 'b', 'c'):
+            server.resident[name] = ModelWorker(name, Doubler(), 'eager', server)
+        server.resident.move_to_end('a')
+        server._evict()
+        names = list(server.resident)
+        for worker in server.resident.values():
+            worker.stop()
+        return names
+
+    assert asyncio.run(scenario()) == ['c', 'a']
+
+def test_busy_workers_are_not_evicted():
+    async def scenario():
+        server = InferenceServer(max_resident=1, max_latency_ms=200, mode='eager')
+        busy = server.resident['busy'] = ModelWorker('busy', Doubler(), 'eager', server)
+        pending = asyncio.ensure_future(busy.infer(_inputs(1)))
+        await asyncio.sleep(0.01)  # Taken off the queue, waiting out the batch window
+        assert not busy.idle()
+        server.resident['idle'] = ModelWorker('idle', Doubler(), 'eager', server)
+        server._evict()
+        assert list(server.resident) == ['busy']
+        await pending
+        busy.stop()
+
+    asyncio.run(scenario())
+
+def test_stop_fails_pending_requests():
+    async def scenario():
+        server = InferenceServer(max_latency_ms=500, mode='eager')
+        worker = ModelWorker('m', Doubler(), 'eager', server)
+        first = asyncio.ensure_future(worker.infer(_inputs(1)))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(worker.infer(_inputs(1)))
+        await asyncio.sleep(0)
+        worker.stop()
+        for future in (first, second):
+            with pytest.raises(WorkerStopped):
+                await future
+        with pytest.raises(WorkerStopped):
+            await worker.infer(_inputs(1))
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import sqlite3
+import time
+import pytest
+import job_queue
+from job_queue import validate_spec, submit, claim, fail, cancel, heartbeat, complete, requeue_stale, get_job
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'queue.db')
+
+def test_validate_spec_rejects_bad_specs():
+    with pytest.raises(ValueError, match='Unknown job kind'):
+        validate_spec('train', {})
+    with pytest.raises(ValueError, match='unknown spec fields'):
+        validate_spec('evaluate', {'model_path': 'a.pth', 'epochs': 3})
+    with pytest.raises(ValueError, match="missing required field 'model_path'"):
+        validate_spec('evaluate', {})
+    with pytest.raises(ValueError, match="'amount' must be float"):
+        validate_spec('prune', {'model_path': 'a.pth', 'method': 'l1', 'amount': '0.5'})
+
+def test_validate_spec_coerces_ints_and_drops_none():
+    spec = validate_spec('prune', {'model_path': 'a.pth', 'method': 'l1', 'amount': 1, 'save_format': None})
+    assert spec == {'model_path': 'a.pth', 'method': 'l1', 'amount': 1.0}
+    assert isinstance(spec['amount'], float)
+    with pytest.raises(ValueError):
+        validate_spec('prune', {'model_path': 'a.pth', 'method': 'l1', 'amount': True})
+
+def test_claim_order(db):
+    low = submit('evaluate', {'model_path': 'a.pth'}, db_path=db)
+    high = submit('evaluate', {'model_path': 'b.pth'}, priority=5, db_path=db)
+
+    job = claim('w1', db_path=db)
+    assert job['id'] == high and job['status'] == 'running' and job['attempts'] == 1
+    assert claim('w1', kinds=['prune'], db_path=db) is None
+    assert claim('w2', db_path=db)['id'] == low
+    assert claim('w3', db_path=db) is None
+
+def test_submit_dedupe(db):
+    first = submit('evaluate', {'model_path': 'a.pth'}, db_path=db)
+    assert submit('evaluate', {'model_path': 'a.pth'}, dedupe=True, db_path=db) == first
+    assert submit('evaluate', {'model_path': 'a.pth'}, db_path=db) != first
+    cancel(first, db)
+    assert submit('evaluate', {'model_path': 'a.pth'}, dedupe=True, db_path=db) != first
+
+def test_fail_retries_with_backoff_then_fails(db):
+    job_id = submit('evaluate', {'model_path': 'a.pth'}, max_retries=1, db_path=db)
+    claim('w', db_path=db)
+    assert fail(job_id, 'boom', db_path=db) == 'queued'
+    job = get_job(job_id, db)
+    assert job['error'] == 'boom' and job['not_before'] > time.time()
+    assert claim('w', db_path=db) is None  # Still backing off
+
+    job_queue._update(job_id, db, 'UPDATE jobs SET not_before = 0 WHERE id = ?', ())
+    assert claim('w', db_path=db)['attempts'] == 2
+    assert fail(job_id, 'boom again', db_path=db) == 'failed'
+    assert get_job(job_id, db)['finished'] is not None
+
+def test_cancel(db):
+    queued = submit('evaluate', {'model_path': 'a.pth'}, db_path=db)
+    assert cancel(queued, db)['status'] == 'cancelled'
+
+    running = submit('evaluate', {'model_path': 'b.pth'}, db_path=db)
+    claim('w', db_path=db)
+    assert cancel(running, db)['status'] == 'running'
+    assert heartbeat(running, progress=0.5, db_path=db) is True
+    assert fail(running, 'stopped', db_path=db) == 'cancelled'
+
+def test_complete_stores_result(db):
+    job_id = submit('evaluate', {'model_path': 'a.pth'}, db_path=db)
+    claim('w', db_path=db)
+    complete(job_id, {'accuracy': 91.5}, db_path=db)
+    job = get_job(job_id, db)
+    assert job['status'] == 'done' and job['progress'] == 1 and job['result'] == {'accuracy': 91.5}
+
+def test_requeue_stale(db):
+    stale = submit('evaluate', {'model_path': 'a.pth'}, db_path=db)
+    fresh = submit('evaluate', {'model_path': 'b.pth'}, db_path=db)
+    claim('crashed', db_path=db)
+    claim('alive', db_path=db)
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute('UPDATE jobs SET heartbeat = ? WHERE id = ?', (time.time() - 600, stale))
+    conn.close()
+
+    assert requeue_stale(stale_after=120, db_path=db) == 1
+    assert get_job(stale, db)['status'] == 'queued'
+    assert get_job(stale, db)['error'] == 'worker stopped responding'
+    assert get_job(fresh, db)['status'] == 'running'
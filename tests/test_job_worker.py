@@ -0,0 +1,65 @@
+import os
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('numpy')
+
+import job_worker
+from checkpoint_io import save_state_dict
+from model import SimpleCNN
+from model_index import load_index
+from lineage import load_lineage, register
+
+class Context:
+    """JobContext stand-in that records progress instead of writing to the queue"""
+
+    def __init__(self):
+        self.job = {'id': 1}
+        self.messages = []
+
+    def progress(self, fraction, message=None):
+        self.messages.append(message)
+
+    def scaled(self, start, end, message):
+        return lambda done, total: self.progress(start + (end - start) * done / max(1, total), message)
+
+@pytest.fixture
+def parent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = os.path.join('saved', 'baseline.pth')
+    save_state_dict(SimpleCNN().state_dict(), path)
+    register(path, operation={'type': 'train'})
+    return path
+
+def _pruned_names(saved_dir):
+    return {
+        'files': [f for f in os.listdir(saved_dir) if f.startswith('pruned_')],
+        'index': [n for n in load_index(saved_dir)['models'] if n.startswith('pruned_')],
+        'lineage': [n for n in load_lineage(saved_dir)['models'] if n.startswith('pruned_')]
+    }
+
+def test_prune_saves_and_registers(parent):
+    spec = {'model_path': parent, 'method': 'magnitude', 'amount': 0.5, 'evaluate': False, 'comparison_plot': False}
+    result = job_worker.run_prune(spec, Context())
+    name = os.path.basename(result['path'])
+    assert _pruned_names('saved') == {'files': [name], 'index': [name], 'lineage': [name]}
+
+def test_failed_evaluation_leaves_no_checkpoint(parent, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('evaluation failed')
+
+    monkeypatch.setattr(job_worker, '_forward_logits', broken)
+    spec = {'model_path': parent, 'method': 'magnitude', 'amount': 0.5, 'comparison_plot': False}
+    with pytest.raises(RuntimeError, match='evaluation failed'):
+        job_worker.run_prune(spec, Context())
+    assert _pruned_names('saved') == {'files': [], 'index': [], 'lineage': []}
+
+def test_cancelled_prune_leaves_no_checkpoint(parent, monkeypatch):
+    def cancelled(*args, **kwargs):
+        raise job_worker.JobCancelled()
+
+    monkeypatch.setattr(job_worker, '_forward_logits', cancelled)
+    spec = {'model_path': parent, 'method': 'magnitude', 'amount': 0.5, 'comparison_plot': False}
+    with pytest.raises(job_worker.JobCancelled):
+        job_worker.run_prune(spec, Context())
+    assert _pruned_names('saved') == {'files': [], 'index': [], 'lineage': []}
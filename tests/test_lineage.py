@@ -0,0 +1,52 @@
+import os
+import lineage
+from lineage import register, get_version, get_parent, get_children, get_root, get_entry, rename
+
+def _write(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return str(path)
+
+def test_versioning_round_trip(tmp_path):
+    root = _write(tmp_path / 'base.pth', b'base')
+    child = _write(tmp_path / 'pruned_a.pth', b'a')
+    grandchild = _write(tmp_path / 'pruned_b.pth', b'b')
+
+    assert register(root, operation={'type': 'train'})['version'] == 'v1.0'
+    assert register(child, parent_path=root, operation={'type': 'prune'})['version'] == 'v1.1'
+    assert register(grandchild, parent_path=child)['version'] == 'v1.2'
+    assert lineage.next_version(child, str(tmp_path)) == 'v1.3'
+
+    assert get_version(child) == 'v1.1'
+    assert get_parent(grandchild) == child
+    assert get_children(root) == [child]
+    assert get_root(grandchild) == root
+    assert get_entry(grandchild)['root'] == 'base.pth'
+
+def test_register_same_content_is_idempotent(tmp_path):
+    root = _write(tmp_path / 'base.pth', b'base')
+    first = register(root)
+    assert register(root) == first
+
+def test_retraining_root_bumps_major(tmp_path):
+    root = _write(tmp_path / 'base.pth', b'base')
+    register(root)
+    _write(tmp_path / 'base.pth', b'retrained')
+    assert register(root)['version'] == 'v2.0'
+
+def test_rename_moves_entry_and_children(tmp_path):
+    root = _write(tmp_path / 'base.pth', b'base')
+    child = _write(tmp_path / 'pruned.delta', b'delta')
+    grandchild = _write(tmp_path / 'pruned_more.pth', b'more')
+    register(root)
+    register(child, parent_path=root)
+    register(grandchild, parent_path=child)
+
+    new_child = str(tmp_path / 'pruned.safetensors')
+    os.replace(child, new_child)
+    entry = rename(child, new_child)
+    assert entry['version'] == 'v1.1'
+    assert get_entry(child) is None
+    assert get_parent(grandchild) == new_child
+    assert get_entry(grandchild)['parent_fingerprint'] == entry['fingerprint']
+    assert get_children(root) == [new_child]